@@ -0,0 +1,88 @@
+"""Admin API route definitions and handlers.
+
+This module provides Flask routes exposing internal runtime statistics,
+such as connection pool usage, query and response cache hit rates, the
+log queue and the write-behind queue.
+"""
+
+from flask import jsonify
+
+from app.data_utils.cache_utils import cache_stats
+from app.data_utils.connection_pool import get_pool
+from app.data_utils.data_version import current_data_version
+from app.data_utils.write_behind import writer_stats
+from app.logger_utils.custom_logger import logging_stats
+from app.route_utils.response_cache import response_cache
+
+BASE_URL = "/api/admin"
+
+
+def pool_stats():
+    """Report connection pool metrics.
+
+    Returns:
+        tuple: JSON response with pool counters and HTTP status code
+    """
+    return jsonify({"pool": get_pool().metrics()}), 200
+
+
+def query_cache_stats():
+    """Report query cache metrics.
+
+    Returns:
+        tuple: JSON response with per-function cache counters, the response
+        cache counters, the current data version and HTTP status code
+    """
+    return jsonify(
+        {
+            "caches": cache_stats(),
+            "responses": response_cache.stats(),
+            "data_version": current_data_version()._asdict(),
+        }
+    ), 200
+
+
+def log_queue_stats():
+    """Report log queue backlog and dropped records.
+
+    Returns:
+        tuple: JSON response with log queue counters and HTTP status code
+    """
+    return jsonify({"logging": logging_stats()}), 200
+
+
+def write_queue_stats():
+    """Report the write mode and write-behind queue metrics.
+
+    Returns:
+        tuple: JSON response with writer counters and HTTP status code
+    """
+    return jsonify({"writes": writer_stats()}), 200
+
+
+def register_admin_routes(app):
+    """Register admin routes with the Flask application.
+
+    Args:
+        app: Flask application instance
+    """
+
+    @app.route(f"{BASE_URL}/pool", methods=["GET"])
+    def pool_stats_route():
+        """Route handler for connection pool metrics."""
+        return pool_stats()
+
+    @app.route(f"{BASE_URL}/cache", methods=["GET"])
+    def query_cache_stats_route():
+        """Route handler for query cache metrics."""
+        return query_cache_stats()
+
+    @app.route(f"{BASE_URL}/logging", methods=["GET"])
+    def log_queue_stats_route():
+        """Route handler for log queue metrics."""
+        return log_queue_stats()
+
+    @app.route(f"{BASE_URL}/writes", methods=["GET"])
+    def write_queue_stats_route():
+        """Route handler for write-behind queue metrics."""
+        return write_queue_stats()
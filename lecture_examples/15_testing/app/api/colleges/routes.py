@@ -1,36 +1,52 @@
 """College API route definitions and handlers.
 
 This module provides Flask routes and handlers for listing colleges,
-either all colleges or filtered by team.
+either all colleges or filtered by team, of the season given by
+``?season=`` (``DEFAULT_SEASON`` if omitted).
 """
 
 from flask import jsonify
 
 from app.data_utils.sql_utils import list_college_sql
-from app.route_utils.decorators import validate_team
+from app.route_utils.decorators import (
+    conditional_get,
+    validate_team,
+    with_season,
+)
+from app.route_utils.response_cache import cached_response
 
 BASE_URL = "/api/colleges"
 
 
-def list_colleges():
-    """Retrieve all colleges from the database.
+@with_season
+@conditional_get
+@cached_response
+def list_colleges(season):
+    """Retrieve all colleges of a season from the database.
+
+    Args:
+        season (str): Season to list
 
     Returns:
         tuple: JSON response with college list and HTTP status code
     """
     try:
-        college_list = list_college_sql()
+        college_list = list_college_sql(season=season)
         return jsonify({"colleges": college_list}), 200
     except Exception as e:
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500
 
 
+@with_season
 @validate_team
-def list_colleges_per_team(team):
+@conditional_get
+@cached_response
+def list_colleges_per_team(team, season):
     """Retrieve colleges filtered by team. tre
 
     Args:
         team (str): Team identifier to filter colleges
+        season (str): Season to list
 
     Returns:
         tuple: JSON response with filtered college list and HTTP status code
@@ -42,7 +58,7 @@ def list_colleges_per_team(team):
         BE CAREFUL WITH THIS. It is very powerful.
 
     """
-    college_list = list_college_sql(team=team)
+    college_list = list_college_sql(team=team, season=season)
     return jsonify({"colleges": college_list}), 200
 
 
@@ -0,0 +1,35 @@
+"""Metrics API route definitions and handlers.
+
+This module exposes the metrics registry at ``/metrics`` in the
+Prometheus text exposition format, merged over every gunicorn worker
+when ``METRICS_DIR`` is set (see ``multiprocess``).
+"""
+
+from flask import Response
+
+from app.metrics_utils.metrics import registry
+from app.metrics_utils.multiprocess import render_metrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics():
+    """Render every registered metric.
+
+    Returns:
+        Response: Metrics in the Prometheus text format
+    """
+    return Response(render_metrics(registry), content_type=CONTENT_TYPE)
+
+
+def register_metrics_routes(app):
+    """Register the metrics route with the Flask application.
+
+    Args:
+        app: Flask application instance
+    """
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics_route():
+        """Route handler for the Prometheus scrape endpoint."""
+        return metrics()
@@ -2,57 +2,177 @@
 
 This module provides Flask routes and handlers for managing players,
 including listing, adding, deleting, and retrieving player information.
+Reads and deletes work on the season given by ``?season=``, new players
+on the ``season`` of their JSON body (``DEFAULT_SEASON`` if omitted).
 """
 
 from flask import jsonify, request
 
+from app.data_utils.loading_utils import DEFAULT_SEASON
 from app.data_utils.sql_utils import (
+    PlayerNotFoundError,
     add_player,
+    add_players,
     delete_player,
+    delete_players,
+    export_players_sql,
+    list_players_page_sql,
     list_players_per_team_sql,
     player_info_sql,
+    stream_players_per_team_sql,
 )
+from app.data_utils.write_behind import WriteTimeoutError, writes_deferred
+from app.route_utils.decorators import conditional_get, with_season
+from app.route_utils.response_cache import cached_response
+from app.route_utils.streaming import stream_json_list
+from app.route_utils.validators import validation_registry
 
 BASE_URL = "/api/players"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
 
 
-def list_players_route():
-    """Retrieve all players grouped by team.
+def _page_args() -> tuple[int, int | None]:
+    """Read ``limit`` and ``cursor`` from the query string.
+
+    Returns:
+        Page size and cursor (None for the first page)
+
+    Raises:
+        ValueError: If either is not an integer or the limit is out of range
+    """
+    limit = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    cursor = request.args.get("cursor")
+    return limit, None if cursor is None else int(cursor)
+
+
+def list_players_page_route(season):
+    """Retrieve one page of players, following ``next_cursor``.
+
+    Args:
+        season (str): Season to list
+
+    Returns:
+        tuple: JSON response with the page of players and the cursor of the
+        next page (null on the last page), and HTTP status code
+    """
+    try:
+        limit, cursor = _page_args()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid page parameters: {e}"}), 400
+    players, next_cursor = list_players_page_sql(limit, cursor, season)
+    return jsonify({"players": players, "next_cursor": next_cursor}), 200
+
+
+@with_season
+@conditional_get
+@cached_response
+def list_players_route(season):
+    """Retrieve all players of a season grouped by team.
+
+    With ``?stream=1`` the list is streamed row by row instead of being
+    built in memory first. With ``?limit=N`` and/or ``?cursor=C`` a single
+    page is returned instead (see ``list_players_page_route``).
+
+    Args:
+        season (str): Season to list
 
     Returns:
         tuple: JSON response with players list and HTTP status code
     """
+    if "limit" in request.args or "cursor" in request.args:
+        return list_players_page_route(season)
+    if request.args.get("stream") == "1":
+        return stream_json_list(
+            "players", stream_players_per_team_sql(season=season)
+        ), 200
     try:
-        players_list = list_players_per_team_sql()
+        players_list = list_players_per_team_sql(season=season)
         return jsonify({"players": players_list}), 200
     except Exception as e:
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500
 
 
-def delete_player_route(player_id):
+def export_players_route():
+    """Stream every player_stats row across all seasons.
+
+    Returns:
+        tuple: Streaming JSON response with all rows and HTTP status code
+    """
+    return stream_json_list("players", export_players_sql()), 200
+
+
+@with_season
+def delete_player_route(player_id, season):
     """Delete a player by their ID.
 
     Args:
         player_id (int): ID of player to delete
+        season (str): Season the player must belong to
 
     Returns:
-        tuple: Empty response with 204 status code on success, or error message
+        tuple: Empty response with 204 status code on success (202 if the
+        delete is queued but not run yet), 404 if the player does not
+        exist, 503 if the write-behind queue did not take it in time, or
+        error message with 500
     """
     try:
-        delete_player(player_id)
-        return "", 204
+        delete_player(player_id, season)
+        return "", 202 if writes_deferred() else 204
+    except PlayerNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except WriteTimeoutError as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500
 
 
+@with_season
+def delete_players_route(season):
+    """Delete a batch of players in one transaction.
+
+    Expects JSON of the form ``{"ids": [...]}``. Nothing is deleted if any
+    of the ids does not exist.
+
+    Args:
+        season (str): Season the players must belong to
+
+    Returns:
+        tuple: JSON response with the deleted players' names by id and HTTP
+        status code: 400 for an invalid body, 404 for unknown ids, 503 if
+        the write-behind queue did not take it in time, 202 without names
+        if the delete is queued but not run yet
+    """
+    body = request.get_json(silent=True)
+    player_ids = body.get("ids") if isinstance(body, dict) else None
+    try:
+        deleted = delete_players(player_ids, season)
+    except PlayerNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except WriteTimeoutError as e:
+        return jsonify({"error": str(e)}), 503
+
+    if writes_deferred():
+        return jsonify(
+            {"message": f"Queued {len(player_ids)} players for deleting"}
+        ), 202
+    return jsonify({"deleted": deleted}), 200
+
+
 def add_player_route():
     """Add a new player to the database.
 
     Expects JSON with required fields: player_name, team
-    Optional field: college
+    Optional fields: college, season (must already be in the database)
 
     Returns:
         tuple: JSON response with success message and player info, HTTP status
+        (202 instead of 201 if the write is queued but not committed yet,
+        503 if the write-behind queue did not take it in time)
     """
     data = request.get_json()
 
@@ -60,32 +180,79 @@ def add_player_route():
         return jsonify({"error": "player_name is required"}), 400
     if not data.get("team"):
         return jsonify({"error": "team is required"}), 400
+    season = data.get("season", DEFAULT_SEASON)
+    if not isinstance(season, str) or not validation_registry.is_valid(
+        "season", season
+    ):
+        return jsonify({"error": f"Unknown season: {season}"}), 400
 
-    add_player(data)
+    try:
+        add_player(data)
+    except WriteTimeoutError as e:
+        return jsonify({"error": str(e)}), 503
 
+    if writes_deferred():
+        message = f"Queued player for adding: {data['player_name']}"
+    else:
+        message = f"Successfully added player: {data['player_name']}"
     return jsonify(
         {
-            "message": f"Successfully added player: {data['player_name']}",
+            "message": message,
             "player": {
                 "name": data["player_name"],
                 "team": data["team"],
                 "college": data.get("college"),
+                "season": season,
             },
         }
+    ), 202 if writes_deferred() else 201
+
+
+def add_players_route():
+    """Add a batch of players in one transaction.
+
+    Expects a JSON array of player objects, each with the fields accepted
+    by ``add_player_route``. Nothing is added if any player is invalid.
+
+    Returns:
+        tuple: JSON response with the ids of the new players, HTTP status
+        (202 without ids if the write is queued but not committed yet, 503
+        if the write-behind queue did not take it in time)
+    """
+    players = request.get_json(silent=True)
+    try:
+        player_ids = add_players(players)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except WriteTimeoutError as e:
+        return jsonify({"error": str(e)}), 503
+
+    if writes_deferred():
+        return jsonify(
+            {"message": f"Queued {len(players)} players for adding"}
+        ), 202
+
+    return jsonify(
+        {
+            "message": f"Successfully added {len(player_ids)} players",
+            "ids": player_ids,
+        }
     ), 201
 
 
-def get_player_info_route(player_id):
+@with_season
+def get_player_info_route(player_id, season):
     """Get detailed information for a specific player.
 
     Args:
         player_id (int): ID of player to retrieve
+        season (str): Season the player must belong to
 
     Returns:
         tuple: JSON response with player info and HTTP status code
     """
     try:
-        player_info = player_info_sql(player_id)
+        player_info = player_info_sql(player_id, season)
         if len(player_info) != 1:
             raise Exception("Player ID Unknown")
         return jsonify(player_info[0]), 200
@@ -108,6 +275,18 @@ def register_player_routes(app):
         if request.method == "POST":
             return add_player_route()
 
+    @app.route(f"{BASE_URL}/batch", methods=["POST", "DELETE"])
+    def batch_route():
+        """Route handler for adding or deleting many players at once."""
+        if request.method == "POST":
+            return add_players_route()
+        return delete_players_route()
+
+    @app.route(f"{BASE_URL}/export", methods=["GET"])
+    def export_route():
+        """Route handler for exporting all seasons of player data."""
+        return export_players_route()
+
     @app.route(f"{BASE_URL}/<int:player_id>", methods=["DELETE"])
     def delete_route(player_id):
         """Route handler for deleting a player."""
@@ -0,0 +1,37 @@
+"""Season API route definitions and handlers.
+
+This module provides the Flask route listing the seasons in the database,
+i.e. the valid values of the other routes' ``?season=`` argument.
+"""
+
+from flask import jsonify
+
+from app.data_utils.sql_utils import list_seasons_sql
+from app.route_utils.decorators import conditional_get
+from app.route_utils.response_cache import cached_response
+
+BASE_URL = "/api/seasons"
+
+
+@conditional_get
+@cached_response
+def list_seasons():
+    """Retrieve all seasons, oldest first.
+
+    Returns:
+        tuple: JSON response with season list and HTTP status code
+    """
+    return jsonify({"seasons": list_seasons_sql()}), 200
+
+
+def register_season_routes(app):
+    """Register season-related routes with the Flask application.
+
+    Args:
+        app: Flask application instance
+    """
+
+    @app.route(f"{BASE_URL}", methods=["GET"])
+    def list_seasons_route():
+        """Route handler for listing all seasons."""
+        return list_seasons()
@@ -1,34 +1,42 @@
 """Team API route definitions and handlers.
 
 This module provides Flask routes and handlers for team-related operations,
-specifically listing players by team.
+specifically listing players by team in the season given by ``?season=``
+(``DEFAULT_SEASON`` if omitted).
 """
 
 from flask import jsonify
 
 from app.data_utils.sql_utils import list_players_per_team_sql
 from app.route_utils.decorators import (
+    conditional_get,
     log_request_response,
     log_request_response_time,
     validate_team,
+    with_season,
 )
+from app.route_utils.response_cache import cached_response
 
 BASE_URL = "/api/teams"
 
 
+@with_season
 @validate_team
 @log_request_response
 @log_request_response_time
-def list_players_per_team(team):
+@conditional_get
+@cached_response
+def list_players_per_team(team, season):
     """List all players for a specific team.
 
     Args:
         team (str): Team identifier to filter players
+        season (str): Season to list
 
     Returns:
         tuple: JSON response containing team's players and HTTP status code
     """
-    list_of_players = list_players_per_team_sql(team)
+    list_of_players = list_players_per_team_sql(team, season)
     to_return = {team: list_of_players}
     return jsonify(to_return), 200
 
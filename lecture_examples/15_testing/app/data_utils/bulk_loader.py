@@ -0,0 +1,170 @@
+"""Bulk ingest of large row streams into SQLite.
+
+This module loads rows in fixed-size chunks, one transaction per chunk,
+with journaling and syncing relaxed for the duration of the load and the
+table's indexes rebuilt once at the end instead of updated row by row.
+Numeric columns are typed inside SQLite: empty strings become NULL and the
+column affinity of the declared type converts the rest, which is much
+cheaper than converting every value in Python first.
+"""
+
+import itertools
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any, NamedTuple
+
+DEFAULT_CHUNK_SIZE = 50_000
+NUMERIC_TYPES = ("INT", "REAL", "FLOA", "DOUB", "NUM")
+
+
+class LoadStats(NamedTuple):
+    """Summary of a bulk load."""
+
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        """Average load throughput."""
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def typed_placeholders(
+    conn: sqlite3.Connection, table_name: str, headers: Sequence[str]
+) -> list[str]:
+    """Build one insert placeholder per column from the table definition.
+
+    Numeric columns get ``NULLIF(?, '')`` so missing CSV values are stored
+    as NULL rather than empty text; every other column is a plain ``?``.
+
+    Args:
+        conn: SQLite connection
+        table_name: Name of the existing table
+        headers: Column names in row order
+
+    Returns:
+        List of placeholders aligned with headers
+    """
+    declared = {
+        row[1]: row[2].upper()
+        for row in conn.execute(f"PRAGMA table_info({table_name})")
+    }
+    return [
+        "NULLIF(?, '')"
+        if any(kind in declared.get(name, "") for kind in NUMERIC_TYPES)
+        else "?"
+        for name in headers
+    ]
+
+
+@contextmanager
+def bulk_load_pragmas(
+    conn: sqlite3.Connection, journal_mode: str = "OFF"
+) -> Iterator[None]:
+    """Relax durability settings during a load and restore them after.
+
+    With ``journal_mode=OFF`` a crash mid-load can leave the file
+    unusable, so only use it when the load can be redone from scratch.
+
+    Args:
+        conn: SQLite connection
+        journal_mode: Journal mode to use while loading (OFF or WAL)
+    """
+    conn.commit()
+    previous_journal = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    previous_sync = conn.execute("PRAGMA synchronous").fetchone()[0]
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    conn.execute("PRAGMA synchronous=OFF")
+    try:
+        yield
+    finally:
+        conn.commit()
+        conn.execute(f"PRAGMA synchronous={previous_sync}")
+        conn.execute(f"PRAGMA journal_mode={previous_journal}")
+
+
+@contextmanager
+def deferred_indexes(
+    conn: sqlite3.Connection, table_name: str
+) -> Iterator[list[str]]:
+    """Drop a table's indexes for the load and rebuild them afterwards.
+
+    Args:
+        conn: SQLite connection
+        table_name: Table whose explicit indexes are deferred
+
+    Yields:
+        Names of the indexes that will be rebuilt
+    """
+    index_sql = conn.execute(
+        "SELECT name, sql FROM sqlite_master "
+        "WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table_name,),
+    ).fetchall()
+    with conn:
+        for name, _ in index_sql:
+            conn.execute(f"DROP INDEX {name}")
+    try:
+        yield [name for name, _ in index_sql]
+    finally:
+        with conn:
+            for _, sql in index_sql:
+                conn.execute(sql)
+
+
+def bulk_load_rows(
+    conn: sqlite3.Connection,
+    table_name: str,
+    headers: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    journal_mode: str = "OFF",
+) -> LoadStats:
+    """Insert rows into an existing table in chunked transactions.
+
+    Args:
+        conn: SQLite connection
+        table_name: Name of the existing table
+        headers: Column names matching each row
+        rows: Rows to insert, consumed lazily
+        chunk_size: Rows per transaction
+        journal_mode: Journal mode to use while loading (OFF or WAL)
+
+    Returns:
+        LoadStats: Number of rows loaded and elapsed time
+    """
+    placeholders = typed_placeholders(conn, table_name, headers)
+    insert_sql = (
+        f"INSERT INTO {table_name} ({','.join(headers)})"
+        f" VALUES ({','.join(placeholders)})"
+    )
+
+    start = time.perf_counter()
+    total = 0
+    rows = iter(rows)
+    with (
+        bulk_load_pragmas(conn, journal_mode),
+        deferred_indexes(conn, table_name),
+    ):
+        while True:
+            with conn:
+                cur = conn.executemany(
+                    insert_sql, itertools.islice(rows, chunk_size)
+                )
+            if cur.rowcount <= 0:
+                break
+            total += cur.rowcount
+            elapsed = time.perf_counter() - start
+            print(
+                f"{table_name}: {total:,} rows loaded "
+                f"({total / elapsed:,.0f} rows/s)"
+            )
+
+    stats = LoadStats(total, time.perf_counter() - start)
+    print(
+        f"Loaded {stats.rows:,} rows to {table_name} in "
+        f"{stats.seconds:.2f}s ({stats.rows_per_sec:,.0f} rows/s)"
+    )
+    return stats
@@ -0,0 +1,155 @@
+"""In-process LRU/TTL cache for read-only query functions.
+
+Results are cached per function and arguments and are dropped as soon as
+the data version changes, i.e. after any write committed through
+``sql_utils`` by any process on the database. The time to live only
+limits how long writes made outside of the app go unnoticed.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from functools import wraps
+from typing import Any, TypeVar
+
+from app.data_utils.data_version import DataVersion, current_data_version
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+DEFAULT_MAXSIZE = int(os.environ.get("QUERY_CACHE_SIZE", "256"))
+DEFAULT_TTL = float(os.environ.get("QUERY_CACHE_TTL", "60"))
+
+
+class QueryCache:
+    """Thread-safe LRU cache with per-entry expiry and hit/miss counters."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """Create an empty cache.
+
+        Args:
+            maxsize: Maximum number of entries kept
+            ttl: Seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[
+            Hashable, tuple[float, DataVersion, Any]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, version: DataVersion) -> tuple[bool, Any]:
+        """Look up a fresh entry.
+
+        Args:
+            key: Cache key
+            version: Current data version
+
+        Returns:
+            Tuple of (found, value)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, entry_version, value = entry
+                if entry_version == version and time.monotonic() < expires:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: Hashable, value: Any, version: DataVersion) -> None:
+        """Store a value computed at the given data version.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            version: Data version the value was computed from
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Report cache counters.
+
+        Returns:
+            Dict with size, limits and hit/miss/eviction counts
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_caches: dict[str, QueryCache] = {}
+
+
+def cached_query(
+    maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL
+) -> Callable[[F], F]:
+    """Cache a read-only function's results by its arguments.
+
+    Cached values are shared between callers and must not be mutated.
+
+    Args:
+        maxsize: Maximum number of cached argument combinations
+        ttl: Seconds a result stays valid
+
+    Returns:
+        Decorator caching the wrapped function
+    """
+
+    def decorator(f: F) -> F:
+        cache = QueryCache(maxsize, ttl)
+        _caches[f.__qualname__] = cache
+
+        @wraps(f)
+        def decorated_function(*args: Any, **kwargs: Any) -> Any:
+            key = (args, tuple(sorted(kwargs.items())))
+            version = current_data_version()
+            found, value = cache.get(key, version)
+            if found:
+                return value
+            value = f(*args, **kwargs)
+            cache.put(key, value, version)
+            return value
+
+        decorated_function.cache = cache  # type: ignore[attr-defined]
+        return decorated_function  # type: ignore
+
+    return decorator
+
+
+def clear_caches() -> None:
+    """Drop the entries of every query cache."""
+    for cache in _caches.values():
+        cache.clear()
+
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    """Report the counters of every query cache.
+
+    Returns:
+        Dict mapping function name to its cache stats
+    """
+    return {name: cache.stats() for name, cache in _caches.items()}
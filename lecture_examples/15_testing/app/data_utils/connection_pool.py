@@ -0,0 +1,313 @@
+"""Thread-safe pool of SQLite connections.
+
+This module keeps a bounded set of long-lived SQLite connections that are
+checked out by request threads and returned when the work is done, so the
+app no longer opens (and leaks) a new connection for every query.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from flask import Flask
+
+from app.data_utils.loading_utils import DB_PATH, create_db_connection
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_IDLE_TIMEOUT = 300.0
+DEFAULT_CHECKOUT_TIMEOUT = 30.0
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no connection becomes available in time."""
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections shared between threads.
+
+    Connections are handed out most-recently-used first, checked with a
+    cheap query before reuse and closed once they sit idle for longer
+    than ``idle_timeout`` seconds.
+    """
+
+    def __init__(
+        self,
+        db_path: str | None = None,
+        max_size: int = DEFAULT_POOL_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        checkout_timeout: float = DEFAULT_CHECKOUT_TIMEOUT,
+    ) -> None:
+        """Create an empty pool; connections are opened on demand.
+
+        Args:
+            db_path: Path to database file. Defaults to DB_PATH.
+            max_size: Maximum number of open connections.
+            idle_timeout: Seconds an idle connection is kept before closing.
+            checkout_timeout: Seconds to wait for a free connection.
+        """
+        self.db_path = db_path or DB_PATH
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+
+        self._idle: deque[tuple[sqlite3.Connection, float]] = deque()
+        self._cond = threading.Condition()
+        self._open = 0
+        self._stats = {
+            "checkouts": 0,
+            "checkins": 0,
+            "waits": 0,
+            "wait_time_s": 0.0,
+            "created": 0,
+            "closed": 0,
+            "health_check_failures": 0,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection usable from any thread."""
+        return create_db_connection(self.db_path, check_same_thread=False)
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        """Close a connection and release its slot (lock must be held)."""
+        conn.close()
+        self._open -= 1
+        self._stats["closed"] += 1
+        self._cond.notify()
+
+    def _prune_idle(self) -> None:
+        """Close connections idle past the timeout (lock must be held)."""
+        now = time.monotonic()
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            conn, _ = self._idle.popleft()
+            self._discard(conn)
+
+    def _reserve(self) -> sqlite3.Connection | None:
+        """Take an idle connection or reserve a slot for a new one.
+
+        Returns:
+            An idle connection, or None if the caller should open one.
+
+        Raises:
+            PoolTimeoutError: If the pool stays exhausted too long.
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+        wait_start = None
+        with self._cond:
+            while True:
+                self._prune_idle()
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                    break
+                if self._open < self.max_size:
+                    self._open += 1
+                    conn = None
+                    break
+                if wait_start is None:
+                    wait_start = time.monotonic()
+                    self._stats["waits"] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"No connection available after "
+                        f"{self.checkout_timeout}s (max_size={self.max_size})"
+                    )
+                self._cond.wait(remaining)
+            if wait_start is not None:
+                self._stats["wait_time_s"] += time.monotonic() - wait_start
+        return conn
+
+    def checkout(self) -> sqlite3.Connection:
+        """Borrow a healthy connection from the pool.
+
+        Returns:
+            sqlite3.Connection: Connection that must be given back with
+            ``checkin``.
+        """
+        while True:
+            conn = self._reserve()
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._stats["created"] += 1
+                break
+            try:
+                conn.execute("SELECT 1")
+                break
+            except sqlite3.Error:
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                    self._discard(conn)
+
+        with self._cond:
+            self._stats["checkouts"] += 1
+        return conn
+
+    def checkin(self, conn: sqlite3.Connection) -> None:
+        """Return a connection to the pool.
+
+        Any transaction left open by the borrower is rolled back so the
+        next user starts from a clean state.
+
+        Args:
+            conn: Connection previously obtained from ``checkout``
+        """
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            with self._cond:
+                self._discard(conn)
+            return
+
+        with self._cond:
+            self._stats["checkins"] += 1
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Context manager that checks a connection out and back in.
+
+        Yields:
+            sqlite3.Connection: Pooled connection
+        """
+        conn = self.checkout()
+        try:
+            yield conn
+        finally:
+            self.checkin(conn)
+
+    def close_all(self) -> None:
+        """Close every idle connection held by the pool."""
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+
+    def reset_after_fork(self) -> None:
+        """Forget the connections inherited from a parent process.
+
+        SQLite connections must not be used across ``fork``, and closing
+        them in the child would also affect the parent, so they are simply
+        dropped; the child opens its own connections on demand.
+        """
+        self._idle = deque()
+        self._cond = threading.Condition()
+        self._open = 0
+        self._stats = dict.fromkeys(self._stats, 0)
+        self._stats["wait_time_s"] = 0.0
+
+    def metrics(self) -> dict[str, Any]:
+        """Report pool usage counters.
+
+        Returns:
+            Dict with checkout/wait counters and open/idle handle counts
+        """
+        with self._cond:
+            metrics: dict[str, Any] = dict(self._stats)
+            metrics["open"] = self._open
+            metrics["idle"] = len(self._idle)
+            metrics["in_use"] = self._open - len(self._idle)
+            metrics["max_size"] = self.max_size
+        return metrics
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def init_pool(db_path: str | None = None, **kwargs: Any) -> ConnectionPool:
+    """Create the process-wide pool, closing any previous one.
+
+    Results cached from the previous pool's database are dropped, see
+    ``data_version``.
+
+    Args:
+        db_path: Path to database file. Defaults to DB_PATH.
+        **kwargs: Extra ``ConnectionPool`` settings
+
+    Returns:
+        ConnectionPool: The newly installed pool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        _pool = ConnectionPool(db_path, **kwargs)
+    return _pool
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide pool, creating a default one if needed.
+
+    Returns:
+        ConnectionPool: Shared connection pool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                max_size=int(
+                    os.environ.get("DB_POOL_SIZE", DEFAULT_POOL_SIZE)
+                ),
+                idle_timeout=float(
+                    os.environ.get(
+                        "DB_POOL_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT
+                    )
+                ),
+                checkout_timeout=float(
+                    os.environ.get(
+                        "DB_POOL_CHECKOUT_TIMEOUT", DEFAULT_CHECKOUT_TIMEOUT
+                    )
+                ),
+            )
+        return _pool
+
+
+def reinit_after_fork() -> None:
+    """Give a freshly forked worker process its own connections.
+
+    Meant for pre-fork servers (see ``gunicorn.conf.py``): the pool keeps
+    its settings but none of the parent's connections.
+    """
+    global _pool_lock
+    _pool_lock = threading.Lock()
+    if _pool is not None:
+        _pool.reset_after_fork()
+
+
+def init_app(app: Flask) -> ConnectionPool:
+    """Set up the connection pool for a Flask application.
+
+    Reads ``DB_PATH``, ``DB_POOL_SIZE``, ``DB_POOL_IDLE_TIMEOUT`` and
+    ``DB_POOL_CHECKOUT_TIMEOUT`` from the app config.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        ConnectionPool: Pool used by the application
+    """
+    pool = init_pool(
+        app.config.get("DB_PATH"),
+        max_size=app.config.get("DB_POOL_SIZE", DEFAULT_POOL_SIZE),
+        idle_timeout=app.config.get(
+            "DB_POOL_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT
+        ),
+        checkout_timeout=app.config.get(
+            "DB_POOL_CHECKOUT_TIMEOUT", DEFAULT_CHECKOUT_TIMEOUT
+        ),
+    )
+    app.extensions["db_pool"] = pool
+    return pool
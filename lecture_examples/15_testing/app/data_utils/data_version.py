@@ -0,0 +1,126 @@
+"""Version of the data, shared by every process using the database.
+
+Every write through ``sql_utils`` increments the one-row ``data_version``
+table inside its own transaction, so the new version becomes visible to
+every process on the database, e.g. every gunicorn worker, exactly when
+the write does. Anything derived from the data (cached query results,
+validation sets, HTTP caches) is stored with the version it was built
+from and is stale as soon as the version moves.
+
+Reading the version costs a query, so inside a request it is read once
+and kept for the rest of the request. A local counter completes it: it
+moves when this process writes, so the rest of the writing request reads
+the version again, and when the process switches to another database.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+from flask import g, has_request_context
+
+from app.data_utils.connection_pool import ConnectionPool, get_pool
+from app.data_utils.queries import execute_named
+
+CREATE_TABLE_SQL = (
+    "CREATE TABLE IF NOT EXISTS data_version "
+    "(id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)"
+)
+
+
+class DataVersion(NamedTuple):
+    """Version of the data as seen by this process."""
+
+    local: int
+    shared: int
+
+
+_lock = threading.Lock()
+_local = 0
+_pool: ConnectionPool | None = None
+
+
+def bump_data_version() -> int:
+    """Record that this process changed the data.
+
+    Returns:
+        The new local version number
+    """
+    global _local
+    with _lock:
+        _local += 1
+        return _local
+
+
+def _local_version() -> int:
+    """Get the local version, moving it when the pool was replaced."""
+    global _local, _pool
+    pool = get_pool()
+    if pool is not _pool:  # maybe another database
+        with _lock:
+            _pool = pool
+            _local += 1
+    return _local
+
+
+def read_shared_version(conn: sqlite3.Connection) -> int:
+    """Read the version stored in the database.
+
+    Args:
+        conn: SQLite connection
+
+    Returns:
+        The stored version, 0 if the database has never been written to
+    """
+    try:
+        row = execute_named(conn, "data_version").fetchone()
+    except sqlite3.OperationalError:  # no data_version table yet
+        return 0
+    return row[0] if row else 0
+
+
+def record_write(conn: sqlite3.Connection) -> None:
+    """Increment the stored version inside the caller's write transaction.
+
+    The table is created on the first write. Its first version is the
+    current time in nanoseconds, so a rebuilt database never repeats the
+    versions of the one it replaces.
+
+    Args:
+        conn: SQLite connection with the write transaction open
+    """
+    conn.execute(CREATE_TABLE_SQL)
+    execute_named(conn, "bump_data_version", {"first": time.time_ns()})
+
+
+def current_data_version() -> DataVersion:
+    """Get the current data version.
+
+    Inside a request the stored version is read once, on first use.
+
+    Returns:
+        DataVersion: Local and stored version numbers
+    """
+    local = _local_version()
+    if has_request_context():
+        version = g.get("data_version")
+        if version is not None and version.local == local:
+            return version
+    with get_pool().connection() as conn:
+        version = DataVersion(local, read_shared_version(conn))
+    if has_request_context():
+        g.data_version = version
+    return version
+
+
+def data_version_tag() -> str:
+    """Get a tag naming the stored data version, e.g. for an ETag.
+
+    Only the stored version goes into the tag, so every process on the
+    database gives the same tag for the same data.
+
+    Returns:
+        Opaque string identifying the current data version
+    """
+    return f"{current_data_version().shared:x}"
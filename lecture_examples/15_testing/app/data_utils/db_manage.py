@@ -6,11 +6,17 @@ This module contains the basic access method for the DB Management functions2
 import argparse
 import os
 
+from .data_version import record_write
+from .index_utils import analyze, create_indexes, report_query_plans
 from .loading_utils import (
     create_and_load_basketball_data,
+    create_db_connection,
     create_empty_sqlite_db,
+    create_seasons_table,
     rm_db,
+    tune_database,
 )
+from .stock_ingest import load_stock_archives
 
 DATA_DIR = os.environ["DATA_DIR"]
 
@@ -20,7 +26,16 @@ def db_manage_function():
 
     Moved to here in order to get into autodocs
     """
-    command_list = ["db_create", "db_load", "db_rm", "db_clean"]
+    command_list = [
+        "db_create",
+        "db_load",
+        "db_rm",
+        "db_clean",
+        "db_index",
+        "db_analyze",
+        "db_load_stocks",
+        "db_tune",
+    ]
     parser = argparse.ArgumentParser(description="Manage the SQLite database.")
 
     parser.add_argument(
@@ -35,12 +50,41 @@ def db_manage_function():
         create_empty_sqlite_db()
     if args.command == "db_load":
         create_and_load_basketball_data(csv_path, table_name)
+        conn = create_db_connection()
+        create_indexes(conn)
+        with conn:  # running workers drop what they cached
+            record_write(conn)
     if args.command == "db_rm":
         rm_db()
     if args.command == "db_clean":
         rm_db()
         create_empty_sqlite_db()
-        create_and_load_basketball_data(csv_path, table_name)    
+        create_and_load_basketball_data(csv_path, table_name)
+        conn = create_db_connection()
+        create_indexes(conn)
+        with conn:
+            record_write(conn)
+    if args.command == "db_index":
+        conn = create_db_connection()
+        create_indexes(conn)
+        create_seasons_table(conn)
+        with conn:
+            record_write(conn)
+        analyze(conn)
+    if args.command == "db_analyze":
+        conn = create_db_connection()
+        analyze(conn)
+        report = report_query_plans(conn)
+        if report.full_scans:
+            raise SystemExit("Full table scans found in the queries above")
+        if report.not_explained:
+            raise SystemExit(
+                "Queries above could not be explained, run db_index first"
+            )
+    if args.command == "db_load_stocks":
+        load_stock_archives(create_db_connection(), DATA_DIR)
+    if args.command == "db_tune":
+        tune_database()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,256 @@
+"""Batched fetching of SQLite query results in several output shapes.
+
+This module pulls rows with ``fetchmany`` and turns them into the shape the
+caller actually needs, so routes that only want tuples or one column do not
+pay for building a dict per row.
+"""
+
+import sqlite3
+import time
+from collections.abc import Iterator, Sequence
+from functools import lru_cache
+from itertools import repeat
+from typing import Any, Literal
+
+from app.data_utils.query_stats import record_query
+
+Shape = Literal["dicts", "tuples", "columns", "numpy", "rows"]
+SHAPES: tuple[str, ...] = ("dicts", "tuples", "columns", "numpy", "rows")
+DEFAULT_BATCH_SIZE = 1000
+
+
+class RowList(Sequence):
+    """Tuple rows plus their column names, read as a list of dicts.
+
+    Keeps the compact tuples fetched from SQLite; a dict is only built
+    when a row is accessed. The JSON provider in ``route_utils`` builds
+    all of them at once with ``as_dicts`` when the response is encoded,
+    so cached results stay tuples.
+    """
+
+    __slots__ = ("columns", "rows")
+
+    def __init__(self, columns: Sequence[str], rows: list[tuple]) -> None:
+        """Wrap fetched rows.
+
+        Args:
+            columns: Column names, in row order
+            rows: Rows as returned by the cursor
+        """
+        self.columns = tuple(columns)
+        self.rows = rows
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return len(self.rows)
+
+    def __getitem__(self, index: Any) -> Any:
+        """Row (or slice of rows) as dicts."""
+        if isinstance(index, slice):
+            return self.as_dicts(self.rows[index])
+        return dict(zip(self.columns, self.rows[index]))
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        """Iterate over the rows as dicts."""
+        return map(dict, map(zip, repeat(self.columns), self.rows))
+
+    def __eq__(self, other: object) -> bool:
+        """Compare equal to another RowList or list of the same dicts."""
+        if isinstance(other, RowList):
+            return (self.columns, self.rows) == (other.columns, other.rows)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def as_dicts(self, rows: list[tuple] | None = None) -> list[dict]:
+        """Build every dict at once, e.g. for an encoder.
+
+        Args:
+            rows: Rows to convert, defaults to all of them
+
+        Returns:
+            List of one dict per row
+        """
+        rows = self.rows if rows is None else rows
+        return list(map(dict, map(zip, repeat(self.columns), rows)))
+
+
+@lru_cache(maxsize=256)
+def _headers(description: tuple[tuple[Any, ...], ...]) -> tuple[str, ...]:
+    """Column names for a cursor description, cached per query shape."""
+    return tuple(column[0] for column in description)
+
+
+def cursor_headers(cursor: sqlite3.Cursor) -> tuple[str, ...]:
+    """Get the column names of the last executed statement.
+
+    Args:
+        cursor: Cursor that has executed a query
+
+    Returns:
+        Tuple of column names
+    """
+    return _headers(cursor.description)
+
+
+def _numpy_dtype(headers: Sequence[str], rows: list[tuple]) -> list[tuple]:
+    """Pick a NumPy dtype per column from the Python types in the rows."""
+    dtype = []
+    for i, name in enumerate(headers):
+        kinds = {type(row[i]) for row in rows}
+        if kinds <= {int}:
+            dtype.append((name, "i8"))
+        elif kinds and kinds <= {int, float, type(None)}:
+            dtype.append((name, "f8"))
+        else:
+            dtype.append((name, "O"))
+    return dtype
+
+
+def fetch_all(
+    cursor: sqlite3.Cursor,
+    shape: Shape = "dicts",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Any:
+    """Fetch every remaining row from a cursor in the requested shape.
+
+    Args:
+        cursor: Cursor that has executed a query
+        shape: One of ``dicts`` (list of dicts), ``tuples`` (list of
+            tuples), ``columns`` (dict of column name to list of values),
+            ``numpy`` (NumPy structured array) or ``rows`` (``RowList``)
+        batch_size: Number of rows pulled per ``fetchmany`` call
+
+    Returns:
+        Query results in the requested shape
+
+    Raises:
+        ValueError: If shape is not one of SHAPES
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown shape {shape!r}, expected one of {SHAPES}")
+
+    headers = cursor_headers(cursor)
+    if shape == "dicts":
+        records: list[dict[str, Any]] = []
+        while batch := cursor.fetchmany(batch_size):
+            records.extend([dict(zip(headers, row)) for row in batch])
+        return records
+
+    rows: list[tuple] = []
+    while batch := cursor.fetchmany(batch_size):
+        rows.extend(batch)
+
+    if shape == "tuples":
+        return rows
+    if shape == "rows":
+        return RowList(headers, rows)
+    if shape == "columns":
+        if not rows:
+            return {name: [] for name in headers}
+        return dict(zip(headers, map(list, zip(*rows))))
+
+    import numpy as np  # only needed for this shape
+
+    return np.array(rows, dtype=_numpy_dtype(headers, rows))
+
+
+def _row_count(result: Any, shape: Shape) -> int:
+    """Number of rows in a ``fetch_all`` result."""
+    if shape == "columns":
+        return len(next(iter(result.values()), []))
+    return len(result)
+
+
+def execute_query(
+    conn: sqlite3.Connection,
+    sql_query: str,
+    params: Sequence[Any] | dict[str, Any] = (),
+    shape: Shape = "dicts",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Any:
+    """Execute a SQL query and return the results in the requested shape.
+
+    Args:
+        conn: SQLite connection
+        sql_query: SQL query to execute
+        params: Query parameters
+        shape: Output shape, see ``fetch_all``
+        batch_size: Number of rows pulled per ``fetchmany`` call
+
+    Returns:
+        Query results in the requested shape
+    """
+    start = time.perf_counter_ns()
+    cursor = conn.execute(sql_query, params)
+    try:
+        result = fetch_all(cursor, shape, batch_size)
+    finally:
+        cursor.close()
+    record_query(time.perf_counter_ns() - start, _row_count(result, shape))
+    return result
+
+
+def iter_query_batches(
+    conn: sqlite3.Connection,
+    sql_query: str,
+    params: Sequence[Any] | dict[str, Any] = (),
+    shape: Literal["dicts", "tuples"] = "tuples",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[list[Any]]:
+    """Execute a SQL query and yield its results one batch at a time.
+
+    Only one batch is held in memory, so the caller can process result
+    sets of any size with constant memory. The cursor is closed when the
+    generator is exhausted or closed.
+
+    Args:
+        conn: SQLite connection
+        sql_query: SQL query to execute
+        params: Query parameters
+        shape: ``tuples`` or ``dicts`` for the rows of each batch
+        batch_size: Number of rows per batch
+
+    Yields:
+        Lists of at most ``batch_size`` rows
+    """
+    start = time.perf_counter_ns()
+    cursor = conn.execute(sql_query, params)
+    try:
+        headers = cursor_headers(cursor)
+        first = True
+        while batch := cursor.fetchmany(batch_size):
+            record_query(time.perf_counter_ns() - start, len(batch), first)
+            first = False
+            if shape == "dicts":
+                yield [dict(zip(headers, row)) for row in batch]
+            else:
+                yield batch
+            start = time.perf_counter_ns()
+    finally:
+        cursor.close()
+
+
+def iter_query(
+    conn: sqlite3.Connection,
+    sql_query: str,
+    params: Sequence[Any] | dict[str, Any] = (),
+    shape: Literal["dicts", "tuples"] = "tuples",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[Any]:
+    """Execute a SQL query and yield its rows one at a time.
+
+    Args:
+        conn: SQLite connection
+        sql_query: SQL query to execute
+        params: Query parameters
+        shape: ``tuples`` or ``dicts`` for each row
+        batch_size: Number of rows pulled per ``fetchmany`` call
+
+    Yields:
+        One row per result
+    """
+    for batch in iter_query_batches(
+        conn, sql_query, params, shape, batch_size
+    ):
+        yield from batch
@@ -0,0 +1,199 @@
+"""Declarative index management for the player_stats table.
+
+Every query in ``queries`` filters on ``season`` (and often on
+``team_abbreviation``), so the indexes below lead with ``season`` and
+carry the selected columns to make the lookups covering. ``id`` is the
+rowid and is stored in every index implicitly.
+"""
+
+import sqlite3
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from app.data_utils.queries import QUERIES, Query
+
+# Prefix of the plan step recorded for a query that could not be explained
+NOT_EXPLAINED = "not explained: "
+
+
+class IndexSpec(NamedTuple):
+    """Definition of a single index."""
+
+    name: str
+    table: str
+    columns: tuple[str, ...]
+
+    def create_sql(self) -> str:
+        """SQL statement creating this index if it is missing."""
+        return (
+            f"CREATE INDEX IF NOT EXISTS {self.name} "
+            f"ON {self.table} ({', '.join(self.columns)})"
+        )
+
+
+PLAYER_STATS_INDEXES: tuple[IndexSpec, ...] = (
+    # team filters: teams list, players per team
+    IndexSpec(
+        "idx_player_stats_season_team_player",
+        "player_stats",
+        ("season", "team_abbreviation", "player_name"),
+    ),
+    # colleges per team
+    IndexSpec(
+        "idx_player_stats_season_team_college",
+        "player_stats",
+        ("season", "team_abbreviation", "college"),
+    ),
+    # all colleges / all players of a season
+    IndexSpec(
+        "idx_player_stats_season_college",
+        "player_stats",
+        ("season", "college"),
+    ),
+    IndexSpec(
+        "idx_player_stats_season_player",
+        "player_stats",
+        ("season", "player_name"),
+    ),
+    # id lookups and id-ordered walks within a season
+    IndexSpec(
+        "idx_player_stats_season_id",
+        "player_stats",
+        ("season", "id"),
+    ),
+)
+
+
+def create_indexes(
+    conn: sqlite3.Connection,
+    indexes: tuple[IndexSpec, ...] = PLAYER_STATS_INDEXES,
+) -> None:
+    """Create any missing indexes in a single transaction.
+
+    Args:
+        conn: SQLite connection
+        indexes: Index definitions to apply
+    """
+    with conn:
+        for index in indexes:
+            conn.execute(index.create_sql())
+    print(f"Applied {len(indexes)} indexes")
+
+
+def drop_indexes(
+    conn: sqlite3.Connection,
+    indexes: tuple[IndexSpec, ...] = PLAYER_STATS_INDEXES,
+) -> None:
+    """Drop the given indexes if they exist.
+
+    Args:
+        conn: SQLite connection
+        indexes: Index definitions to drop
+    """
+    with conn:
+        for index in indexes:
+            conn.execute(f"DROP INDEX IF EXISTS {index.name}")
+
+
+def analyze(conn: sqlite3.Connection) -> None:
+    """Refresh the query planner statistics.
+
+    Args:
+        conn: SQLite connection
+    """
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def is_full_scan(plan_detail: str, table: str = "player_stats") -> bool:
+    """Check whether a plan step reads every row of the table.
+
+    Walking a whole index, e.g. ``SCAN player_stats USING COVERING INDEX
+    ...``, reads every row too and counts as a full scan.
+
+    Args:
+        plan_detail: ``detail`` column of an EXPLAIN QUERY PLAN row
+        table: Table name to look for
+
+    Returns:
+        True if the step is a table or index scan
+    """
+    return any(
+        plan_detail == scan or plan_detail.startswith(f"{scan} ")
+        for scan in (f"SCAN {table}", f"SCAN TABLE {table}")
+    )
+
+
+def _explain(conn: sqlite3.Connection, query: Query) -> list[str]:
+    """Plan steps of one query, or why it could not be explained."""
+    try:
+        rows = conn.execute(
+            f"EXPLAIN QUERY PLAN {query.sql}", query.sample_params or {}
+        ).fetchall()
+    except sqlite3.OperationalError as e:  # e.g. table not created yet
+        return [f"{NOT_EXPLAINED}{e}"]
+    return [row[3] for row in rows]
+
+
+class PlanReport(NamedTuple):
+    """Queries that failed the plan check of ``report_query_plans``."""
+
+    full_scans: list[str]
+    not_explained: list[str]
+
+
+def explain_queries(
+    conn: sqlite3.Connection,
+    queries: Iterable[Query] = QUERIES.values(),
+) -> dict[str, list[str]]:
+    """Get the EXPLAIN QUERY PLAN steps of each query.
+
+    A query that cannot be prepared, e.g. one reading the ``seasons``
+    table of a database that does not have it yet, gets a single step
+    starting with ``NOT_EXPLAINED`` instead.
+
+    Args:
+        conn: SQLite connection
+        queries: Queries to explain
+
+    Returns:
+        Dict mapping query name to its plan steps
+    """
+    return {query.name: _explain(conn, query) for query in queries}
+
+
+def report_query_plans(
+    conn: sqlite3.Connection,
+    queries: Iterable[Query] = QUERIES.values(),
+) -> PlanReport:
+    """Print the plan of each query and flag unexpected full scans.
+
+    Queries on tables that do not exist yet are listed as not explained
+    instead of raising; their plans are unchecked, so they are reported
+    separately.
+
+    Args:
+        conn: SQLite connection
+        queries: Queries to explain
+
+    Returns:
+        PlanReport: Names of queries that scan the whole table without
+        being allowed to, and of queries that could not be explained
+    """
+    queries = list(queries)
+    plans = explain_queries(conn, queries)
+    report = PlanReport([], [])
+    for query in queries:
+        full_scan = any(is_full_scan(step) for step in plans[query.name])
+        flag = "FULL SCAN" if full_scan else "ok"
+        if any(step.startswith(NOT_EXPLAINED) for step in plans[query.name]):
+            flag = "not explained"
+            report.not_explained.append(query.name)
+        elif full_scan and query.allow_full_scan:
+            flag = "full scan (expected)"
+        elif full_scan:
+            report.full_scans.append(query.name)
+        print(f"{query.name}: {flag}")
+        for step in plans[query.name]:
+            print(f"    {step}")
+    return report
@@ -4,28 +4,45 @@ This module provides functions for creating, managing and querying SQLite,
 as well as loading and transforming player statistics data.
 """
 
-import csv
 import os
 import sqlite3
 from pathlib import Path
 
 import pandas as pd
 
+from app.data_utils.bulk_loader import DEFAULT_CHUNK_SIZE, bulk_load_rows
+from app.data_utils.fetch_utils import execute_query
+from app.data_utils.zip_utils import open_csv
+
 DB_PATH = os.environ["DB_PATH"]
 DATA_DIR = os.environ["DATA_DIR"]
+# Season served when a request or function call does not name one.
+DEFAULT_SEASON = os.environ.get("DEFAULT_SEASON", "2022-23")
+# Compiled statements kept per connection. Comfortably holds every query in
+# ``queries``; only useful if the SQL text does not change with the values.
+STATEMENT_CACHE_SIZE = 128
+# Per-connection settings, see ``configure_connection``. Writers wait up to
+# the busy timeout for the write lock instead of failing with "database is
+# locked"; mmap and page cache sizes are in bytes and KiB.
+BUSY_TIMEOUT = float(os.environ.get("DB_BUSY_TIMEOUT", "5"))
+MMAP_SIZE = int(os.environ.get("DB_MMAP_SIZE", "268435456"))
+CACHE_SIZE_KIB = int(os.environ.get("DB_CACHE_SIZE_KIB", "65536"))
+
+
+def load_data_pandas(season: str = DEFAULT_SEASON) -> pd.DataFrame:
+    """Load one season's player data into a DataFrame.
 
-
-def load_data_pandas() -> pd.DataFrame:
-    """Load current season's player data into a DataFrame.
+    Args:
+        season: Season to load, e.g. ``2022-23``
 
     Returns:
-        pd.DataFrame: Player statistics filtered for current season
+        pd.DataFrame: Player statistics filtered for the season
         with selected columns.
     """
     file_path = "/app/src/data/all_seasons.csv"
     players_df = pd.read_csv(file_path)
     players_df = players_df.loc[
-        players_df.season == "2022-23",
+        players_df.season == season,
         [
             "player_name",
             "college",
@@ -35,8 +52,11 @@ def load_data_pandas() -> pd.DataFrame:
     return players_df
 
 
-def load_data() -> pd.DataFrame:
-    """Load current season's player data using SQL.
+def load_data(season: str = DEFAULT_SEASON) -> pd.DataFrame:
+    """Load one season's player data using SQL.
+
+    Args:
+        season: Season to load, e.g. ``2022-23``
 
     Returns:
         pd.DataFrame: Player statistics including ID, name, college and team.
@@ -46,19 +66,22 @@ def load_data() -> pd.DataFrame:
             college,
             team_abbreviation
         from player_stats
-    where season = '2022-23';"""
+    where season = :season;"""
 
     players_df = pd.DataFrame(
-        execute_query_return_list_of_dicts_lm(conn, query)
+        execute_query(conn, query, {"season": season}, shape="columns")
     )
     return players_df
 
 
-def create_db_connection(db_path: str | None = None) -> sqlite3.Connection:
+def create_db_connection(
+    db_path: str | None = None, check_same_thread: bool = True
+) -> sqlite3.Connection:
     """Create a connection to the SQLite database.
 
     Args:
         db_path: Path to database file. Defaults to DB_PATH.
+        check_same_thread: Restrict the connection to the creating thread.
 
     Returns:
         sqlite3.Connection: Database connection object.
@@ -73,15 +96,90 @@ def create_db_connection(db_path: str | None = None) -> sqlite3.Connection:
     if not db_file.exists():
         raise FileExistsError(f"Database does not exist at: {db_path}")
 
-    conn = sqlite3.connect(db_file)
+    conn = sqlite3.connect(
+        db_file,
+        timeout=BUSY_TIMEOUT,
+        check_same_thread=check_same_thread,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    configure_connection(conn)
     return conn
 
 
+def configure_connection(conn: sqlite3.Connection) -> None:
+    """Apply the per-connection performance settings.
+
+    Memory-maps up to MMAP_SIZE bytes of the file and keeps up to
+    CACHE_SIZE_KIB of pages in the connection's cache. In WAL mode commits
+    only sync the log at checkpoints (``synchronous=NORMAL``), which is
+    still safe against corruption; rollback-journal databases keep the
+    default ``FULL``. The journal mode itself is stored in the file, see
+    ``enable_wal``.
+
+    Args:
+        conn: SQLite connection
+    """
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    if journal_mode == "wal":
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+
+def enable_wal(conn: sqlite3.Connection) -> str:
+    """Switch the database file to write-ahead logging.
+
+    In WAL mode readers keep reading the last committed data while a
+    writer appends to the log, so writes no longer block readers in other
+    connections or processes. The setting persists in the file.
+
+    Args:
+        conn: SQLite connection
+
+    Returns:
+        str: Journal mode now in effect
+    """
+    conn.commit()
+    journal_mode: str = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    configure_connection(conn)
+    return journal_mode
+
+
+def tune_database(db_path: str | None = None) -> dict[str, object]:
+    """Enable WAL on a database and report the resulting settings.
+
+    Args:
+        db_path: Path to database file. Defaults to DB_PATH.
+
+    Returns:
+        dict: Journal mode, synchronous level, busy timeout (ms), mmap size
+        and cache size as seen by a new connection
+    """
+    conn = create_db_connection(db_path)
+    enable_wal(conn)
+    settings = {
+        name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+        for name in (
+            "journal_mode",
+            "synchronous",
+            "busy_timeout",
+            "mmap_size",
+            "cache_size",
+        )
+    }
+    conn.close()
+    print(f"Database at {db_path or DB_PATH} tuned: {settings}")
+    return settings
+
+
 def execute_query_return_list_of_dicts_lm(
     conn: sqlite3.Connection, sql_query: str
 ) -> list[dict[str, str | int | float | None]]:
     """Execute SQL query and return results as list of dicts (low mem version).
 
+    The whole result is still built in memory; use
+    ``fetch_utils.iter_query`` to stream large results instead.
+
     Args:
         conn: SQLite connection
         sql_query: SQL query to execute
@@ -89,52 +187,37 @@ def execute_query_return_list_of_dicts_lm(
     Returns:
         List[Dict]: Query results as list of dictionaries
     """
-    cursor = conn.cursor()
-    cursor.execute(sql_query)
-    description_info = cursor.description
-
-    headers = [x[0] for x in description_info]
-    return_dict_list = []
-
-    while True:
-        single_result = cursor.fetchone()
-        if not single_result:
-            break
-
-        single_result_dict = dict(zip(headers, single_result))
-        return_dict_list.append(single_result_dict)
-
-    return return_dict_list
+    return execute_query(conn, sql_query, shape="dicts")
 
 
 def load_csv_to_db(
-    conn: sqlite3.Connection, csv_path: str | Path, table_name: str
+    conn: sqlite3.Connection,
+    csv_path: str | Path,
+    table_name: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
 ) -> bool:
     """Load a CSV file into an existing SQLite table.
 
+    Rows are typed to the table's columns and bulk loaded in chunked
+    transactions, see ``bulk_loader.bulk_load_rows``. A ``.zip`` holding a
+    single CSV is streamed straight from the archive without extracting it.
+
     Args:
         conn: SQLite connection
-        csv_path: Path to the CSV file
+        csv_path: Path to the CSV file, or to a zip containing it
         table_name: Name of the existing table
+        chunk_size: Rows per transaction
 
     Returns:
         bool: True if loading was successful
     """
-    csv_file = Path(csv_path)
-    with csv_file.open() as f:
-        reader = csv.reader(f)
+    with open_csv(csv_path) as reader:
         headers = next(reader)[1:]  # Get column names
         headers = ["id"] + headers
 
-        placeholders = ",".join("?" for _ in headers)
-        insert_sql = (
-            f"INSERT INTO {table_name} ({','.join(headers)})"
-            f" VALUES ({placeholders})"
+        bulk_load_rows(
+            conn, table_name, headers, reader, chunk_size=chunk_size
         )
-        cur = conn.cursor()
-        cur.executemany(insert_sql, reader)
-        conn.commit()
-    print(f"Loaded {cur.rowcount} rows to {table_name} successfully")
     return True
 
 
@@ -185,8 +268,36 @@ def create_player_stats_table(conn: sqlite3.Connection) -> None:
     execute_sql_command(conn, create_table_ball)
 
 
+def create_seasons_table(conn: sqlite3.Connection) -> int:
+    """Create the seasons dimension table and fill it from player_stats.
+
+    One row per season, so listing and validating seasons reads a few
+    dozen rows instead of every player. Safe to run again after loading
+    more seasons; existing rows are kept.
+
+    Args:
+        conn: SQLite connection
+
+    Returns:
+        int: Number of seasons in the table
+    """
+    with conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS seasons "
+            "(season TEXT PRIMARY KEY) WITHOUT ROWID"
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO seasons (season) "
+            "SELECT DISTINCT season FROM player_stats "
+            "WHERE season IS NOT NULL"
+        )
+    count: int = conn.execute("SELECT count(*) FROM seasons").fetchone()[0]
+    print(f"Seasons table holds {count} seasons")
+    return count
+
+
 def create_empty_sqlite_db(db_path: str | None = None) -> bool:
-    """Create an empty SQLite database at the specified path.
+    """Create an empty SQLite database at the specified path, in WAL mode.
 
     Args:
         db_path: Database file path. Defaults to DB_PATH.
@@ -206,6 +317,7 @@ def create_empty_sqlite_db(db_path: str | None = None) -> bool:
 
     db_file.parent.mkdir(parents=True, exist_ok=True)
     conn = sqlite3.connect(db_file)
+    enable_wal(conn)
     conn.close()
 
     print(f"Database created at {db_path}")
@@ -235,6 +347,8 @@ def create_and_load_basketball_data(
 ) -> None:
     """Create database tables and load basketball data from CSV.
 
+    Also builds the seasons dimension table, see ``create_seasons_table``.
+
     Args:
         csv_path: Path to CSV file containing basketball data
         table_name: Name of table to create and load data into
@@ -242,3 +356,4 @@ def create_and_load_basketball_data(
     conn = create_db_connection()
     create_player_stats_table(conn)
     load_csv_to_db(conn, csv_path, table_name)
+    create_seasons_table(conn)
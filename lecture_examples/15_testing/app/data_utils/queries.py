@@ -0,0 +1,214 @@
+"""Registry of the SQL statements used by the application.
+
+Every statement is declared once here with named parameters and executed
+through ``execute_named``. Because the SQL text never changes with the
+parameter values, each statement is compiled once per pooled connection
+and then served from sqlite3's per-connection statement cache.
+"""
+
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from typing import Any, NamedTuple
+
+from app.data_utils.connection_pool import get_pool
+from app.data_utils.fetch_utils import Shape, execute_query, iter_query
+from app.data_utils.query_stats import record_query
+
+Params = dict[str, Any]
+
+
+class Query(NamedTuple):
+    """A named SQL statement.
+
+    ``sample_params`` are used to explain the query plan (see
+    ``index_utils``) and must bind every named parameter;
+    ``allow_full_scan`` marks queries that are expected to read the whole
+    table.
+    """
+
+    name: str
+    sql: str
+    sample_params: Params | None = None
+    allow_full_scan: bool = False
+
+
+SAMPLE_SEASON = "2022-23"
+SAMPLE_TEAM = "WAS"
+SAMPLE_PLAYER_ID = 1
+
+_QUERY_LIST = (
+    Query(
+        "list_colleges",
+        "SELECT distinct college from player_stats where season = :season",
+        {"season": SAMPLE_SEASON},
+    ),
+    Query(
+        "list_colleges_per_team",
+        "SELECT distinct college from player_stats "
+        "where team_abbreviation = :team and season = :season",
+        {"team": SAMPLE_TEAM, "season": SAMPLE_SEASON},
+    ),
+    Query(
+        "list_players",
+        "SELECT distinct player_name, id from player_stats "
+        "where season = :season",
+        {"season": SAMPLE_SEASON},
+    ),
+    Query(
+        "list_players_page",
+        "SELECT distinct player_name, id from player_stats "
+        "where season = :season and id > :after order by id limit :limit",
+        {"season": SAMPLE_SEASON, "after": 0, "limit": 100},
+    ),
+    Query(
+        "list_players_per_team",
+        "SELECT distinct player_name, id from player_stats "
+        "where team_abbreviation = :team and season = :season",
+        {"team": SAMPLE_TEAM, "season": SAMPLE_SEASON},
+    ),
+    Query(
+        "all_teams",
+        "select distinct team_abbreviation from player_stats "
+        "where season = :season",
+        {"season": SAMPLE_SEASON},
+    ),
+    # every team of every season, read once per data version to validate
+    # teams; walks the whole (season, team) index
+    Query(
+        "all_season_teams",
+        "select distinct season, team_abbreviation from player_stats",
+        allow_full_scan=True,
+    ),
+    Query("list_seasons", "SELECT season FROM seasons ORDER BY season"),
+    # fallback for databases without the seasons table
+    Query(
+        "list_seasons_from_stats",
+        "SELECT distinct season FROM player_stats ORDER BY season",
+        allow_full_scan=True,
+    ),
+    Query(
+        "player_info",
+        "select * from player_stats "
+        "where id = :player_id and season = :season",
+        {"player_id": SAMPLE_PLAYER_ID, "season": SAMPLE_SEASON},
+    ),
+    Query(
+        "export_players",
+        "select * from player_stats order by id",
+        allow_full_scan=True,
+    ),
+    Query(
+        "insert_player",
+        "INSERT INTO player_stats "
+        "(player_name, team_abbreviation, college, season) "
+        "VALUES (:player_name, :team, :college, :season)",
+        {
+            "player_name": "",
+            "team": SAMPLE_TEAM,
+            "college": None,
+            "season": SAMPLE_SEASON,
+        },
+    ),
+    Query("max_player_id", "SELECT max(id) FROM player_stats"),
+    Query(
+        "delete_player",
+        "DELETE FROM player_stats WHERE id = :player_id AND season = :season "
+        "RETURNING player_name",
+        {"player_id": SAMPLE_PLAYER_ID, "season": SAMPLE_SEASON},
+    ),
+    Query(
+        "delete_players",
+        "DELETE FROM player_stats WHERE season = :season "
+        "AND id IN (SELECT value FROM json_each(:player_ids)) "
+        "RETURNING id, player_name",
+        {"player_ids": f"[{SAMPLE_PLAYER_ID}]", "season": SAMPLE_SEASON},
+    ),
+    # see data_version
+    Query("data_version", "SELECT version FROM data_version WHERE id = 1"),
+    Query(
+        "bump_data_version",
+        "INSERT INTO data_version (id, version) VALUES (1, :first) "
+        "ON CONFLICT (id) DO UPDATE SET version = version + 1",
+        {"first": 0},
+    ),
+)
+
+QUERIES: dict[str, Query] = {query.name: query for query in _QUERY_LIST}
+
+
+def execute_named(
+    conn: sqlite3.Connection, name: str, params: Params | None = None
+) -> sqlite3.Cursor:
+    """Execute a registered statement.
+
+    Args:
+        conn: SQLite connection
+        name: Name of the statement in QUERIES
+        params: Values for the statement's named parameters
+
+    Returns:
+        sqlite3.Cursor: Cursor of the executed statement
+    """
+    start = time.perf_counter_ns()
+    cursor = conn.execute(QUERIES[name].sql, params or {})
+    record_query(time.perf_counter_ns() - start, max(cursor.rowcount, 0))
+    return cursor
+
+
+def execute_many(
+    conn: sqlite3.Connection, name: str, seq_of_params: Iterable[Params]
+) -> sqlite3.Cursor:
+    """Execute a registered statement once per parameter set.
+
+    The statement is prepared once and run for every set of values
+    without returning to Python in between.
+
+    Args:
+        conn: SQLite connection
+        name: Name of the statement in QUERIES
+        seq_of_params: Values for each execution
+
+    Returns:
+        sqlite3.Cursor: Cursor whose rowcount is the total rows changed
+    """
+    start = time.perf_counter_ns()
+    cursor = conn.executemany(QUERIES[name].sql, seq_of_params)
+    record_query(time.perf_counter_ns() - start, max(cursor.rowcount, 0))
+    return cursor
+
+
+def run_query(
+    name: str, params: Params | None = None, shape: Shape = "dicts"
+) -> Any:
+    """Run a registered query on a pooled connection.
+
+    Args:
+        name: Name of the query in QUERIES
+        params: Values for the query's named parameters
+        shape: Output shape, see ``fetch_utils.fetch_all``
+
+    Returns:
+        Query results in the requested shape
+    """
+    with get_pool().connection() as conn:
+        return execute_query(conn, QUERIES[name].sql, params or {}, shape)
+
+
+def stream_query(
+    name: str, params: Params | None = None, shape: Shape = "dicts"
+) -> Iterator[Any]:
+    """Stream the rows of a registered query from a pooled connection.
+
+    The connection is held until the generator is exhausted or closed.
+
+    Args:
+        name: Name of the query in QUERIES
+        params: Values for the query's named parameters
+        shape: ``tuples`` or ``dicts`` for each row
+
+    Yields:
+        One row per result
+    """
+    with get_pool().connection() as conn:
+        yield from iter_query(conn, QUERIES[name].sql, params or {}, shape)
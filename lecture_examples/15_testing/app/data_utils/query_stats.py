@@ -0,0 +1,66 @@
+"""Per-request accounting of time spent in SQLite and rows fetched.
+
+The query helpers in ``fetch_utils`` and ``queries`` report every
+statement to ``record_query``; the totals only accumulate inside a
+``track_queries`` block, which the request logging opens around each
+handler. Blocks can nest: a statement counts towards every enclosing
+block. The active totals live in a context variable, so concurrent
+requests on different threads never share them.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class QueryStats:
+    """Running totals for the queries of one request."""
+
+    __slots__ = ("db_time_ns", "parent", "queries", "rows")
+
+    def __init__(self, parent: "QueryStats | None" = None) -> None:
+        """Start with every total at zero.
+
+        Args:
+            parent: Totals of the enclosing block, also updated
+        """
+        self.db_time_ns = 0
+        self.queries = 0
+        self.rows = 0
+        self.parent = parent
+
+
+_current: ContextVar[QueryStats | None] = ContextVar(
+    "query_stats", default=None
+)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Accumulate the statements run inside the block.
+
+    Yields:
+        QueryStats: Totals, updated as queries run
+    """
+    stats = QueryStats(_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def record_query(duration_ns: int, rows: int, statement: bool = True) -> None:
+    """Add one statement, or one more batch of it, to the active totals.
+
+    Args:
+        duration_ns: Time spent executing and fetching, in nanoseconds
+        rows: Rows fetched or modified
+        statement: False for later batches of an already counted statement
+    """
+    stats = _current.get()
+    while stats is not None:
+        stats.db_time_ns += duration_ns
+        stats.queries += statement
+        stats.rows += rows
+        stats = stats.parent
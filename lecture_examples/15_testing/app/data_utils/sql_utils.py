@@ -1,179 +1,421 @@
 """Database query utilities for managing basketball player and college data.
 
 This module provides functions for querying and modifying player statistics
-and college information in the SQLite database.
+and college information in the SQLite database. The SQL itself lives in
+``queries``. Every function works on one season, ``DEFAULT_SEASON`` unless
+told otherwise; the indexes in ``index_utils`` lead with ``season`` so a
+season's rows are found without scanning the others.
 """
 
-from sqlite3 import Connection
+import json
+import sqlite3
+from collections.abc import Iterator
+from functools import partial
 from typing import Any
 
-from app.data_utils.loading_utils import (
-    create_db_connection,
-    execute_query_return_list_of_dicts_lm,
+from app.data_utils import write_behind
+from app.data_utils.cache_utils import cached_query
+from app.data_utils.connection_pool import get_pool
+from app.data_utils.data_version import bump_data_version, record_write
+from app.data_utils.loading_utils import DEFAULT_SEASON
+from app.data_utils.queries import (
+    execute_many,
+    execute_named,
+    run_query,
+    stream_query,
 )
 
 
-def list_college_sql(team: str | None = None) -> list[str]:
+class PlayerNotFoundError(ValueError):
+    """Raised when a player ID does not exist in the season."""
+
+
+@cached_query()
+def list_seasons_sql() -> list[str]:
+    """Get every season in the database, oldest first.
+
+    Reads the ``seasons`` dimension table, or the distinct seasons of
+    player_stats in a database loaded before that table existed.
+
+    Returns:
+        List of seasons, e.g. ``["1996-97", ..., "2022-23"]``
+    """
+    try:
+        rows = run_query("list_seasons", shape="tuples")
+    except sqlite3.OperationalError:  # no seasons table yet
+        rows = run_query("list_seasons_from_stats", shape="tuples")
+    return [row[0] for row in rows]
+
+
+@cached_query()
+def all_season_teams_sql() -> list[tuple[str, str]]:
+    """Get every team of every season.
+
+    Returns:
+        List of (season, team abbreviation) pairs
+    """
+    return run_query("all_season_teams", shape="tuples")
+
+
+@cached_query()
+def list_college_sql(
+    team: str | None = None, season: str = DEFAULT_SEASON
+) -> list[str]:
     """Get list of colleges for all players or players from a specific team.
 
     Args:
         team: Team abbreviation to filter by
+        season: Season to list
 
     Returns:
         List of college names
     """
-    conn: Connection = create_db_connection()
-
     if team is None:
-        list_colleges_query = (
-            "SELECT distinct college from player_stats "
-            " where season = '2022-23';"
-        )
+        rows = run_query("list_colleges", {"season": season}, "tuples")
     else:
-        list_colleges_query = (
-            "SELECT distinct college from player_stats "
-            f" where team_abbreviation = '{team}' and "
-            " season = '2022-23';"
+        rows = run_query(
+            "list_colleges_per_team",
+            {"team": team, "season": season},
+            "tuples",
         )
 
-    sql_results_dict = execute_query_return_list_of_dicts_lm(
-        conn, list_colleges_query
-    )
-
-    return [x["college"] for x in sql_results_dict]
+    return [row[0] for row in rows]
 
 
+@cached_query()
 def list_players_per_team_sql(
-    team: str | None = None,
+    team: str | None = None, season: str = DEFAULT_SEASON
 ) -> list[dict[str, str | int]]:
     """Get list of players and their IDs for all teams or a specific team.
 
     Args:
         team: Team abbreviation to filter by
+        season: Season to list
 
     Returns:
-        List of dicts containing player names and IDs
+        RowList of player names and IDs, read as dicts
     """
-    conn: Connection = create_db_connection()
+    if team is None:
+        return run_query("list_players", {"season": season}, "rows")
+    return run_query(
+        "list_players_per_team", {"team": team, "season": season}, "rows"
+    )
+
+
+@cached_query()
+def list_players_page_sql(
+    limit: int, cursor: int | None = None, season: str = DEFAULT_SEASON
+) -> tuple[list[dict[str, str | int]], int | None]:
+    """Get one page of the season's players, in id order.
+
+    Keyset pagination: the page starts right after the ``cursor`` id, so
+    SQLite seeks to it instead of reading and skipping the earlier rows
+    like ``OFFSET`` would, and every page costs the same.
+
+    Args:
+        limit: Maximum number of players on the page
+        cursor: ``next_cursor`` of the previous page, None for the first
+        season: Season to list
 
+    Returns:
+        RowList of player names and IDs, and the cursor of the next page
+        or None if this is the last one
+    """
+    rows = run_query(
+        "list_players_page",
+        {
+            "season": season,
+            "after": -1 if cursor is None else cursor,
+            "limit": limit + 1,
+        },
+        "rows",
+    )
+    if len(rows) <= limit:
+        return rows, None
+    del rows.rows[limit:]
+    return rows, rows.rows[-1][rows.columns.index("id")]
+
+
+def stream_players_per_team_sql(
+    team: str | None = None, season: str = DEFAULT_SEASON
+) -> Iterator[dict[str, str | int]]:
+    """Stream players and their IDs for all teams or a specific team.
+
+    Same rows as ``list_players_per_team_sql`` but yielded one at a time;
+    the pooled connection is held until the generator finishes or closes.
+
+    Args:
+        team: Team abbreviation to filter by
+        season: Season to list
+
+    Yields:
+        Dicts containing player names and IDs
+    """
     if team is None:
-        list_query = (
-            "SELECT distinct player_name, id from player_stats "
-            " where season = '2022-23';"
-        )
+        yield from stream_query("list_players", {"season": season})
     else:
-        list_query = (
-            "SELECT distinct player_name, id from player_stats "
-            f" where team_abbreviation = '{team}' and "
-            " season = '2022-23';"
+        yield from stream_query(
+            "list_players_per_team", {"team": team, "season": season}
         )
 
-    return execute_query_return_list_of_dicts_lm(conn, list_query)
+
+def export_players_sql() -> Iterator[dict[str, Any]]:
+    """Stream every row of player_stats across all seasons.
+
+    Rows come out in id order so SQLite can walk the table without
+    sorting.
+
+    Yields:
+        Dicts with every player_stats column
+    """
+    yield from stream_query("export_players")
+
+
+def _player_params(player_info: dict[str, Any]) -> dict[str, Any]:
+    """Build the insert_player parameters for a player."""
+    return {
+        "player_name": player_info["player_name"],
+        "team": player_info["team"],
+        "college": player_info.get("college"),
+        "season": player_info.get("season", DEFAULT_SEASON),
+    }
+
+
+def _insert_player(conn: sqlite3.Connection, params: dict[str, Any]) -> None:
+    """Insert a player on a connection, without committing."""
+    execute_named(conn, "insert_player", params)
 
 
 def add_player(player_info: dict[str, Any]) -> None:
     """Add a new player to the database.
 
+    Outside of the default ``sync`` write mode the insert goes through the
+    write-behind queue (see ``write_behind``) and, in ``enqueue`` mode, is
+    not committed yet when this returns.
+
     Args:
         player_info: Dict containing player information including:
             - player_name (str): Player's full name
             - team (str): Team abbreviation
             - college (Optional[str]): Player's college
+            - season (Optional[str]): Season, defaults to DEFAULT_SEASON
     """
-    conn: Connection = create_db_connection()
-    query = """
-    INSERT INTO player_stats
-    (player_name, team_abbreviation, college, season)
-    VALUES
-    (?, ?, ?, '2022-23')
+    params = _player_params(player_info)
+    if write_behind.write_mode() != "sync":
+        write_behind.submit(partial(_insert_player, params=params))
+        return
+
+    with get_pool().connection() as conn:
+        _insert_player(conn, params)
+        record_write(conn)
+        conn.commit()
+    bump_data_version()
+
+
+def validate_players(players: Any) -> None:
+    """Check a batch of players before anything is written.
+
+    Args:
+        players: Decoded JSON body, expected to be a list of player objects
+
+    Raises:
+        ValueError: If it is not a non-empty list, or a player lacks a
+            player_name or team string, has a non-string college or a
+            season that is not in the database
+    """
+    if not isinstance(players, list) or not players:
+        raise ValueError("Expected a non-empty JSON array of players")
+    seasons = set(list_seasons_sql())
+    for index, player in enumerate(players):
+        if not isinstance(player, dict):
+            raise ValueError(f"Player {index} is not an object")
+        for field in ("player_name", "team"):
+            if not player.get(field) or not isinstance(player[field], str):
+                raise ValueError(f"Player {index}: {field} is required")
+        if not isinstance(player.get("college"), str | None):
+            raise ValueError(f"Player {index}: college must be a string")
+        season = player.get("season", DEFAULT_SEASON)
+        if not isinstance(season, str) or season not in seasons:
+            raise ValueError(f"Player {index}: unknown season {season!r}")
+
+
+def _insert_players(
+    conn: sqlite3.Connection, params: list[dict[str, Any]]
+) -> list[int]:
+    """Insert players on a connection holding the write lock.
+
+    Returns the new ids, which follow the previous largest id as no other
+    writer can insert in between.
     """
+    last_id = execute_named(conn, "max_player_id").fetchone()[0]
+    execute_many(conn, "insert_player", params)
+    first_id = (last_id or 0) + 1  # SQLite's next rowid, 1 when empty
+    return list(range(first_id, first_id + len(params)))
 
-    params = (
-        player_info["player_name"],
-        player_info["team"],
-        player_info.get("college"),
-    )
 
-    cursor = conn.cursor()
-    cursor.execute(query, params)
-    conn.commit()
+def add_players(players: list[dict[str, Any]]) -> list[int] | None:
+    """Add many players in a single transaction.
+
+    All rows are inserted by one ``executemany`` call and committed
+    together, i.e. with one journal sync instead of one per player, and
+    either all of them are added or none is. ``BEGIN IMMEDIATE`` takes
+    the write lock up front, so no other writer can insert in between and
+    the new ids follow the previous largest id. Outside of the default
+    ``sync`` write mode the batch goes through the write-behind queue like
+    ``add_player``, so it is applied in order with the single writes.
+
+    Args:
+        players: Player dicts, see ``add_player``
 
+    Returns:
+        Ids of the new players, in input order, or None in ``enqueue``
+        write mode where the insert has not run yet
 
-def delete_player(player_id: int) -> str:
+    Raises:
+        ValueError: If the batch is invalid, see ``validate_players``
+    """
+    validate_players(players)
+    params = [_player_params(player) for player in players]
+    if write_behind.write_mode() != "sync":
+        return write_behind.submit(partial(_insert_players, params=params))
+
+    with get_pool().connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:  # commit, or roll back on error
+            player_ids = _insert_players(conn, params)
+            record_write(conn)
+    bump_data_version()
+    return player_ids
+
+
+def _delete_player(
+    conn: sqlite3.Connection, player_id: int, season: str
+) -> str:
+    """Delete a player on a connection, without committing."""
+    params = {"player_id": player_id, "season": season}
+    result = execute_named(conn, "delete_player", params).fetchone()
+    if not result:
+        raise PlayerNotFoundError(f"No player found with ID: {player_id}")
+    player_name: str = result[0]
+    return player_name
+
+
+def delete_player(player_id: int, season: str = DEFAULT_SEASON) -> str | None:
     """Delete a player by ID and return their name.
 
+    A single ``DELETE ... RETURNING`` statement finds and removes the
+    rows, inside a transaction that holds the write lock from the start.
+    Outside of the default ``sync`` write mode the delete goes through the
+    write-behind queue (see ``write_behind``).
+
     Args:
         player_id: ID of player to delete
+        season: Season the player must belong to
 
     Returns:
-        Name of deleted player
+        Name of deleted player, or None in ``enqueue`` write mode where the
+        delete has not run yet
 
     Raises:
-        ValueError: If no player found with given ID
+        PlayerNotFoundError: If no player found with given ID
     """
-    conn: Connection = create_db_connection()
-
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT player_name
-        FROM player_stats
-        WHERE id = ?
-        AND season = '2022-23'
-        LIMIT 1
-        """,
-        (player_id,),
-    )
-    result = cursor.fetchone()
+    if write_behind.write_mode() != "sync":
+        return write_behind.submit(
+            partial(_delete_player, player_id=player_id, season=season)
+        )
 
-    if not result:
-        raise ValueError(f"No player found with ID: {player_id}")
+    with get_pool().connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:  # commit, or roll back on error
+            player_name = _delete_player(conn, player_id, season)
+            record_write(conn)
+    bump_data_version()
+    return player_name
 
-    player_name: str = result[0]
 
-    cursor.execute(
-        """
-        DELETE FROM player_stats
-        WHERE id = ?
-        AND season = '2022-23'
-        """,
-        (player_id,),
-    )
-    conn.commit()
+def _delete_players(
+    conn: sqlite3.Connection, player_ids: list[int], season: str
+) -> dict[int, str]:
+    """Delete players on a connection, raising if any ID is missing."""
+    params = {"player_ids": json.dumps(player_ids), "season": season}
+    deleted = dict(execute_named(conn, "delete_players", params))
+    missing = sorted(set(player_ids) - deleted.keys())
+    if missing:
+        raise PlayerNotFoundError(
+            f"No player found with ID: {', '.join(map(str, missing))}"
+        )
+    return deleted
 
-    return player_name
 
+def delete_players(
+    player_ids: list[int], season: str = DEFAULT_SEASON
+) -> dict[int, str] | None:
+    """Delete several players by ID in one transaction.
+
+    All ids are deleted by one statement, or none is if any of them does
+    not exist. Outside of the default ``sync`` write mode the delete goes
+    through the write-behind queue like ``delete_player``.
 
-def all_teams_sql() -> list[str]:
-    """Get list of all teams.
+    Args:
+        player_ids: IDs of players to delete
+        season: Season the players must belong to
 
     Returns:
-        List of unique team abbreviations
+        Dict mapping each deleted ID to the player's name, or None in
+        ``enqueue`` write mode where the delete has not run yet
+
+    Raises:
+        ValueError: If player_ids is not a non-empty list of integers
+        PlayerNotFoundError: If any ID has no player; nothing is deleted
     """
-    conn: Connection = create_db_connection()
-    team_query = (
-        "select distinct team_abbreviation from player_stats "
-        " where season = '2022-23'"
-    )
+    if (
+        not isinstance(player_ids, list)
+        or not player_ids
+        or not all(
+            isinstance(player_id, int) and not isinstance(player_id, bool)
+            for player_id in player_ids
+        )
+    ):
+        raise ValueError("Expected a non-empty list of integer player ids")
+    if write_behind.write_mode() != "sync":
+        return write_behind.submit(
+            partial(_delete_players, player_ids=player_ids, season=season)
+        )
 
-    sql_results_dict = execute_query_return_list_of_dicts_lm(conn, team_query)
-    return [x["team_abbreviation"] for x in sql_results_dict]
+    with get_pool().connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:  # commit, or roll back on error
+            deleted = _delete_players(conn, player_ids, season)
+            record_write(conn)
+    bump_data_version()
+    return deleted
 
 
-def player_info_sql(player_id: int) -> list[dict[str, Any]]:
+@cached_query()
+def all_teams_sql(season: str = DEFAULT_SEASON) -> list[str]:
+    """Get list of all teams of a season.
+
+    Args:
+        season: Season to list
+
+    Returns:
+        List of unique team abbreviations
+    """
+    rows = run_query("all_teams", {"season": season}, "tuples")
+    return [row[0] for row in rows]
+
+
+@cached_query()
+def player_info_sql(
+    player_id: int, season: str = DEFAULT_SEASON
+) -> list[dict[str, Any]]:
     """Get detailed information for a specific player.
 
     Args:
         player_id: Player's ID in database
+        season: Season the player must belong to
 
     Returns:
         List containing dict with player information
     """
-    conn: Connection = create_db_connection()
-
-    player_query = (
-        f"select * from player_stats where id = {player_id} "
-        " and season = '2022-23'"
-    )
-
-    return execute_query_return_list_of_dicts_lm(conn, player_query)
+    return run_query("player_info", {"player_id": player_id, "season": season})
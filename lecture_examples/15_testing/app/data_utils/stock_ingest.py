@@ -0,0 +1,367 @@
+"""Parallel ingest of the NASDAQ/NYSE zip archives into the stocks table.
+
+Each ``<MARKET>_<YEAR>.zip`` member is parsed in a worker process and the
+parsed rows are streamed in batches through a bounded queue to a single
+SQLite writer in the parent process, so parsing scales across cores while
+SQLite only ever sees one writer. With ``workers=0`` the members are
+streamed straight into SQLite from the calling process instead.
+Either way the archives are read in place, never extracted.
+"""
+
+import multiprocessing
+import os
+import queue as queue_module
+import re
+import sqlite3
+import time
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from app.data_utils.bulk_loader import LoadStats, bulk_load_rows
+from app.data_utils.zip_utils import open_zip_csv, zip_data_members
+from app.logger_utils.custom_logger import custom_logger
+
+STOCKS_TABLE = "stocks"
+STOCK_COLUMNS = (
+    "symbol",
+    "date",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "market",
+)
+COLUMN_ALIASES = {"ticker": "symbol", "vol": "volume"}
+DATE_FORMATS = ("%Y-%m-%d", "%d-%b-%Y", "%Y%m%d", "%m/%d/%Y")
+DOWNSAMPLE_YEARS = (2016, 2017)
+ARCHIVE_PATTERN = re.compile(r"^(NASDAQ|NYSE)_(\d{4})\.zip$")
+DEFAULT_BATCH_SIZE = 10_000
+QUEUE_BATCHES_PER_WORKER = 4
+# How often the writer checks on the workers while waiting for a batch.
+QUEUE_POLL_SECONDS = 1.0
+
+
+class Archive(NamedTuple):
+    """One market/year zip file."""
+
+    path: Path
+    market: str
+    year: int
+
+
+def create_stocks_table(conn: sqlite3.Connection) -> None:
+    """Create the table holding daily stock prices.
+
+    Args:
+        conn: SQLite connection
+    """
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {STOCKS_TABLE} (
+            symbol TEXT NOT NULL,
+            date TEXT NOT NULL,    -- YYYY-MM-DD
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            volume INTEGER,
+            market TEXT NOT NULL
+        )
+        """
+    )
+    conn.commit()
+    custom_logger.debug("Created table %s", STOCKS_TABLE)
+
+
+def find_archives(data_dir: str | Path, downsample: bool) -> list[Archive]:
+    """List the market/year archives to load.
+
+    Args:
+        data_dir: Directory containing the zip files
+        downsample: Only keep the DOWNSAMPLE_YEARS archives
+
+    Returns:
+        Archives sorted by year and market
+    """
+    archives = []
+    for path in Path(data_dir).glob("*.zip"):
+        match = ARCHIVE_PATTERN.match(path.name)
+        if not match:
+            continue
+        archive = Archive(path, match.group(1), int(match.group(2)))
+        if downsample and archive.year not in DOWNSAMPLE_YEARS:
+            continue
+        archives.append(archive)
+    return sorted(archives, key=lambda a: (a.year, a.market))
+
+
+@lru_cache(maxsize=4096)
+def normalize_date(value: str) -> str:
+    """Convert a date in any of DATE_FORMATS to YYYY-MM-DD.
+
+    Args:
+        value: Date as written in the source file
+
+    Returns:
+        ISO formatted date, or the input unchanged if no format matches
+    """
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return value
+
+
+def _column_positions(header: list[str]) -> list[int]:
+    """Map the source header onto STOCK_COLUMNS (without market)."""
+    names = [name.strip().lower() for name in header]
+    names = [COLUMN_ALIASES.get(name, name) for name in names]
+    try:
+        return [names.index(column) for column in STOCK_COLUMNS[:-1]]
+    except ValueError as e:
+        raise ValueError(f"Unexpected stock file header: {header}") from e
+
+
+def _iter_member_rows(
+    archive: Archive, member: str
+) -> Iterator[tuple[Any, ...]]:
+    """Stream the rows of one zip member as stocks table tuples."""
+    with open_zip_csv(archive.path, member) as reader:
+        positions = _column_positions(next(reader))
+        date_position = positions[1]
+        for row in reader:
+            if not row:
+                continue
+            values = [row[i] for i in positions]
+            values[1] = normalize_date(row[date_position])
+            values.append(archive.market)
+            yield tuple(values)
+
+
+_queue: Any = None
+
+
+def _init_worker(queue: Any) -> None:
+    """Give each worker process the shared batch queue."""
+    global _queue
+    _queue = queue
+
+
+def _parse_member(archive: Archive, member: str, batch_size: int) -> None:
+    """Worker: parse one member and push its rows to the writer in batches.
+
+    Sends ``("rows", key, batch)`` messages followed by one
+    ``("done", key, n_rows, parse_seconds)`` or ``("error", key, message)``.
+    """
+    key = (archive.market, archive.year)
+    start = time.perf_counter()
+    n_rows = 0
+    batch: list[tuple[Any, ...]] = []
+    try:
+        for row in _iter_member_rows(archive, member):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                _queue.put(("rows", key, batch))
+                n_rows += len(batch)
+                batch = []
+        if batch:
+            _queue.put(("rows", key, batch))
+            n_rows += len(batch)
+    except Exception as e:
+        _queue.put(("error", key, f"{archive.path.name}:{member}: {e}"))
+        return
+    _queue.put(("done", key, n_rows, time.perf_counter() - start))
+
+
+def _next_message(queue: Any, futures: list[Future]) -> tuple[Any, ...]:
+    """Wait for a worker message, checking the workers while none comes.
+
+    A worker process that dies (e.g. killed for running out of memory)
+    never sends its final message; the pool then fails every pending
+    future with ``BrokenProcessPool``, which is raised here instead of
+    waiting forever.
+
+    Args:
+        queue: Queue the workers write to
+        futures: Futures of the submitted members
+
+    Returns:
+        The next message
+    """
+    while True:
+        try:
+            return queue.get(timeout=QUEUE_POLL_SECONDS)
+        except queue_module.Empty:
+            pass
+        for future in futures:
+            if future.done() and future.exception() is not None:
+                raise future.exception()  # type: ignore[misc]
+
+
+def _rows_from_queue(
+    queue: Any,
+    members: dict[tuple[str, int], int],
+    futures: list[Future],
+) -> Iterator[tuple[Any, ...]]:
+    """Yield rows sent by the workers until every member is finished.
+
+    Logs at DEBUG how long each (market, year) took once all of its
+    members are done.
+
+    Args:
+        queue: Queue the workers write to
+        members: Number of members still expected per (market, year)
+        futures: Futures of the submitted members, see ``_next_message``
+
+    Raises:
+        RuntimeError: If a worker failed to parse a member
+    """
+    remaining = dict(members)
+    started: dict[tuple[str, int], float] = {}
+    loaded = dict.fromkeys(members, 0)
+    parse_time = dict.fromkeys(members, 0.0)
+
+    while any(remaining.values()):
+        message = _next_message(queue, futures)
+        kind, key = message[0], message[1]
+        started.setdefault(key, time.perf_counter())
+        if kind == "error":
+            raise RuntimeError(f"Failed to parse {message[2]}")
+        if kind == "rows":
+            yield from message[2]
+            continue
+
+        loaded[key] += message[2]
+        parse_time[key] += message[3]
+        remaining[key] -= 1
+        if remaining[key] == 0:
+            market, year = key
+            custom_logger.debug(
+                "Loaded %s %s: %s rows in %.2fs (worker parse time %.2fs)",
+                market,
+                year,
+                loaded[key],
+                time.perf_counter() - started[key],
+                parse_time[key],
+            )
+
+
+def _rows_serial(
+    jobs: list[tuple[Archive, str]],
+) -> Iterator[tuple[Any, ...]]:
+    """Yield every member's rows in-process, logging each (market, year)."""
+    for archive in dict.fromkeys(archive for archive, _ in jobs):
+        start = time.perf_counter()
+        n_rows = 0
+        for job_archive, member in jobs:
+            if job_archive != archive:
+                continue
+            for row in _iter_member_rows(archive, member):
+                n_rows += 1
+                yield row
+        custom_logger.debug(
+            "Loaded %s %s: %s rows in %.2fs",
+            archive.market,
+            archive.year,
+            n_rows,
+            time.perf_counter() - start,
+        )
+
+
+def _load_parallel(
+    conn: sqlite3.Connection,
+    jobs: list[tuple[Archive, str]],
+    workers: int,
+    batch_size: int,
+) -> LoadStats:
+    """Parse members in worker processes and write them from this one."""
+    members: dict[tuple[str, int], int] = {}
+    for archive, _ in jobs:
+        key = (archive.market, archive.year)
+        members[key] = members.get(key, 0) + 1
+
+    context = multiprocessing.get_context()
+    queue = context.Queue(maxsize=workers * QUEUE_BATCHES_PER_WORKER)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(queue,),
+    ) as pool:
+        futures = [
+            pool.submit(_parse_member, archive, member, batch_size)
+            for archive, member in jobs
+        ]
+        try:
+            stats = bulk_load_rows(
+                conn,
+                STOCKS_TABLE,
+                STOCK_COLUMNS,
+                _rows_from_queue(queue, members, futures),
+            )
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            _drain(queue, futures)
+            raise
+        for future in futures:
+            future.result()
+    return stats
+
+
+def load_stock_archives(
+    conn: sqlite3.Connection,
+    data_dir: str | Path,
+    workers: int | None = None,
+    downsample: bool | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> LoadStats:
+    """Load every market/year archive into the stocks table.
+
+    Args:
+        conn: SQLite connection, the only writer
+        data_dir: Directory containing the zip files
+        workers: Number of parser processes. Defaults to the CPU count;
+            0 streams the archives into SQLite from this process.
+        downsample: Only load 2016 and 2017. Defaults to the DOWNSAMPLE
+            environment variable being set to 1.
+        batch_size: Rows per batch sent to the writer (parallel mode) or
+            per ``executemany`` call (serial mode)
+
+    Returns:
+        LoadStats: Number of rows loaded and elapsed time
+    """
+    if downsample is None:
+        downsample = os.environ.get("DOWNSAMPLE", "0") == "1"
+    if workers is None:
+        workers = int(os.environ.get("INGEST_WORKERS", os.cpu_count() or 1))
+
+    jobs = [
+        (archive, member)
+        for archive in find_archives(data_dir, downsample)
+        for member in zip_data_members(archive.path)
+    ]
+    create_stocks_table(conn)
+    if workers == 0:
+        return bulk_load_rows(
+            conn,
+            STOCKS_TABLE,
+            STOCK_COLUMNS,
+            _rows_serial(jobs),
+            chunk_size=batch_size,
+        )
+    return _load_parallel(conn, jobs, workers, batch_size)
+
+
+def _drain(queue: Any, futures: list[Any]) -> None:
+    """Empty the queue until running workers finish, so none stays blocked."""
+    while not all(future.done() for future in futures):
+        try:
+            queue.get(timeout=0.1)
+        except queue_module.Empty:
+            continue
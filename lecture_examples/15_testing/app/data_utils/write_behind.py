@@ -0,0 +1,377 @@
+"""Optional write-behind queue with group commit for player mutations.
+
+In the default ``sync`` mode every mutation commits on the request
+thread. With ``WRITE_MODE=commit`` or ``enqueue`` the mutations are
+handed to a single writer thread instead, which applies whatever has
+queued up, at most ``WRITE_BATCH_SIZE`` operations, in one transaction
+with one commit. Operations arriving while a batch is being committed
+form the next one; ``WRITE_BATCH_DELAY_MS`` (default 0) additionally
+waits that long after the first operation for more to arrive. Request
+threads no longer compete for SQLite's write lock and a burst of writes
+costs one journal sync per batch instead of one each.
+
+- ``commit``: the caller waits until its batch is committed, so it gets
+  the operation's result or error and the write is durable.
+- ``enqueue``: the caller returns as soon as the operation is queued. The
+  queue is in memory: operations not yet committed are lost if the
+  process dies, and errors (e.g. an unknown id) are only logged.
+
+Each operation runs inside its own savepoint, so one failing operation
+does not undo the others of its batch. Batch inserts and deletes go
+through the same queue, so writes are applied in the order they were
+submitted.
+
+Callers wait at most ``WRITE_TIMEOUT`` seconds (default four times the
+SQLite busy timeout) for their commit, or for room in a full queue, and
+get a ``WriteTimeoutError`` instead of hanging on a stuck writer; their
+operation is cancelled unless the writer has already started it. A
+writer thread that died is replaced on the next write; the operations
+still queued for it fail.
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any
+
+from flask import Flask
+
+from app.data_utils.connection_pool import get_pool
+from app.data_utils.data_version import bump_data_version, record_write
+from app.data_utils.loading_utils import BUSY_TIMEOUT, create_db_connection
+from app.logger_utils.custom_logger import custom_logger
+
+WRITE_MODES = ("sync", "commit", "enqueue")
+DEFAULT_WRITE_MODE = os.environ.get("WRITE_MODE", "sync")
+DEFAULT_BATCH_SIZE = int(os.environ.get("WRITE_BATCH_SIZE", "100"))
+DEFAULT_BATCH_DELAY_MS = float(os.environ.get("WRITE_BATCH_DELAY_MS", "0"))
+DEFAULT_QUEUE_SIZE = int(os.environ.get("WRITE_QUEUE_SIZE", "10000"))
+DEFAULT_WRITE_TIMEOUT = float(
+    os.environ.get("WRITE_TIMEOUT", str(4 * BUSY_TIMEOUT))
+)
+
+Operation = Callable[[sqlite3.Connection], Any]
+
+_STOP = object()
+
+
+class WriteTimeoutError(RuntimeError):
+    """Raised when a write is not queued or committed in time."""
+
+
+class WriteBehindWriter:
+    """Single thread applying queued operations in group commits."""
+
+    def __init__(
+        self,
+        db_path: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_delay_ms: float = DEFAULT_BATCH_DELAY_MS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> None:
+        """Start the writer thread.
+
+        Args:
+            db_path: Path to database file
+            batch_size: Maximum operations per transaction
+            batch_delay_ms: Longest wait for more operations after the
+                first one of a batch, in milliseconds
+            queue_size: Maximum queued operations; submitting blocks while
+                the queue is full
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay_ms / 1000
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stats = {"operations": 0, "failed": 0, "batches": 0}
+        self._thread = threading.Thread(
+            target=self._run, name="write-behind", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self, operation: Operation, timeout: float | None = None
+    ) -> Future:
+        """Queue an operation for the next group commit.
+
+        Args:
+            operation: Called with the writer's connection inside the
+                batch transaction; its return value is the future's result
+            timeout: Longest wait for room in a full queue, None for ever
+
+        Returns:
+            Future resolved once the batch is committed
+
+        Raises:
+            WriteTimeoutError: If the queue stayed full for ``timeout``
+        """
+        future: Future = Future()
+        try:
+            self._queue.put((operation, future), timeout=timeout)
+        except queue.Full:
+            raise WriteTimeoutError(
+                f"Write queue still full after {timeout}s"
+            ) from None
+        return future
+
+    def is_alive(self) -> bool:
+        """Whether the writer thread is still running."""
+        return self._thread.is_alive()
+
+    def fail_pending(self, error: Exception) -> None:
+        """Fail every operation still queued, e.g. after the thread died.
+
+        Args:
+            error: Exception set on the queued operations' futures
+        """
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and not item[1].cancelled():
+                item[1].set_exception(error)
+
+    def stop(self) -> None:
+        """Commit everything queued so far and stop the thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        else:
+            self.fail_pending(RuntimeError("Write-behind thread died"))
+
+    def stats(self) -> dict[str, Any]:
+        """Report writer counters.
+
+        Returns:
+            Dict with queued, committed and failed operations and batches
+        """
+        return {
+            "alive": self.is_alive(),
+            "queued": self._queue.qsize(),
+            "batch_size": self.batch_size,
+            "batch_delay_ms": self.batch_delay * 1000,
+            **self._stats,
+        }
+
+    def _next_batch(self) -> tuple[list[tuple[Operation, Future]], bool]:
+        """Wait for an operation, then collect more until the batch closes.
+
+        Returns:
+            The batch and whether the writer was asked to stop
+        """
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.batch_delay
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(
+                    timeout=max(deadline - time.monotonic(), 0)
+                )
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        """Apply batches until stopped."""
+        conn = create_db_connection(self.db_path)
+        try:
+            stop = False
+            while not stop:
+                batch, stop = self._next_batch()
+                if batch:
+                    self._commit(conn, batch)
+        finally:
+            conn.close()  # rolls back, and releases the write lock, if dying
+
+    def _commit(
+        self, conn: sqlite3.Connection, batch: list[tuple[Operation, Future]]
+    ) -> None:
+        """Apply a batch in one transaction and resolve its futures."""
+        # skip operations whose caller gave up waiting and cancelled them
+        batch = [
+            (operation, future)
+            for operation, future in batch
+            if future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+        outcomes: list[tuple[Future, Any, Exception | None]] = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for operation, future in batch:
+                conn.execute("SAVEPOINT operation")
+                try:
+                    outcomes.append((future, operation(conn), None))
+                except Exception as e:  # noqa: BLE001 - handed to the caller
+                    conn.execute("ROLLBACK TO operation")
+                    outcomes.append((future, None, e))
+                conn.execute("RELEASE operation")
+            if any(error is None for _, _, error in outcomes):
+                record_write(conn)
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            outcomes = [(future, None, e) for _, future in batch]
+        else:
+            bump_data_version()
+
+        self._stats["batches"] += 1
+        for future, result, error in outcomes:
+            if error is None:
+                self._stats["operations"] += 1
+                future.set_result(result)
+                continue
+            self._stats["failed"] += 1
+            future.set_exception(error)
+            if _mode == "enqueue":
+                custom_logger.warning("Queued write failed: %s", error)
+
+
+_mode = DEFAULT_WRITE_MODE
+_timeout = DEFAULT_WRITE_TIMEOUT
+_settings: dict[str, Any] = {}
+_writer: WriteBehindWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def write_mode() -> str:
+    """Get the write mode in effect.
+
+    Returns:
+        ``sync``, ``commit`` or ``enqueue``
+    """
+    return _mode
+
+
+def writes_deferred() -> bool:
+    """Whether mutations return before they are committed.
+
+    Returns:
+        True in ``enqueue`` mode
+    """
+    return _mode == "enqueue"
+
+
+def get_writer() -> WriteBehindWriter:
+    """Return the process-wide writer, starting it on first use.
+
+    A writer whose thread died is replaced, and the operations still
+    queued for it fail.
+
+    Returns:
+        WriteBehindWriter: Writer for the pool's database
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is not None and not _writer.is_alive():
+            custom_logger.error("Write-behind thread died, restarting it")
+            _writer.fail_pending(RuntimeError("Write-behind thread died"))
+            _writer = None
+        if _writer is None:
+            _writer = WriteBehindWriter(get_pool().db_path, **_settings)
+        return _writer
+
+
+def submit(operation: Operation) -> Any:
+    """Run a mutation through the writer according to the write mode.
+
+    Args:
+        operation: Called with the writer's connection, see ``submit``
+
+    Returns:
+        The operation's result in ``commit`` mode, None in ``enqueue``
+
+    Raises:
+        WriteTimeoutError: If the write is not queued, or in ``commit``
+            mode not committed, within ``WRITE_TIMEOUT`` seconds
+    """
+    timeout = _timeout
+    future = get_writer().submit(operation, timeout=timeout)
+    if _mode != "commit":
+        return None
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        if future.cancel():
+            message = f"Write not started after {timeout}s, cancelled"
+        else:
+            message = f"Write not committed after {timeout}s, still running"
+        raise WriteTimeoutError(message) from None
+
+
+def stop_writer() -> None:
+    """Commit the queued operations and stop the writer, if running."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
+
+
+def writer_stats() -> dict[str, Any]:
+    """Report the write mode and the writer's counters.
+
+    Returns:
+        Dict with the mode and, once started, the writer's counters
+    """
+    writer = _writer
+    return {
+        "mode": _mode,
+        **(writer.stats() if writer is not None else {}),
+    }
+
+
+def reinit_after_fork() -> None:
+    """Forget the parent's writer in a freshly forked worker process.
+
+    Threads do not survive ``fork``; the worker starts its own writer on
+    its first write. See ``gunicorn.conf.py``.
+    """
+    global _writer, _writer_lock
+    _writer_lock = threading.Lock()
+    _writer = None
+
+
+def init_app(app: Flask) -> None:
+    """Set up the write mode for a Flask application.
+
+    Reads ``WRITE_MODE``, ``WRITE_BATCH_SIZE``, ``WRITE_BATCH_DELAY_MS``
+    and ``WRITE_TIMEOUT`` from the app config. A running writer is flushed
+    and stopped, so the next one uses the current pool's database.
+
+    Args:
+        app: Flask application instance
+
+    Raises:
+        ValueError: If WRITE_MODE is not one of WRITE_MODES
+    """
+    global _mode, _timeout
+    mode = app.config.get("WRITE_MODE", DEFAULT_WRITE_MODE)
+    if mode not in WRITE_MODES:
+        raise ValueError(
+            f"Unknown WRITE_MODE {mode!r}, expected one of {WRITE_MODES}"
+        )
+    stop_writer()
+    _mode = mode
+    _timeout = app.config.get("WRITE_TIMEOUT", DEFAULT_WRITE_TIMEOUT)
+    _settings.update(
+        batch_size=app.config.get("WRITE_BATCH_SIZE", DEFAULT_BATCH_SIZE),
+        batch_delay_ms=app.config.get(
+            "WRITE_BATCH_DELAY_MS", DEFAULT_BATCH_DELAY_MS
+        ),
+    )
+
+
+atexit.register(stop_writer)
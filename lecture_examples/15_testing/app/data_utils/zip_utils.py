@@ -0,0 +1,96 @@
+"""Read CSV data straight out of zip archives.
+
+Members are decompressed and decoded incrementally while the rows are
+consumed, so nothing is extracted to disk and only a small buffer of a
+member is ever held in memory.
+"""
+
+import csv
+import io
+import zipfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+DATA_SUFFIXES = (".csv", ".txt")
+
+
+def zip_data_members(zip_path: str | Path) -> list[str]:
+    """List the CSV/TXT members of an archive.
+
+    Args:
+        zip_path: Path to the zip file
+
+    Returns:
+        Member names in archive order
+    """
+    with zipfile.ZipFile(zip_path) as zf:
+        return [
+            info.filename
+            for info in zf.infolist()
+            if not info.is_dir()
+            and info.filename.lower().endswith(DATA_SUFFIXES)
+        ]
+
+
+@contextmanager
+def open_zip_csv(
+    zip_path: str | Path,
+    member: str | None = None,
+    encoding: str = "utf-8-sig",
+) -> Iterator[Iterator[list[str]]]:
+    """Open a zip member as a streaming ``csv.reader``.
+
+    The member is read through ``ZipFile.open`` and decoded by an
+    incremental text wrapper, so rows are produced as the compressed data
+    is read.
+
+    Args:
+        zip_path: Path to the zip file
+        member: Member to read. Defaults to the only data member.
+        encoding: Text encoding of the member
+
+    Yields:
+        csv.reader over the member's rows
+
+    Raises:
+        ValueError: If no member is given and the archive does not hold
+            exactly one data file
+    """
+    if member is None:
+        members = zip_data_members(zip_path)
+        if len(members) != 1:
+            raise ValueError(
+                f"{zip_path} holds {len(members)} data files, pick a member"
+            )
+        member = members[0]
+
+    with (
+        zipfile.ZipFile(zip_path) as zf,
+        zf.open(member) as raw,
+        io.TextIOWrapper(raw, encoding=encoding, newline="") as text,
+    ):
+        yield csv.reader(text)
+
+
+@contextmanager
+def open_csv(
+    csv_path: str | Path, encoding: str = "utf-8-sig"
+) -> Iterator[Iterator[list[str]]]:
+    """Open a CSV file on disk, or a single-file zip, as a ``csv.reader``.
+
+    Args:
+        csv_path: Path to a ``.csv`` file or a ``.zip`` holding one
+        encoding: Text encoding of the file
+
+    Yields:
+        csv.reader over the file's rows
+    """
+    csv_file = Path(csv_path)
+    if csv_file.suffix.lower() == ".zip":
+        with open_zip_csv(csv_file, encoding=encoding) as reader:
+            yield reader
+        return
+
+    with csv_file.open(encoding=encoding, newline="") as f:
+        yield csv.reader(f)
@@ -1,22 +1,191 @@
 """Custom Logger for use in this project
 
-Contains the setup for the custom logger
+Contains the setup for the custom logger. Records are put on a bounded
+queue by the calling thread and formatted and written to stderr by a
+background listener thread, so logging never waits on the stream. When
+the queue is full new records are dropped and counted instead of blocking
+the request.
+
+The output is plain text, or one JSON object per line with
+``LOG_FORMAT=json``; the level comes from ``LOG_LEVEL`` and
+``LOG_SAMPLE_RATE`` sets the share of successful responses that are
+logged.
 """
 
+import atexit
+import json
 import logging
+import os
+import queue
+import random
+import threading
+from http import HTTPStatus
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+DEFAULT_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_OUTPUT = os.environ.get("LOG_FORMAT", "text")
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", "1.0"))
+LOG_FORMAT = "%(asctime)s | %(levelname)s | %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line.
+
+    Structured fields passed as ``extra={"fields": {...}}`` become top-level
+    keys next to the time, level and message.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Render a record as JSON.
+
+        Args:
+            record: Log record
+
+        Returns:
+            JSON text of the record
+        """
+        entry = {
+            "time": self.formatTime(record, DATE_FORMAT),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def sample_response(status: int) -> bool:
+    """Decide whether a response is logged under LOG_SAMPLE_RATE.
+
+    Only 2xx responses are sampled; everything else is always logged.
+
+    Args:
+        status: HTTP status code of the response
+
+    Returns:
+        True if the response should be logged
+    """
+    successful = HTTPStatus.OK <= status < HTTPStatus.MULTIPLE_CHOICES
+    if not successful or LOG_SAMPLE_RATE >= 1.0:
+        return True
+    return random.random() < LOG_SAMPLE_RATE
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when full."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        """Create the handler.
+
+        Args:
+            log_queue: Bounded queue read by a QueueListener
+        """
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Queue the record as is, leaving all formatting to the listener.
 
+        Log arguments must therefore not be mutated after the call; the
+        request logs only pass strings and numbers.
 
-def setup_logging():
-    """Set up logging and return the custom logger"""
+        Args:
+            record: Log record
+
+        Returns:
+            Record to put on the queue
+        """
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put a record on the queue, or count it as dropped if full.
+
+        Args:
+            record: Prepared log record
+        """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+
+_listener: QueueListener | None = None
+
+
+def _start_listener(
+    handler: DroppingQueueHandler, output: logging.Handler
+) -> None:
+    """Give ``handler`` a fresh queue and a listener thread draining it."""
+    global _listener
+    handler.queue = queue.Queue(maxsize=handler.queue.maxsize)
+    _listener = QueueListener(
+        handler.queue, output, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def _stop_listener() -> None:
+    """Flush the remaining records at interpreter exit."""
+    if _listener is not None:
+        _listener.stop()
+
+
+def setup_logging(queue_size: int = DEFAULT_QUEUE_SIZE):
+    """Set up logging and return the custom logger
+
+    Args:
+        queue_size: Maximum number of records waiting to be written
+    """
     logger = logging.getLogger("flask_app")
     if not logger.handlers:  # Prevent duplicate handlers
-        logger.setLevel(logging.INFO)  # set level to track, can be overwritten
-        handler = logging.StreamHandler()
-        log_format = "%(asctime)s | %(levelname)s | %(message)s"
-        formatter = logging.Formatter(log_format, datefmt="%Y-%m-%d %H:%M:%S")
-        handler.setFormatter(formatter)
+        logger.setLevel(LOG_LEVEL)  # set level to track, can be overwritten
+        output = logging.StreamHandler()
+        if LOG_OUTPUT == "json":
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(
+                logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
+            )
+        handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        _start_listener(handler, output)
+        atexit.register(_stop_listener)
         logger.addHandler(handler)
     return logger
 
 
+def restart_after_fork() -> None:
+    """Restart the listener thread in a freshly forked worker process.
+
+    Threads do not survive ``fork``, so without this the inherited queue
+    would fill up and every record would be dropped. See
+    ``gunicorn.conf.py``.
+    """
+    handler = custom_logger.handlers[0]
+    if isinstance(handler, DroppingQueueHandler) and _listener is not None:
+        handler.dropped = 0
+        _start_listener(handler, *_listener.handlers)
+
+
+def logging_stats() -> dict[str, Any]:
+    """Report the queue backlog and the number of dropped records.
+
+    Returns:
+        Dict with queued, capacity and dropped counts
+    """
+    handler = custom_logger.handlers[0]
+    if not isinstance(handler, DroppingQueueHandler):
+        return {}
+    return {
+        "queued": handler.queue.qsize(),
+        "capacity": handler.queue.maxsize,
+        "dropped": handler.dropped,
+    }
+
+
 custom_logger = setup_logging()
@@ -0,0 +1,375 @@
+"""In-process metrics registry rendered in the Prometheus text format.
+
+Counters and histograms are updated without taking a lock: each thread
+adds to its own shard and the shards are only summed when the metrics are
+scraped. Copying a shard, or a histogram entry, is a single ``copy`` call,
+which CPython runs without releasing the GIL, so a scrape never sees a
+half-updated entry. The shards of finished threads are folded into a
+retired total and dropped, so a server starting one thread per request
+does not keep one shard per request. Gauges are rarely set and use a
+lock, or a callback evaluated at scrape time.
+
+The registry only holds this process' values; ``multiprocess`` merges
+the values of every gunicorn worker.
+"""
+
+import bisect
+import math
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from typing import Any
+
+Labels = tuple[str, ...]
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Render ``{name="value",...}``, or nothing without labels."""
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value the way Prometheus expects it."""
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Base class of a named metric with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        """Declare a metric.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Names of the labels every sample carries
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def values(self) -> dict[Labels, Any]:
+        """Current value of each label combination in this process."""
+        raise NotImplementedError
+
+    def samples(
+        self, values: dict[Labels, Any]
+    ) -> Iterator[tuple[str, Labels, Labels, float]]:
+        """Yield ``(suffix, extra label names, label values, value)``."""
+        raise NotImplementedError
+
+    def render(self, values: dict[Labels, Any] | None = None) -> str:
+        """Render the metric in the Prometheus text format.
+
+        Args:
+            values: Values to render instead of ``values()``, e.g. merged
+                from several processes
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        if values is None:
+            values = self.values()
+        for suffix, extra_names, labels, value in self.samples(values):
+            rendered = _format_labels(self.labelnames + extra_names, labels)
+            lines.append(
+                f"{self.name}{suffix}{rendered} {_format_value(value)}"
+            )
+        return "\n".join(lines)
+
+
+class _Sharded(Metric):
+    """Metric whose values are accumulated in one shard per thread."""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._local = threading.local()
+        self._shards: list[tuple[threading.Thread, dict[Labels, Any]]] = []
+        self._retired: dict[Labels, Any] = {}
+        self._lock = threading.Lock()
+
+    def _shard(self) -> dict[Labels, Any]:
+        """This thread's shard, created on first use."""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: dict[Labels, Any] = {}
+            self._local.shard = shard
+            with self._lock:
+                self._retire_finished()
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def _retire_finished(self) -> None:
+        """Fold the shards of finished threads into the retired total.
+
+        A finished thread no longer writes to its shard. The lock must be
+        held.
+        """
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                self._add(self._retired, shard)
+        self._shards = live
+
+    def _add(
+        self, totals: dict[Labels, Any], shard: dict[Labels, Any]
+    ) -> None:
+        """Add a shard's values into ``totals``."""
+        raise NotImplementedError
+
+    def values(self) -> dict[Labels, Any]:
+        """Sum of every shard, finished threads included."""
+        totals: dict[Labels, Any] = {}
+        with self._lock:
+            self._retire_finished()
+            self._add(totals, self._retired)
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            self._add(totals, shard.copy())
+        return totals
+
+
+class Counter(_Sharded):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        """Add to the count of a label combination.
+
+        Args:
+            labels: Label values, in ``labelnames`` order
+            amount: Non-negative increment
+        """
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _add(
+        self, totals: dict[Labels, float], shard: dict[Labels, float]
+    ) -> None:
+        """Add a shard's counts into ``totals``."""
+        for labels, value in shard.items():
+            totals[labels] = totals.get(labels, 0) + value
+
+    def samples(
+        self, values: dict[Labels, float]
+    ) -> Iterator[tuple[str, Labels, Labels, float]]:
+        """Yield the summed count of each label combination."""
+        for labels in sorted(values):
+            yield "", (), labels, values[labels]
+
+
+class Histogram(_Sharded):
+    """Distribution of observations over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Declare a histogram.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Names of the labels every sample carries
+            buckets: Sorted upper bounds, ``+Inf`` is added automatically
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        """Record one observation.
+
+        Args:
+            value: Observed value, e.g. a duration in seconds
+            labels: Label values, in ``labelnames`` order
+        """
+        shard = self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            # bucket counts (last one is +Inf), then sum
+            entry = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect.bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def _add(
+        self,
+        totals: dict[Labels, list[float]],
+        shard: dict[Labels, list[float]],
+    ) -> None:
+        """Add a shard's bucket counts and sums into ``totals``."""
+        for labels, entry in shard.items():
+            # the owning thread keeps updating the list in place
+            values = entry.copy()
+            total = totals.setdefault(labels, [0] * len(values))
+            for i, value in enumerate(values):
+                total[i] += value
+
+    def samples(
+        self, values: dict[Labels, list[float]]
+    ) -> Iterator[tuple[str, Labels, Labels, float]]:
+        """Yield cumulative buckets, sum and count per label combination."""
+        bounds = (*self.buckets, math.inf)
+        for labels in sorted(values):
+            total = values[labels]
+            cumulative = 0
+            for bound, count in zip(bounds, total):
+                cumulative += count
+                bucket_labels = (*labels, _format_value(bound))
+                yield "_bucket", ("le",), bucket_labels, cumulative
+            yield "_sum", (), labels, total[-1]
+            yield "_count", (), labels, cumulative
+
+
+class Gauge(Metric):
+    """Value that can go up and down, or is read from a callback."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Callable[[], dict[Labels, float]] | None = None,
+    ) -> None:
+        """Declare a gauge.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Names of the labels every sample carries
+            callback: Returns the values by label combination at scrape
+                time; when given, ``inc``/``dec``/``set`` are not used
+        """
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self._values: dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        """Increase the value of a label combination."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        """Decrease the value of a label combination."""
+        self.inc(labels, -amount)
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        """Set the value of a label combination."""
+        with self._lock:
+            self._values[labels] = value
+
+    def values(self) -> dict[Labels, float]:
+        """Current value of each label combination."""
+        if self.callback is not None:
+            return self.callback()
+        with self._lock:
+            return dict(self._values)
+
+    def samples(
+        self, values: dict[Labels, float]
+    ) -> Iterator[tuple[str, Labels, Labels, float]]:
+        """Yield the current value of each label combination."""
+        for labels in sorted(values):
+            yield "", (), labels, values[labels]
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        """Create an empty registry."""
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Any:
+        """Add a metric, or return the one already registered by name.
+
+        Args:
+            metric: Metric to add
+
+        Returns:
+            The registered metric
+        """
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def collect(self) -> dict[str, tuple[str, dict[Labels, Any]]]:
+        """Get the values of every metric in this process.
+
+        Returns:
+            Dict mapping metric name to its kind and values
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: (metric.kind, metric.values()) for metric in metrics
+        }
+
+    def render(
+        self, values: dict[str, dict[Labels, Any]] | None = None
+    ) -> str:
+        """Render every metric in the Prometheus text format.
+
+        Args:
+            values: Values by metric name to render instead of this
+                process' own, see ``multiprocess``
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        rendered = [
+            metric.render(
+                None if values is None else values.get(metric.name, {})
+            )
+            for metric in metrics
+        ]
+        return "\n".join(rendered) + "\n"
+
+
+registry = Registry()
@@ -0,0 +1,208 @@
+"""Metrics of every gunicorn worker, merged through a shared directory.
+
+Under gunicorn each scrape is answered by one of several worker
+processes, each with its own registry. With ``METRICS_DIR`` set, every
+worker writes the values of its registry to ``<METRICS_DIR>/<pid>.json``
+every ``METRICS_FLUSH_SECONDS`` (default 1) and when it exits, and the
+worker answering a scrape merges the files of all workers with its own
+current values. When a worker exits, the master folds its counters and
+histograms into ``retired.json``, so restarted workers do not make them
+go backwards. Gauges are summed over the live workers only.
+
+The values of other workers are up to ``METRICS_FLUSH_SECONDS`` old.
+Without ``METRICS_DIR``, e.g. under the development server, ``/metrics``
+only reports the process answering it. See ``gunicorn.conf.py``.
+"""
+
+import fcntl
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from app.metrics_utils.metrics import Labels, Registry
+
+METRICS_DIR = os.environ.get("METRICS_DIR")
+FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "1"))
+RETIRED_FILE = "retired.json"
+LOCK_FILE = ".lock"
+# kept after the process that counted them exits
+CUMULATIVE_KINDS = ("counter", "histogram")
+
+Values = dict[str, tuple[str, dict[Labels, Any]]]
+
+
+@contextmanager
+def _locked(directory: Path) -> Iterator[None]:
+    """Hold the directory's lock between retiring and reading files."""
+    with (directory / LOCK_FILE).open("w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def _write(path: Path, values: Values) -> None:
+    """Replace a values file at once, so readers never see half of it."""
+    data = {
+        name: [
+            kind,
+            [[list(labels), value] for labels, value in series.items()],
+        ]
+        for name, (kind, series) in values.items()
+    }
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data))
+    tmp.replace(path)
+
+
+def _read(path: Path) -> Values:
+    """Read a values file, empty if it does not exist."""
+    try:
+        data = json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    return {
+        name: (kind, {tuple(labels): value for labels, value in series})
+        for name, (kind, series) in data.items()
+    }
+
+
+def _merge(totals: Values, values: Values, cumulative_only: bool) -> None:
+    """Add one process' values into ``totals``."""
+    for name, (kind, series) in values.items():
+        if cumulative_only and kind not in CUMULATIVE_KINDS:
+            continue
+        merged = totals.setdefault(name, (kind, {}))[1]
+        for labels, value in series.items():
+            if kind == "histogram":
+                total = merged.setdefault(labels, [0] * len(value))
+                for i, count in enumerate(value):
+                    total[i] += count
+            else:
+                merged[labels] = merged.get(labels, 0) + value
+
+
+def write_snapshot(registry: Registry, directory: str | None = None) -> None:
+    """Write this process' values for the other workers to read.
+
+    Args:
+        registry: Registry of this process
+        directory: Shared directory, defaults to METRICS_DIR
+    """
+    directory = directory or METRICS_DIR
+    if directory:
+        _write(Path(directory) / f"{os.getpid()}.json", registry.collect())
+
+
+def collect_all(registry: Registry, directory: str) -> Values:
+    """Merge the values of every worker, this one read live.
+
+    Args:
+        registry: Registry of this process
+        directory: Shared directory
+
+    Returns:
+        Dict mapping metric name to its kind and merged values
+    """
+    path = Path(directory)
+    own = f"{os.getpid()}.json"
+    with _locked(path):
+        retired = _read(path / RETIRED_FILE)
+        others = [
+            _read(file)
+            for file in path.glob("*.json")
+            if file.name not in (own, RETIRED_FILE)
+        ]
+    totals: Values = {}
+    for values in (registry.collect(), *others):
+        _merge(totals, values, cumulative_only=False)
+    _merge(totals, retired, cumulative_only=True)
+    return totals
+
+
+def render_metrics(registry: Registry, directory: str | None = None) -> str:
+    """Render the metrics of every worker, or of this process alone.
+
+    Args:
+        registry: Registry of this process
+        directory: Shared directory, defaults to METRICS_DIR
+
+    Returns:
+        Metrics in the Prometheus text format
+    """
+    directory = directory or METRICS_DIR
+    if not directory:
+        return registry.render()
+    merged = collect_all(registry, directory)
+    return registry.render(
+        {name: values for name, (_, values) in merged.items()}
+    )
+
+
+def mark_process_dead(pid: int, directory: str | None = None) -> None:
+    """Fold an exited worker's counters and histograms into the total.
+
+    Called by the gunicorn master once the worker is gone.
+
+    Args:
+        pid: Process id of the exited worker
+        directory: Shared directory, defaults to METRICS_DIR
+    """
+    directory = directory or METRICS_DIR
+    if not directory:
+        return
+    path = Path(directory)
+    with _locked(path):
+        retired = _read(path / RETIRED_FILE)
+        _merge(retired, _read(path / f"{pid}.json"), cumulative_only=True)
+        _write(path / RETIRED_FILE, retired)
+        (path / f"{pid}.json").unlink(missing_ok=True)
+
+
+def reset_directory(directory: str | None = None) -> None:
+    """Create the shared directory, or empty it before the server starts.
+
+    Files left by an earlier run would count twice, or belong to a
+    process id that a new worker reuses.
+
+    Args:
+        directory: Shared directory, defaults to METRICS_DIR
+    """
+    directory = directory or METRICS_DIR
+    if not directory:
+        return
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    for file in path.glob("*.json"):
+        file.unlink()
+
+
+def start_flushing(
+    registry: Registry, interval: float = FLUSH_SECONDS
+) -> threading.Thread | None:
+    """Write this process' values every ``interval`` seconds.
+
+    Threads do not survive ``fork``: start it in each worker.
+
+    Args:
+        registry: Registry of this process
+        interval: Seconds between two snapshots
+
+    Returns:
+        The daemon thread writing the snapshots, None without METRICS_DIR
+    """
+    if not METRICS_DIR:
+        return None
+
+    def flush() -> None:
+        while True:
+            time.sleep(interval)
+            write_snapshot(registry)
+
+    write_snapshot(registry)
+    thread = threading.Thread(target=flush, name="metrics-flush", daemon=True)
+    thread.start()
+    return thread
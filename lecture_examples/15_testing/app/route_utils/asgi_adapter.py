@@ -0,0 +1,178 @@
+"""Serve the Flask app over ASGI with handlers on a bounded thread pool.
+
+The event loop owns every client connection: it reads request bodies and
+writes responses, waiting on slow clients without holding a thread. The
+unchanged Flask handlers, and with them every ``sql_utils`` call, run on a
+fixed-size executor, one step at a time: a thread is busy while the view
+runs and while each chunk of a streamed body is produced, never while the
+chunk is being sent.
+"""
+
+import asyncio
+import contextvars
+import io
+import sys
+from collections.abc import Awaitable, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+Scope = dict[str, Any]
+Message = dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+_END = object()
+
+
+def build_environ(scope: Scope, body: bytes) -> dict[str, Any]:
+    """Translate an ASGI HTTP scope into a WSGI environ.
+
+    Args:
+        scope: ASGI connection scope
+        body: Complete request body
+
+    Returns:
+        WSGI environ dict
+    """
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin1"),
+        "PATH_INFO": scope["path"].encode().decode("latin1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"], environ["REMOTE_PORT"] = (
+            scope["client"][0],
+            str(scope["client"][1]),
+        )
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin1").upper().replace("-", "_")
+        value = raw_value.decode("latin1")
+        if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = f"HTTP_{name}"
+        if name in environ:
+            value = f"{environ[name]},{value}"
+        environ[name] = value
+    return environ
+
+
+class ExecutorASGIApp:
+    """ASGI application running a WSGI app on a bounded executor."""
+
+    def __init__(
+        self, wsgi_app: Callable[..., Iterable[bytes]], max_workers: int
+    ) -> None:
+        """Wrap a WSGI application.
+
+        Args:
+            wsgi_app: WSGI application, e.g. the Flask app
+            max_workers: Threads available to run handlers
+        """
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="asgi"
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Handle one ASGI connection.
+
+        Args:
+            scope: ASGI connection scope
+            receive: Awaitable returning the next client message
+            send: Awaitable sending a message to the client
+        """
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type {scope['type']}")
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        """Acknowledge startup and shut the executor down at exit."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope: Scope, receive: Receive, send: Send):
+        """Run one request through the WSGI app and send the response."""
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        loop = asyncio.get_running_loop()
+        # One context per request, entered by each step in turn, so
+        # stream_with_context generators see their request on any thread.
+        context = contextvars.Context()
+        response: dict[str, Any] = {}
+        written: list[bytes] = []
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [
+                (name.lower().encode("latin1"), value.encode("latin1"))
+                for name, value in headers
+            ]
+            return written.append
+
+        def run(func: Callable[..., Any], *args: Any) -> Awaitable[Any]:
+            return loop.run_in_executor(
+                self.executor, context.run, func, *args
+            )
+
+        result = await run(
+            self.wsgi_app, build_environ(scope, body), start_response
+        )
+        try:
+            chunks = iter(result)
+            chunk = await run(next, chunks, _END)
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": response["status"],
+                    "headers": response["headers"],
+                }
+            )
+            for data in written:
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": data,
+                        "more_body": True,
+                    }
+                )
+            while chunk is not _END:
+                if chunk:
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": chunk,
+                            "more_body": True,
+                        }
+                    )
+                chunk = await run(next, chunks, _END)
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            if hasattr(result, "close"):
+                await run(result.close)
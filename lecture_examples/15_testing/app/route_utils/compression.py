@@ -0,0 +1,83 @@
+"""Compress JSON and text responses with brotli or gzip.
+
+Bodies smaller than ``COMPRESS_MIN_SIZE`` bytes are sent as is, since the
+encoding overhead outweighs the saving. Brotli is used when the ``brotli``
+package is installed and the client accepts it, gzip otherwise. Streamed
+responses are left untouched: their body is produced while it is sent
+and is never held in memory as a whole.
+"""
+
+import gzip
+from http import HTTPStatus
+
+from flask import Flask, Response, request
+
+try:
+    import brotli  # optional, preferred when the client accepts it
+except ImportError:
+    brotli = None
+
+DEFAULT_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/html")
+
+
+def choose_encoding(response: Response, min_size: int) -> str | None:
+    """Pick the content coding for a response, if it should be compressed.
+
+    Args:
+        response: Response about to be sent
+        min_size: Smallest body size worth compressing, in bytes
+
+    Returns:
+        ``br``, ``gzip`` or None to send the body unchanged
+    """
+    if (
+        response.status_code != HTTPStatus.OK
+        or response.is_streamed
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_TYPES
+        or (response.content_length or 0) < min_size
+    ):
+        return None
+    accepted = request.accept_encodings
+    if brotli is not None and accepted.quality("br") > 0:
+        return "br"
+    if accepted.quality("gzip") > 0:
+        return "gzip"
+    return None
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a body with the given content coding.
+
+    Args:
+        data: Uncompressed body
+        encoding: ``br`` or ``gzip``
+
+    Returns:
+        Compressed body
+    """
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def register_compression(app: Flask) -> None:
+    """Compress the app's large responses for clients that accept it.
+
+    Args:
+        app: Flask application instance, read for ``COMPRESS_MIN_SIZE``
+    """
+    min_size = app.config.get("COMPRESS_MIN_SIZE", DEFAULT_MIN_SIZE)
+
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        response.vary.add("Accept-Encoding")
+        encoding = choose_encoding(response, min_size)
+        if encoding is not None:
+            response.set_data(compress(response.get_data(), encoding))
+            response.headers["Content-Encoding"] = encoding
+        return response
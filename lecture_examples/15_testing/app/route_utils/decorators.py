@@ -1,22 +1,76 @@
-"""Decorator functions for request validation, logging and timing."""
+"""Decorator functions for request validation, caching, logging, timing."""
 
+import logging
 import time
-from collections.abc import Callable
+from collections.abc import Callable, Hashable
 from functools import wraps
+from http import HTTPStatus
 from typing import Any, TypeVar
 
 from flask import Response, jsonify, request
 
-from app.data_utils.sql_utils import all_teams_sql
-from app.logger_utils.custom_logger import custom_logger
+from app.data_utils.data_version import data_version_tag
+from app.data_utils.loading_utils import DEFAULT_SEASON
+from app.data_utils.query_stats import track_queries
+from app.data_utils.sql_utils import all_season_teams_sql, list_seasons_sql
+from app.logger_utils.custom_logger import custom_logger, sample_response
+from app.route_utils.validators import validation_registry
+
+validation_registry.register("season", list_seasons_sql)
+# Teams change between seasons, so they are keyed by (season, team).
+validation_registry.register("team", all_season_teams_sql)
 
 # Type for decorated functions
 F = TypeVar("F", bound=Callable[..., Any])
 ApiResponse = tuple[Response | dict, int]
 
 
+def key_not_found(
+    entity: str, key: Hashable, label: str
+) -> ApiResponse | None:
+    """Check a key against ``validation_registry``.
+
+    Args:
+        entity: Entity name registered in ``validation_registry``
+        key: Key to look up
+        label: Human readable key used in the 404 message, e.g. ``Team WAS``
+
+    Returns:
+        A 404 response for unknown keys, None for valid ones
+    """
+    if validation_registry.is_valid(entity, key):
+        return None
+    return jsonify({"Error": f"{label} does not exist"}), 404
+
+
+def with_season(f: F) -> F:
+    """Passes the ``?season=`` query argument as the ``season`` keyword.
+
+    Defaults to ``DEFAULT_SEASON`` and returns 404 for seasons that are
+    not in the database. Apply it above ``validate_team``.
+
+    Args:
+        f: Function to decorate
+
+    Returns:
+        Decorated function that reads and validates the season
+    """
+
+    @wraps(f)
+    def decorated_function(*args: Any, **kwargs: Any) -> ApiResponse:
+        season = request.args.get("season", DEFAULT_SEASON)
+        not_found = key_not_found("season", season, f"Season {season}")
+        if not_found is not None:
+            return not_found
+        return f(*args, season=season, **kwargs)
+
+    return decorated_function  # type: ignore
+
+
 def validate_team(f: F) -> F:
-    """Validates team exists, returns 404 if not found.
+    """Validates team exists in the season, returns 404 if not found.
+
+    The season is the ``season`` keyword argument, see ``with_season``.
 
     Args:
         f: Function to decorate
@@ -27,12 +81,47 @@ def validate_team(f: F) -> F:
 
     @wraps(f)
     def decorated_function(
-        team: str, *args: Any, **kwargs: Any
+        team: Any, *args: Any, season: str = DEFAULT_SEASON, **kwargs: Any
     ) -> ApiResponse:
-        all_teams = all_teams_sql()
-        if team not in all_teams:
-            return jsonify({"Error": f"Team {team} does not exist"}), 404
-        return f(team, *args, **kwargs)
+        not_found = key_not_found("team", (season, team), f"Team {team}")
+        if not_found is not None:
+            return not_found
+        return f(team, *args, season=season, **kwargs)
+
+    return decorated_function  # type: ignore
+
+
+def conditional_get(f: F) -> F:
+    """Answers If-None-Match with 304 while the data is unchanged.
+
+    The ETag is the data version stored in the database, which every
+    write bumps, so a matching request is answered by reading that one
+    row instead of running the view. The tag is the same in every
+    gunicorn worker, so it matches whichever worker answers. Apply it
+    below the validation decorators so unknown keys still get their 404.
+
+    Args:
+        f: Function to decorate
+
+    Returns:
+        Decorated function that sets and checks the ETag
+    """
+
+    @wraps(f)
+    def decorated_function(*args: Any, **kwargs: Any) -> ApiResponse:
+        # Taken before the view runs: a concurrent write can only make the
+        # tag older than the body, which costs one extra full response.
+        etag = data_version_tag()
+        if request.if_none_match.contains_weak(etag):
+            not_modified = Response(status=HTTPStatus.NOT_MODIFIED)
+            not_modified.set_etag(etag, weak=True)
+            return not_modified, HTTPStatus.NOT_MODIFIED
+        response = f(*args, **kwargs)
+        body, status = response
+        if status == HTTPStatus.OK and isinstance(body, Response):
+            body.set_etag(etag, weak=True)
+            body.cache_control.no_cache = True
+        return response
 
     return decorated_function  # type: ignore
 
@@ -49,18 +138,24 @@ def log_request_response(f: F) -> F:
 
     @wraps(f)
     def decorated_function(*args: Any, **kwargs: Any) -> ApiResponse:
+        if not custom_logger.isEnabledFor(logging.DEBUG):
+            return f(*args, **kwargs)
         custom_logger.debug(
-            f"Request received: {request.method} {request.path}"
+            "Request received: %s %s", request.method, request.path
         )
         response = f(*args, **kwargs)
-        custom_logger.debug(f"Response: {response[1]} - {request.path}")
+        custom_logger.debug("Response: %s - %s", response[1], request.path)
         return response
 
     return decorated_function  # type: ignore
 
 
 def log_request_response_time(f: F) -> F:
-    """Logs request/response with execution time in milliseconds.
+    """Logs one line per response with execution time in milliseconds.
+
+    The record carries structured fields (method, path, status,
+    duration_ns, db_time_ns, rows, bytes) used by the JSON log format.
+    Successful responses are sampled at LOG_SAMPLE_RATE.
 
     Args:
         f: Function to decorate
@@ -71,16 +166,33 @@ def log_request_response_time(f: F) -> F:
 
     @wraps(f)
     def decorated_function(*args: Any, **kwargs: Any) -> ApiResponse:
-        start_time = time.time()
-        custom_logger.info(
-            f"Request received: {request.method} {request.path}"
-        )
-        response = f(*args, **kwargs)
-        execution_time = (time.time() - start_time) * 1000
-        custom_logger.info(
-            f"Response: {response[1]} - {request.path} "
-            f"- Execution time: {execution_time:.2f}ms"
-        )
+        start_time = time.perf_counter_ns()
+        with track_queries() as stats:
+            response = f(*args, **kwargs)
+        duration_ns = time.perf_counter_ns() - start_time
+
+        status = response[1]
+        if custom_logger.isEnabledFor(logging.INFO) and sample_response(
+            status
+        ):
+            body = response[0]
+            fields = {
+                "method": request.method,
+                "path": request.path,
+                "status": status,
+                "duration_ns": duration_ns,
+                "db_time_ns": stats.db_time_ns,
+                "rows": stats.rows,
+                "bytes": getattr(body, "content_length", None),
+            }
+            custom_logger.info(
+                "Response: %s - %s %s - Execution time: %.2fms",
+                status,
+                fields["method"],
+                fields["path"],
+                duration_ns / 1e6,
+                extra={"fields": fields},
+            )
         return response
 
     return decorated_function  # type: ignore
@@ -0,0 +1,89 @@
+"""Request metrics collected for every route of the app.
+
+Each response adds to a request counter and a latency histogram labeled
+by method, route rule (not the raw path, to keep the number of series
+bounded) and status. Connection pool usage and dropped log records are
+read when the metrics are scraped.
+"""
+
+import time
+
+from flask import Flask, Response, g, request
+
+from app.data_utils.connection_pool import get_pool
+from app.logger_utils.custom_logger import logging_stats
+from app.metrics_utils.metrics import Counter, Gauge, Histogram, registry
+from app.route_utils.timing import START_KEY
+
+UNMATCHED_ROUTE = "unmatched"
+
+REQUESTS = registry.register(
+    Counter(
+        "http_requests_total",
+        "HTTP requests handled.",
+        ("method", "route", "status"),
+    )
+)
+LATENCY = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time from receiving a request to returning its response.",
+        ("method", "route", "status"),
+    )
+)
+IN_FLIGHT = registry.register(
+    Gauge("http_requests_in_flight", "Requests currently being handled.")
+)
+POOL_CONNECTIONS = registry.register(
+    Gauge(
+        "db_pool_connections",
+        "SQLite connections held by the pool.",
+        ("state",),
+        callback=lambda: {
+            ("idle",): get_pool().metrics()["idle"],
+            ("in_use",): get_pool().metrics()["in_use"],
+        },
+    )
+)
+LOG_DROPPED = registry.register(
+    Gauge(
+        "log_records_dropped",
+        "Log records dropped because the log queue was full.",
+        callback=lambda: {(): logging_stats().get("dropped", 0)},
+    )
+)
+
+
+def register_request_metrics(app: Flask) -> None:
+    """Record request count, latency and in-flight requests for the app.
+
+    Args:
+        app: Flask application instance
+    """
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_start_ns = request.environ.get(
+            START_KEY, time.perf_counter_ns()
+        )
+        IN_FLIGHT.inc()
+
+    @app.after_request
+    def record_request_metrics(response: Response) -> Response:
+        start_ns = g.get("metrics_start_ns")
+        if start_ns is None:
+            return response
+        rule = request.url_rule
+        labels = (
+            request.method,
+            rule.rule if rule is not None else UNMATCHED_ROUTE,
+            str(response.status_code),
+        )
+        REQUESTS.inc(labels)
+        LATENCY.observe((time.perf_counter_ns() - start_ns) / 1e9, labels)
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc: BaseException | None) -> None:
+        if g.pop("metrics_start_ns", None) is not None:
+            IN_FLIGHT.dec()
@@ -0,0 +1,251 @@
+"""In-process cache of serialized GET responses.
+
+The query cache still leaves every hit to rebuild and serialize the JSON
+body. This cache keeps the final bytes per path and query string, bounded
+by their total size with LRU eviction. An entry is only served at the
+data version it was built from, which is stored in the database (see
+``data_version``), so any write committed through ``sql_utils`` by any
+gunicorn worker makes every stored body stale in all of them. The time
+to live only limits how long changes made outside of the app go
+unnoticed.
+
+Compressed copies of a body are kept next to it, one per content coding,
+so a hit is sent without compressing it again (see ``compression``).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import wraps
+from http import HTTPStatus
+from typing import Any, NamedTuple, TypeVar
+
+from flask import Response, current_app, request
+
+from app.data_utils.data_version import DataVersion, current_data_version
+from app.route_utils.compression import (
+    DEFAULT_MIN_SIZE,
+    choose_encoding,
+    compress,
+)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+DEFAULT_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_BYTES", "16777216"))
+DEFAULT_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "60"))
+
+
+class CachedResponse(NamedTuple):
+    """A stored response body and what is needed to send it again.
+
+    ``encoded`` maps a content coding to the compressed body.
+    """
+
+    expires: float
+    version: DataVersion
+    body: bytes
+    mimetype: str
+    encoded: dict[str, bytes]
+
+    def size(self) -> int:
+        """Bytes held by the body and its compressed copies."""
+        return len(self.body) + sum(map(len, self.encoded.values()))
+
+
+class ResponseCache:
+    """Thread-safe LRU cache bounded by the total size of the bodies."""
+
+    def __init__(self, max_bytes: int, ttl: float) -> None:
+        """Create an empty cache.
+
+        Args:
+            max_bytes: Maximum total size of the stored bodies, compressed
+                copies included
+            ttl: Seconds an entry stays valid
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple[str, bytes], CachedResponse] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remove(self, key: tuple[str, bytes]) -> None:
+        """Drop an entry; the lock must be held."""
+        self.bytes -= self._entries.pop(key).size()
+
+    def _evict(self) -> None:
+        """Drop the oldest entries until the limit holds; lock held."""
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def get(
+        self, key: tuple[str, bytes], version: DataVersion
+    ) -> CachedResponse | None:
+        """Look up a fresh entry.
+
+        Args:
+            key: Path and raw query string
+            version: Current data version
+
+        Returns:
+            The stored response, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if (
+                    entry.version == version
+                    and time.monotonic() < entry.expires
+                ):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        key: tuple[str, bytes],
+        body: bytes,
+        mimetype: str,
+        version: DataVersion,
+    ) -> CachedResponse | None:
+        """Store a body built at the given data version.
+
+        Bodies larger than the whole cache are not stored.
+
+        Args:
+            key: Path and raw query string
+            body: Serialized response body
+            mimetype: Response mimetype
+            version: Data version the body was built from
+
+        Returns:
+            The stored entry, or None if the body is too large
+        """
+        if len(body) > self.max_bytes:
+            return None
+        entry = CachedResponse(
+            time.monotonic() + self.ttl, version, body, mimetype, {}
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.bytes += len(body)
+            self._evict()
+        return entry
+
+    def encoded_body(
+        self, key: tuple[str, bytes], entry: CachedResponse, encoding: str
+    ) -> bytes:
+        """Get an entry's body compressed, compressing it only once.
+
+        Args:
+            key: Path and raw query string of the entry
+            entry: Entry returned by ``get`` or ``put``
+            encoding: Content coding, ``br`` or ``gzip``
+
+        Returns:
+            The compressed body
+        """
+        data = entry.encoded.get(encoding)
+        if data is not None:
+            return data
+        data = compress(entry.body, encoding)
+        with self._lock:
+            # the entry may have been replaced or evicted meanwhile
+            if (
+                self._entries.get(key) is entry
+                and encoding not in entry.encoded
+            ):
+                entry.encoded[encoding] = data
+                self.bytes += len(data)
+                self._evict()
+        return data
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Report cache counters.
+
+        Returns:
+            Dict with size, limits and hit/miss/eviction counts
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+response_cache = ResponseCache(DEFAULT_MAX_BYTES, DEFAULT_TTL)
+
+
+def cached_response(f: F) -> F:
+    """Serves GET responses from ``response_cache`` while data is unchanged.
+
+    Only complete 200 responses are stored; streamed bodies and other
+    methods always run the view. Bodies are sent compressed from the
+    cache when the client accepts it, see ``encoded_body``.
+
+    Args:
+        f: Function to decorate
+
+    Returns:
+        Decorated function that reads and fills the cache
+    """
+
+    @wraps(f)
+    def decorated_function(*args: Any, **kwargs: Any) -> Any:
+        if request.method != "GET":
+            return f(*args, **kwargs)
+        key = (request.path, request.query_string)
+        version = current_data_version()
+        entry = response_cache.get(key, version)
+        if entry is not None:
+            return _send(key, entry), HTTPStatus.OK
+        response = f(*args, **kwargs)
+        body, status = response
+        if (
+            status == HTTPStatus.OK
+            and isinstance(body, Response)
+            and not body.is_streamed
+        ):
+            entry = response_cache.put(
+                key, body.get_data(), body.mimetype, version
+            )
+            if entry is not None:
+                return _send(key, entry), HTTPStatus.OK
+        return response
+
+    return decorated_function  # type: ignore
+
+
+def _send(key: tuple[str, bytes], entry: CachedResponse) -> Response:
+    """Build the response for a cached entry, compressed if accepted."""
+    response = Response(entry.body, mimetype=entry.mimetype)
+    min_size = current_app.config.get("COMPRESS_MIN_SIZE", DEFAULT_MIN_SIZE)
+    encoding = choose_encoding(response, min_size)
+    if encoding is not None:
+        response.set_data(response_cache.encoded_body(key, entry, encoding))
+        response.headers["Content-Encoding"] = encoding
+    return response
@@ -0,0 +1,59 @@
+"""Helpers for streaming large JSON responses."""
+
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from flask import Response, current_app, stream_with_context
+
+DEFAULT_CHUNK_ROWS = 500
+
+
+def iter_json_list(
+    key: str, records: Iterable[Any], chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> Iterator[str]:
+    """Encode ``{key: [records...]}`` as JSON text, piece by piece.
+
+    Args:
+        key: Name of the top-level key holding the list
+        records: Items to encode, consumed lazily
+        chunk_rows: Number of records encoded per yielded chunk
+
+    Yields:
+        Consecutive fragments of the JSON document
+    """
+    dumps = current_app.json.dumps
+    yield f"{{{dumps(key)}: ["
+    separator = ""
+    chunk: list[Any] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_rows:
+            # one encoder call per chunk, without the list's brackets
+            yield separator + dumps(chunk)[1:-1]
+            separator = ","
+            chunk = []
+    if chunk:
+        yield separator + dumps(chunk)[1:-1]
+    yield "]}"
+
+
+def stream_json_list(
+    key: str, records: Iterable[Any], chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> Response:
+    """Build a streamed JSON response of the form ``{key: [...]}``.
+
+    The records are only pulled from the iterable while the body is being
+    sent, so memory use does not grow with the number of records.
+
+    Args:
+        key: Name of the top-level key holding the list
+        records: Items to encode, typically a database row generator
+        chunk_rows: Number of records encoded per chunk
+
+    Returns:
+        Response: Streaming application/json response
+    """
+    return Response(
+        stream_with_context(iter_json_list(key, records, chunk_rows)),
+        mimetype="application/json",
+    )
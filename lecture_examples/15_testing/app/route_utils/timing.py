@@ -0,0 +1,159 @@
+"""App-wide request timing reported in a ``Server-Timing`` header.
+
+Every request is timed with ``perf_counter_ns`` from the moment the WSGI
+app is entered, and the total is split into routing (context setup and
+URL matching), SQLite work (from ``query_stats``), JSON serialization,
+logging on the request thread and the remaining application time, e.g.::
+
+    Server-Timing: routing;dur=0.052, db;dur=1.913, serialize;dur=0.301,
+        log;dur=0.012, app;dur=0.154, total;dur=2.432
+
+Durations are in milliseconds. Work done while a streamed body is being
+sent happens after the header is written and is not included.
+"""
+
+import logging
+import time
+from collections.abc import Callable, Iterable
+from contextlib import ExitStack
+from functools import wraps
+from typing import Any
+
+from flask import Flask, Response, g, has_app_context, request
+
+from app.data_utils.query_stats import track_queries
+from app.logger_utils.custom_logger import custom_logger
+from app.route_utils.json_provider import FastJSONProvider
+
+START_KEY = "app.timing.start_ns"
+PHASES = ("routing", "db", "serialize", "log", "app", "total")
+
+
+class RequestTiming:
+    """Phase durations of one request, in nanoseconds."""
+
+    __slots__ = ("log_ns", "phases", "serialize_ns", "start_ns")
+
+    def __init__(self, start_ns: int) -> None:
+        """Start timing a request.
+
+        Args:
+            start_ns: ``perf_counter_ns`` when the request was received
+        """
+        self.start_ns = start_ns
+        self.serialize_ns = 0
+        self.log_ns = 0
+        self.phases: dict[str, int] = {}
+
+    def server_timing(self) -> str:
+        """Format the phases as a ``Server-Timing`` header value."""
+        return ", ".join(
+            f"{name};dur={self.phases[name] / 1e6:.3f}"
+            for name in PHASES
+            if name in self.phases
+        )
+
+
+def _add_time(attribute: str, duration_ns: int) -> None:
+    """Add to a phase of the current request's timing, if any."""
+    if has_app_context():
+        timing = g.get("timing")
+        if timing is not None:
+            setattr(
+                timing, attribute, getattr(timing, attribute) + duration_ns
+            )
+
+
+class TimedJSONProvider(FastJSONProvider):
+    """JSON provider that adds its encoding time to the request timing."""
+
+    def encode(self, obj: Any, **kwargs: Any) -> str | bytes:
+        """Serialize data as JSON, timing the call.
+
+        Args:
+            obj: Data to serialize
+            **kwargs: Passed to ``json.dumps``
+
+        Returns:
+            JSON text or UTF-8 encoded JSON
+        """
+        start = time.perf_counter_ns()
+        try:
+            return super().encode(obj, **kwargs)
+        finally:
+            _add_time("serialize_ns", time.perf_counter_ns() - start)
+
+
+def _timed_handle(handler: logging.Handler) -> None:
+    """Make a log handler add its time on the request thread to timing."""
+    if hasattr(handler.handle, "__wrapped__"):
+        return
+    handle = handler.handle
+
+    @wraps(handle)
+    def timed_handle(record: logging.LogRecord) -> Any:
+        start = time.perf_counter_ns()
+        try:
+            return handle(record)
+        finally:
+            _add_time("log_ns", time.perf_counter_ns() - start)
+
+    handler.handle = timed_handle  # type: ignore[method-assign]
+
+
+def _stamp_start(
+    wsgi_app: Callable[..., Iterable[bytes]],
+) -> Callable[..., Iterable[bytes]]:
+    """Wrap a WSGI app to record when each request enters it."""
+
+    @wraps(wsgi_app)
+    def timed_wsgi_app(environ: dict[str, Any], start_response: Any):
+        environ[START_KEY] = time.perf_counter_ns()
+        return wsgi_app(environ, start_response)
+
+    return timed_wsgi_app
+
+
+def register_request_timing(app: Flask) -> None:
+    """Time every request of the app and add a Server-Timing header.
+
+    Register before any other ``after_request`` hook so their work is
+    included in the total.
+
+    Args:
+        app: Flask application instance
+    """
+    app.wsgi_app = _stamp_start(app.wsgi_app)  # type: ignore[method-assign]
+    app.json = TimedJSONProvider(app)
+    for handler in custom_logger.handlers:
+        _timed_handle(handler)
+
+    @app.before_request
+    def start_request_timing():
+        now = time.perf_counter_ns()
+        timing = RequestTiming(request.environ.get(START_KEY, now))
+        timing.phases["routing"] = now - timing.start_ns
+        g.timing = timing
+        g.timing_scope = ExitStack()
+        g.query_stats = g.timing_scope.enter_context(track_queries())
+
+    @app.after_request
+    def add_server_timing(response: Response) -> Response:
+        timing = g.get("timing")
+        if timing is None:
+            return response
+        total = time.perf_counter_ns() - timing.start_ns
+        phases = timing.phases
+        phases["db"] = g.query_stats.db_time_ns
+        phases["serialize"] = timing.serialize_ns
+        phases["log"] = timing.log_ns
+        phases["app"] = max(total - sum(phases.values()), 0)
+        phases["total"] = total
+        response.headers["Server-Timing"] = timing.server_timing()
+        return response
+
+    @app.teardown_request
+    def stop_request_timing(exc: BaseException | None) -> None:
+        scope = g.pop("timing_scope", None)
+        if scope is not None:
+            scope.close()
@@ -0,0 +1,85 @@
+"""Registry of valid entity keys used by the route validators.
+
+Each entity (teams, and later seasons, player ids, stock symbols...) is
+registered with a loader returning its valid keys. The keys are kept in a
+frozenset so a lookup is a hash probe, and are reloaded only when the data
+version changes, i.e. after a write by any process, or the set gets older
+than ``max_age`` seconds (to pick up changes made outside of the app).
+"""
+
+import threading
+import time
+from collections.abc import Callable, Hashable, Iterable
+
+from app.data_utils.data_version import DataVersion, current_data_version
+
+DEFAULT_MAX_AGE = 60.0
+
+Loader = Callable[[], Iterable[Hashable]]
+
+
+class ValidationRegistry:
+    """Named sets of valid keys, refreshed on data changes."""
+
+    def __init__(self, max_age: float = DEFAULT_MAX_AGE) -> None:
+        """Create an empty registry.
+
+        Args:
+            max_age: Seconds after which a key set is reloaded regardless
+        """
+        self.max_age = max_age
+        self._loaders: dict[str, Loader] = {}
+        self._keys: dict[str, tuple[DataVersion, float, frozenset]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Loader) -> None:
+        """Register the loader of an entity's valid keys.
+
+        Args:
+            name: Entity name, e.g. ``team``
+            loader: Function returning every valid key
+        """
+        with self._lock:
+            self._loaders[name] = loader
+            self._keys.pop(name, None)
+
+    def valid_keys(self, name: str) -> frozenset:
+        """Get the current set of valid keys for an entity.
+
+        Args:
+            name: Registered entity name
+
+        Returns:
+            frozenset of valid keys
+
+        Raises:
+            KeyError: If no loader is registered under ``name``
+        """
+        version = current_data_version()
+        cached = self._keys.get(name)
+        if (
+            cached is not None
+            and cached[0] == version
+            and time.monotonic() - cached[1] < self.max_age
+        ):
+            return cached[2]
+
+        keys = frozenset(self._loaders[name]())
+        with self._lock:
+            self._keys[name] = (version, time.monotonic(), keys)
+        return keys
+
+    def is_valid(self, name: str, key: Hashable) -> bool:
+        """Check whether a key exists for an entity.
+
+        Args:
+            name: Registered entity name
+            key: Key to check
+
+        Returns:
+            True if the key is valid
+        """
+        return key in self.valid_keys(name)
+
+
+validation_registry = ValidationRegistry()
@@ -0,0 +1,20 @@
+"""ASGI entry point: the same app served from an event loop.
+
+Client connections are handled by the ASGI server's event loop while the
+Flask handlers run on a bounded thread pool sized by ``ASYNC_MAX_WORKERS``
+(defaults to the connection pool size; see
+``app.route_utils.asgi_adapter``). Run from the project root:
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+"""
+
+import os
+
+from app.route_utils.asgi_adapter import ExecutorASGIApp
+from flask_app import app
+
+application = ExecutorASGIApp(
+    app,
+    max_workers=int(
+        os.environ.get("ASYNC_MAX_WORKERS", app.config["DB_POOL_SIZE"])
+    ),
+)
@@ -0,0 +1,185 @@
+"""Benchmark of sync (gunicorn) vs async (uvicorn + ASGI) serving.
+
+Starts one server process per mode, both with the same number of threads
+touching SQLite, and drives it with many concurrent keep-alive clients,
+first on their own and then while a few slow clients trickle-read the
+full export. A sync worker keeps a thread blocked on every slow reader;
+the async mode only uses a thread to produce each chunk.
+Requires gunicorn and uvicorn. The clients are plain asyncio
+keep-alive connections so the load generator is not the bottleneck.
+
+Run from the project root:
+    python benchmarks/bench_async.py [--clients N] [--requests N] [--slow N]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.resolve()
+PATHS = ("/api/teams/players/WAS/list", "/api/colleges/list")
+EXPORT_PATH = "/api/players/export"
+PERCENTILE = 0.99
+SLOW_READ_BYTES = 4096
+SLOW_READ_PAUSE = 0.05
+
+
+def free_port() -> int:
+    """Ask the OS for an unused TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode: str, port: int, threads: int) -> subprocess.Popen:
+    """Start gunicorn (sync) or uvicorn (async) serving the app."""
+    env = dict(
+        os.environ,
+        DB_PATH=os.environ.get("DB_PATH", str(ROOT / "data" / "bball.db")),
+        DATA_DIR=os.environ.get("DATA_DIR", str(ROOT / "data")),
+        PORT=str(port),
+        GUNICORN_WORKERS="1",
+        GUNICORN_THREADS=str(threads),
+        GUNICORN_MAX_REQUESTS="0",
+        ASYNC_MAX_WORKERS=str(threads),
+    )
+    if mode == "sync":
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"]
+    else:
+        cmd = [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "asgi:application",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ]
+    return subprocess.Popen(
+        cmd,
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_ready(port: int, timeout: float = 30.0) -> None:
+    """Block until the server accepts connections on ``port``."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1.0).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+async def get(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, path: str
+) -> None:
+    """Send one keep-alive GET and read the whole response."""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = head.split(b" ", 2)[1]
+    if status != b"200":
+        raise RuntimeError(f"{path} returned {status.decode()}")
+    for line in head.split(b"\r\n"):
+        name, _, value = line.partition(b":")
+        if name.lower() == b"content-length":
+            await reader.readexactly(int(value))
+            return
+    raise RuntimeError(f"{path} returned no Content-Length")
+
+
+async def slow_reader(port: int) -> None:
+    """Download the export a few KB at a time, until cancelled."""
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SLOW_READ_BYTES)
+    sock.connect(("127.0.0.1", port))
+    reader, writer = await asyncio.open_connection(sock=sock)
+    writer.write(f"GET {EXPORT_PATH} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+    try:
+        while await reader.read(SLOW_READ_BYTES):
+            await asyncio.sleep(SLOW_READ_PAUSE)
+    finally:
+        writer.close()
+
+
+async def drive(port: int, clients: int, requests: int) -> list[float]:
+    """Run ``clients`` concurrent clients, each sending ``requests``."""
+    latencies: list[float] = []
+
+    async def one_client(i: int) -> None:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for j in range(requests):
+            start = time.perf_counter()
+            await get(reader, writer, PATHS[(i + j) % len(PATHS)])
+            latencies.append(time.perf_counter() - start)
+        writer.close()
+        await writer.wait_closed()
+
+    await asyncio.gather(*(one_client(i) for i in range(clients)))
+    return latencies
+
+
+async def drive_with_slow(
+    port: int, clients: int, requests: int, slow: int
+) -> tuple[list[float], float]:
+    """Time ``drive`` while ``slow`` clients trickle-read the export."""
+    readers = [asyncio.create_task(slow_reader(port)) for _ in range(slow)]
+    await asyncio.sleep(1.0)
+    try:
+        start = time.perf_counter()
+        latencies = await drive(port, clients, requests)
+        return latencies, time.perf_counter() - start
+    finally:
+        for task in readers:
+            task.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+
+
+def main():
+    """Benchmark both serving modes and print throughput and latency."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--slow", type=int, default=8)
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} clients x {args.requests} requests, "
+        f"{args.threads} handler threads"
+    )
+    for mode in ("sync", "async"):
+        port = free_port()
+        server = start_server(mode, port, args.threads)
+        try:
+            wait_ready(port)
+            for slow in (0, args.slow):
+                latencies, elapsed = asyncio.run(
+                    drive_with_slow(port, args.clients, args.requests, slow)
+                )
+                latencies.sort()
+                p99 = latencies[int(len(latencies) * PERCENTILE)]
+                print(
+                    f"{mode:<6} {slow:3d} slow readers"
+                    f" {len(latencies) / elapsed:8.0f} req/s"
+                    f"  p99 {p99 * 1000:8.1f} ms"
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
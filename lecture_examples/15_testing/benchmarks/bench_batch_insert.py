@@ -0,0 +1,65 @@
+"""Benchmark of per-player inserts vs one batch transaction.
+
+Adds the same players to a temporary copy of the database twice: once
+with ``add_player`` per player (one transaction and journal sync each),
+as the roster sync did through ``POST /api/players``, and once with
+``add_players`` (one ``executemany`` in a single transaction).
+
+Run from the project root:
+    python benchmarks/bench_batch_insert.py [--players N]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.resolve()
+sys.path.append(str(ROOT))
+os.environ.setdefault("DB_PATH", str(ROOT / "data" / "bball.db"))
+os.environ.setdefault("DATA_DIR", str(ROOT / "data"))
+
+from app.data_utils.connection_pool import init_pool  # noqa: E402
+from app.data_utils.loading_utils import DB_PATH  # noqa: E402
+from app.data_utils.sql_utils import add_player, add_players  # noqa: E402
+
+
+def main():
+    """Insert the players both ways and print the rates."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=2000)
+    args = parser.parse_args()
+
+    players = [
+        {"player_name": f"Bench Player {i}", "team": "WAS", "college": None}
+        for i in range(args.players)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bball.db"
+        shutil.copy(DB_PATH, db_path)
+        pool = init_pool(str(db_path), max_size=1)
+
+        start = time.perf_counter()
+        for player in players:
+            add_player(player)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        add_players(players)
+        batch = time.perf_counter() - start
+        pool.close_all()
+
+    print(f"{args.players:,} players")
+    for name, elapsed in (("add_player", single), ("add_players", batch)):
+        print(
+            f"{name:<12} {elapsed * 1000:9.1f} ms"
+            f" {args.players / elapsed:10,.0f} rows/s"
+            f"  {single / elapsed:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark of loading all_seasons.csv scaled up into player_stats.
+
+Compares the original single ``executemany`` of text rows with the chunked,
+typed bulk loader, on a fresh database and on one that already carries
+the player_stats indexes (the ``db_load`` into an indexed table case).
+
+Run from the project root:
+    python benchmarks/bench_bulk_load.py [--scale N]
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.resolve()
+sys.path.append(str(ROOT))
+os.environ.setdefault("DB_PATH", str(ROOT / "data" / "bball.db"))
+os.environ.setdefault("DATA_DIR", str(ROOT / "data"))
+
+from app.data_utils.index_utils import create_indexes  # noqa: E402
+from app.data_utils.loading_utils import (  # noqa: E402
+    create_player_stats_table,
+    load_csv_to_db,
+)
+
+SOURCE_CSV = ROOT / "data" / "all_seasons.csv"
+
+
+def write_scaled_csv(path: Path, scale: int) -> int:
+    """Repeat the source rows ``scale`` times with fresh ids."""
+    with SOURCE_CSV.open(newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = list(reader)
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for copy in range(scale):
+            offset = copy * len(rows)
+            writer.writerows(
+                [i + offset, *row[1:]] for i, row in enumerate(rows)
+            )
+    return scale * len(rows)
+
+
+def load_original(conn: sqlite3.Connection, csv_path: Path) -> None:
+    """Original implementation: one executemany of text rows."""
+    with csv_path.open() as f:
+        reader = csv.reader(f)
+        headers = ["id"] + next(reader)[1:]
+        placeholders = ",".join("?" for _ in headers)
+        conn.executemany(
+            f"INSERT INTO player_stats ({','.join(headers)})"
+            f" VALUES ({placeholders})",
+            reader,
+        )
+        conn.commit()
+
+
+def time_load(tmp_dir: Path, csv_path: Path, loader, indexed: bool) -> float:
+    """Time one load into a brand new database."""
+    db_path = tmp_dir / f"bench_{time.monotonic_ns()}.db"
+    conn = sqlite3.connect(db_path)
+    create_player_stats_table(conn)
+    if indexed:
+        create_indexes(conn)
+    start = time.perf_counter()
+    loader(conn, csv_path)
+    elapsed = time.perf_counter() - start
+    conn.close()
+    db_path.unlink()
+    return elapsed
+
+
+def main():
+    """Run both loaders and print their timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        csv_path = tmp_dir / "scaled.csv"
+        n_rows = write_scaled_csv(csv_path, args.scale)
+
+        def load_bulk(conn, path):
+            load_csv_to_db(conn, path, "player_stats")
+
+        results = []
+        for indexed in (False, True):
+            old = time_load(tmp_dir, csv_path, load_original, indexed)
+            new = time_load(tmp_dir, csv_path, load_bulk, indexed)
+            results.append((indexed, old, new))
+
+    print(f"\n{n_rows:,} rows")
+    for indexed, old, new in results:
+        label = "indexed table" if indexed else "bare table"
+        print(
+            f"{label:<14} original {old:7.2f}s ({n_rows / old:,.0f} rows/s)"
+            f"  bulk {new:7.2f}s ({n_rows / new:,.0f} rows/s)"
+            f"  {old / new:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Micro-benchmark of the query fetch paths.
+
+Compares the original ``fetchone`` loop that built one dict per row with
+the batched ``fetch_utils`` shapes, on the full ``player_stats`` table.
+
+Run from the project root:
+    python benchmarks/bench_fetch.py [--repeat N]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.resolve()
+sys.path.append(str(ROOT))
+os.environ.setdefault("DB_PATH", str(ROOT / "data" / "bball.db"))
+os.environ.setdefault("DATA_DIR", str(ROOT / "data"))
+
+from app.data_utils.fetch_utils import SHAPES, execute_query  # noqa: E402
+
+QUERY = "SELECT * FROM player_stats"
+
+
+def fetchone_dicts(conn: sqlite3.Connection, sql_query: str) -> list[dict]:
+    """Original implementation: one fetchone and one dict per row."""
+    cursor = conn.cursor()
+    cursor.execute(sql_query)
+    headers = [x[0] for x in cursor.description]
+    return_dict_list = []
+    while True:
+        single_result = cursor.fetchone()
+        if not single_result:
+            break
+        return_dict_list.append(dict(zip(headers, single_result)))
+    return return_dict_list
+
+
+def main():
+    """Time every fetch path and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(os.environ["DB_PATH"])
+    n_rows = conn.execute("SELECT count(*) FROM player_stats").fetchone()[0]
+    print(f"{QUERY!r} over {n_rows} rows, best of {args.repeat}")
+
+    candidates = {"fetchone dicts (old)": lambda: fetchone_dicts(conn, QUERY)}
+    for shape in SHAPES:
+        candidates[f"fetchmany {shape}"] = lambda shape=shape: execute_query(
+            conn, QUERY, shape=shape
+        )
+
+    baseline = None
+    for name, func in candidates.items():
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        baseline = baseline or best
+        print(f"{name:<22} {best * 1000:8.2f} ms  {baseline / best:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
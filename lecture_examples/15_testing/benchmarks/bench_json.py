@@ -0,0 +1,91 @@
+"""Benchmark of JSON encoding for the list responses.
+
+Encodes the ``/api/players`` payload and the full ``player_stats`` export
+the way the routes build their response: the original path (a list of
+dicts through Flask's default provider, which sorts keys) against
+``FastJSONProvider`` with tuple rows and a column list, using the stdlib
+encoder and, when installed, orjson. Each variant builds the full
+response object, like ``jsonify``.
+
+Run from the project root:
+    python benchmarks/bench_json.py [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+ROOT = Path(__file__).parent.parent.resolve()
+sys.path.append(str(ROOT))
+os.environ.setdefault("DB_PATH", str(ROOT / "data" / "bball.db"))
+os.environ.setdefault("DATA_DIR", str(ROOT / "data"))
+
+from app.data_utils.fetch_utils import execute_query  # noqa: E402
+from app.data_utils.loading_utils import create_db_connection  # noqa: E402
+from app.data_utils.queries import QUERIES  # noqa: E402
+from app.route_utils.json_provider import FastJSONProvider  # noqa: E402
+
+SEASON = "2022-23"
+PAYLOADS = (
+    ("/api/players", "list_players", {"season": SEASON}),
+    ("export", "export_players", {}),
+)
+
+
+def providers() -> list[tuple[str, Flask, str]]:
+    """Apps configured with each provider, and the result shape they get."""
+    default = Flask(__name__)
+    default.json = DefaultJSONProvider(default)
+    variants = [("default (old)", default, "dicts")]
+    for encoder in ("stdlib", "orjson"):
+        app = Flask(__name__)
+        app.config["JSON_ENCODER"] = encoder
+        try:
+            app.json = FastJSONProvider(app)
+        except ImportError:
+            print(f"{encoder} not installed, skipped")
+            continue
+        variants.append((f"fast {encoder}", app, "rows"))
+    return variants
+
+
+def encode(app: Flask, data: object, repeat: int) -> tuple[float, int]:
+    """Build the response ``repeat`` times; return seconds per call, size."""
+    with app.app_context():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            response = app.json.response({"players": data})
+        elapsed = time.perf_counter() - start
+    return elapsed / repeat, len(response.get_data())
+
+
+def main():
+    """Encode every payload with every provider and print the timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    conn = create_db_connection()
+    variants = providers()
+    for label, name, params in PAYLOADS:
+        sql = QUERIES[name].sql
+        baseline = None
+        for variant, app, shape in variants:
+            data = execute_query(conn, sql, params, shape)
+            seconds, size = encode(app, data, args.repeat)
+            baseline = baseline or seconds
+            print(
+                f"{label:<13} {len(data):6d} rows  {variant:<14}"
+                f" {seconds * 1000:8.2f} ms  {size / 1e6:6.2f} MB"
+                f"  {baseline / seconds:5.2f}x"
+            )
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
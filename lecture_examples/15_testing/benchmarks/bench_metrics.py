@@ -0,0 +1,97 @@
+"""Micro-benchmark of the per-request cost of the metrics hooks.
+
+Times the counter increment plus histogram observation done for every
+response, from one thread and from several at once, against a plain
+lock-protected dict doing the same bookkeeping.
+
+Run from the project root:
+    python benchmarks/bench_metrics.py [--calls N] [--threads N]
+"""
+
+import argparse
+import bisect
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.resolve()
+sys.path.append(str(ROOT))
+os.environ.setdefault("DB_PATH", str(ROOT / "data" / "bball.db"))
+os.environ.setdefault("DATA_DIR", str(ROOT / "data"))
+
+from app.metrics_utils.metrics import (  # noqa: E402
+    DEFAULT_BUCKETS,
+    Counter,
+    Histogram,
+)
+
+LABELS = ("GET", "/api/teams/players/<team>/list", "200")
+
+
+def sharded_hook(counter: Counter, histogram: Histogram):
+    """Bookkeeping done by ``record_request_metrics``."""
+
+    def hook(value: float) -> None:
+        counter.inc(LABELS)
+        histogram.observe(value, LABELS)
+
+    return hook
+
+
+def locked_hook():
+    """Same bookkeeping on shared dicts behind one lock."""
+    lock = threading.Lock()
+    counts: dict = {}
+    buckets: dict = {}
+
+    def hook(value: float) -> None:
+        with lock:
+            counts[LABELS] = counts.get(LABELS, 0) + 1
+            entry = buckets.get(LABELS)
+            if entry is None:
+                entry = buckets[LABELS] = [0] * (len(DEFAULT_BUCKETS) + 2)
+            entry[bisect.bisect_left(DEFAULT_BUCKETS, value)] += 1
+            entry[-1] += value
+
+    return hook
+
+
+def run(hook, calls: int, threads: int) -> float:
+    """Return the wall time for ``threads`` threads calling the hook."""
+    workers = [
+        threading.Thread(target=lambda: [hook(i * 1e-5) for i in range(calls)])
+        for _ in range(threads)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def main():
+    """Time both hooks and print the cost per request."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    for threads in (1, args.threads):
+        total = args.calls * threads
+        sharded = sharded_hook(
+            Counter("requests", "", ("m", "r", "s")),
+            Histogram("latency", "", ("m", "r", "s")),
+        )
+        for name, hook in (("sharded", sharded), ("locked", locked_hook())):
+            elapsed = run(hook, args.calls, threads)
+            print(
+                f"{threads} thread(s) {name:<8}"
+                f" {elapsed / total * 1e6:6.2f} us/request"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Benchmark of sqlite3's statement cache with f-string vs named-parameter SQL.
+
+Replays a random mix of the team and player lookups the API serves. With
+f-strings every distinct team or player id is a new SQL text, so the
+per-connection statement cache (an LRU keyed on the SQL text) keeps
+recompiling; with the ``queries`` registry the text is fixed and each
+statement is compiled once. Hit rates are computed by replaying the SQL
+texts through an LRU of the connection's size, timings on one long-lived
+connection.
+
+Run from the project root:
+    python benchmarks/bench_statement_cache.py [--requests N]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.resolve()
+sys.path.append(str(ROOT))
+os.environ.setdefault("DB_PATH", str(ROOT / "data" / "bball.db"))
+os.environ.setdefault("DATA_DIR", str(ROOT / "data"))
+
+from app.data_utils.loading_utils import (  # noqa: E402
+    STATEMENT_CACHE_SIZE,
+    create_db_connection,
+)
+from app.data_utils.queries import QUERIES  # noqa: E402
+
+SEASON = "2022-23"
+TEAM_SHARE = 0.5
+
+
+def fstring_workload(calls: list[tuple[str, object]]) -> list[tuple[str, ()]]:
+    """Original implementation: values interpolated into the SQL text."""
+    statements = []
+    for kind, value in calls:
+        if kind == "team":
+            sql = (
+                "SELECT distinct player_name, id from player_stats where "
+                f"team_abbreviation = '{value}' and season = '{SEASON}'"
+            )
+        else:
+            sql = (
+                "select * from player_stats where "
+                f"id = {value} and season = '{SEASON}'"
+            )
+        statements.append((sql, ()))
+    return statements
+
+
+def named_workload(calls: list[tuple[str, object]]) -> list[tuple[str, dict]]:
+    """Registry implementation: fixed SQL text, values bound as parameters."""
+    statements = []
+    for kind, value in calls:
+        if kind == "team":
+            query = QUERIES["list_players_per_team"]
+            params = {"team": value, "season": SEASON}
+        else:
+            query = QUERIES["player_info"]
+            params = {"player_id": value, "season": SEASON}
+        statements.append((query.sql, params))
+    return statements
+
+
+def hit_rate(statements: list[tuple[str, object]], size: int) -> float:
+    """Replay SQL texts through an LRU cache of ``size`` entries."""
+    cache: OrderedDict[str, None] = OrderedDict()
+    hits = 0
+    for sql, _ in statements:
+        if sql in cache:
+            hits += 1
+            cache.move_to_end(sql)
+            continue
+        cache[sql] = None
+        if len(cache) > size:
+            cache.popitem(last=False)
+    return hits / len(statements)
+
+
+def run(conn: sqlite3.Connection, statements: list) -> float:
+    """Execute every statement on one connection and return the seconds."""
+    start = time.perf_counter()
+    for sql, params in statements:
+        conn.execute(sql, params).fetchall()
+    return time.perf_counter() - start
+
+
+def main():
+    """Replay both workloads and print hit rates and timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    conn = create_db_connection()
+    teams = [
+        row[0]
+        for row in conn.execute(QUERIES["all_teams"].sql, {"season": SEASON})
+    ]
+    ids = [
+        row[1]
+        for row in conn.execute(
+            QUERIES["list_players"].sql, {"season": SEASON}
+        )
+    ]
+    rng = random.Random(args.seed)
+    calls = [
+        ("team", rng.choice(teams))
+        if rng.random() < TEAM_SHARE
+        else ("player", rng.choice(ids))
+        for _ in range(args.requests)
+    ]
+
+    print(
+        f"{args.requests:,} requests, {len(teams)} teams, {len(ids)} players,"
+        f" statement cache of {STATEMENT_CACHE_SIZE}"
+    )
+    baseline = None
+    for name, statements in (
+        ("f-string (old)", fstring_workload(calls)),
+        ("named params", named_workload(calls)),
+    ):
+        rate = hit_rate(statements, STATEMENT_CACHE_SIZE)
+        elapsed = run(conn, statements)
+        baseline = baseline or elapsed
+        print(
+            f"{name:<16} hit rate {rate:6.1%}  {elapsed * 1000:8.1f} ms"
+            f"  {baseline / elapsed:5.2f}x"
+        )
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
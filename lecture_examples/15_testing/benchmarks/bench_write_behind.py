@@ -0,0 +1,78 @@
+"""Benchmark of synchronous vs write-behind player inserts.
+
+Request threads add players concurrently to a temporary copy of the
+database, in each ``WRITE_MODE``: ``sync`` commits on every request
+thread, ``commit`` waits for the writer thread's group commit and
+``enqueue`` returns once the insert is queued (timed until the queue is
+flushed). Run once with the default rollback journal and once in WAL mode.
+
+Run from the project root:
+    python benchmarks/bench_write_behind.py [--threads N] [--writes N]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.resolve()
+sys.path.append(str(ROOT))
+os.environ.setdefault("DB_PATH", str(ROOT / "data" / "bball.db"))
+os.environ.setdefault("DATA_DIR", str(ROOT / "data"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from app.data_utils import write_behind  # noqa: E402
+from app.data_utils.loading_utils import DB_PATH, tune_database  # noqa: E402
+from app.data_utils.sql_utils import add_player  # noqa: E402
+from flask_app import create_app  # noqa: E402
+
+
+def run(db_path: Path, mode: str, threads: int, writes: int) -> float:
+    """Add ``threads`` x ``writes`` players; return the seconds taken."""
+    create_app({"DB_PATH": str(db_path), "WRITE_MODE": mode})
+
+    def worker(n: int) -> None:
+        for i in range(writes):
+            add_player({"player_name": f"Bench {n}-{i}", "team": "WAS"})
+
+    workers = [
+        threading.Thread(target=worker, args=(n,)) for n in range(threads)
+    ]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    write_behind.stop_writer()
+    return time.perf_counter() - start
+
+
+def main():
+    """Time every write mode with both journal modes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=100)
+    args = parser.parse_args()
+
+    total = args.threads * args.writes
+    print(f"{args.threads} threads x {args.writes} inserts")
+    with tempfile.TemporaryDirectory() as tmp:
+        for journal in ("delete", "wal"):
+            db_path = Path(tmp) / f"{journal}.db"
+            shutil.copy(DB_PATH, db_path)
+            if journal == "wal":
+                tune_database(str(db_path))
+            for mode in write_behind.WRITE_MODES:
+                elapsed = run(db_path, mode, args.threads, args.writes)
+                print(
+                    f"{journal:<7} {mode:<8} {elapsed * 1000:9.1f} ms"
+                    f" {total / elapsed:10,.0f} writes/s"
+                )
+
+
+if __name__ == "__main__":
+    main()
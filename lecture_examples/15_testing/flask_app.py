@@ -5,42 +5,96 @@ sets up logging, and registers API route blueprints.
 """
 
 import logging
+import os
 
 from flask import Flask
 
+from app.api.admin.routes import (
+    register_admin_routes,
+)
 from app.api.colleges.routes import (
     register_college_routes,
 )
+from app.api.metrics.routes import (
+    register_metrics_routes,
+)
 from app.api.players.routes import (
     register_player_routes,
 )
+from app.api.seasons.routes import (
+    register_season_routes,
+)
 from app.api.teams.routes import (
     register_team_routes,
 )
-from app.logger_utils.custom_logger import custom_logger
+from app.data_utils import connection_pool, write_behind
+from app.logger_utils.custom_logger import LOG_LEVEL, custom_logger
+from app.route_utils import compression
+from app.route_utils.request_metrics import register_request_metrics
+from app.route_utils.timing import register_request_timing
 
 
-def create_app():
+def create_app(test_config=None):
     """Create and configure the Flask application instance.
 
+    Args:
+        test_config: Optional mapping overriding the default configuration
+
     Returns:
         Flask: Configured Flask application
     """
     app = Flask(__name__)
+    app.config.from_mapping(
+        DB_PATH=os.environ.get("DB_PATH"),
+        DB_POOL_SIZE=int(
+            os.environ.get("DB_POOL_SIZE", connection_pool.DEFAULT_POOL_SIZE)
+        ),
+        DB_POOL_IDLE_TIMEOUT=float(
+            os.environ.get(
+                "DB_POOL_IDLE_TIMEOUT", connection_pool.DEFAULT_IDLE_TIMEOUT
+            )
+        ),
+        DB_POOL_CHECKOUT_TIMEOUT=float(
+            os.environ.get(
+                "DB_POOL_CHECKOUT_TIMEOUT",
+                connection_pool.DEFAULT_CHECKOUT_TIMEOUT,
+            )
+        ),
+        WRITE_MODE=write_behind.DEFAULT_WRITE_MODE,
+        WRITE_BATCH_SIZE=write_behind.DEFAULT_BATCH_SIZE,
+        WRITE_BATCH_DELAY_MS=write_behind.DEFAULT_BATCH_DELAY_MS,
+        WRITE_TIMEOUT=write_behind.DEFAULT_WRITE_TIMEOUT,
+        LOG_LEVEL=LOG_LEVEL,
+        JSON_ENCODER=os.environ.get("JSON_ENCODER", "auto"),
+        COMPRESS_MIN_SIZE=int(
+            os.environ.get("COMPRESS_MIN_SIZE", compression.DEFAULT_MIN_SIZE)
+        ),
+    )
+    if test_config:
+        app.config.update(test_config)
 
-    # Debug Level:
-    debug_level = logging.DEBUG
+    # Log Level:
+    log_level = app.config["LOG_LEVEL"]
     # Initialize logger
     app.logger = custom_logger  # Attach logger to Flask app
-    app.logger.setLevel(debug_level)
+    app.logger.setLevel(log_level)
     werkzeug_logger = logging.getLogger("werkzeug")
-    werkzeug_logger.setLevel(debug_level)
+    werkzeug_logger.setLevel(log_level)
     werkzeug_logger.handlers = []
     werkzeug_logger.addHandler(app.logger.handlers[0])
 
+    connection_pool.init_app(app)
+    write_behind.init_app(app)
+    register_request_timing(app)
+    register_request_metrics(app)
+    compression.register_compression(app)
+
     register_player_routes(app)
     register_team_routes(app)
     register_college_routes(app)
+    register_season_routes(app)
+    register_admin_routes(app)
+    register_metrics_routes(app)
     app.logger.info("Application initialized successfully")
     return app
 
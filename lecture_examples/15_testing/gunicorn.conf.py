@@ -0,0 +1,78 @@
+"""Gunicorn settings for serving ``flask_app:app`` in production.
+
+Every setting can be overridden through the environment variable named in
+the comment next to it. Run from the project root:
+    gunicorn -c gunicorn.conf.py
+"""
+
+import multiprocessing
+import os
+import tempfile
+from pathlib import Path
+
+wsgi_app = "flask_app:app"
+
+# PORT
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+# GUNICORN_WORKERS: processes, each with its own connection pool
+workers = int(
+    os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+)
+# GUNICORN_THREADS: request threads per worker (> 1 uses gthread workers)
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+# GUNICORN_KEEPALIVE: seconds to hold idle keep-alive connections open
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+# GUNICORN_BACKLOG: pending connections queued by the kernel
+backlog = int(os.environ.get("GUNICORN_BACKLOG", "2048"))
+# GUNICORN_MAX_REQUESTS: restart a worker after this many requests (0: never)
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+# GUNICORN_MAX_REQUESTS_JITTER: spread restarts so workers don't all recycle
+max_requests_jitter = int(
+    os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100")
+)
+# GUNICORN_TIMEOUT: seconds before a silent worker is killed and restarted
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = timeout
+# GUNICORN_PRELOAD: import the app once in the master and fork workers
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+# METRICS_DIR: where workers share their metrics, so that /metrics reports
+# every worker; set before the app is imported
+os.environ.setdefault(
+    "METRICS_DIR", str(Path(tempfile.gettempdir()) / "bball-metrics")
+)
+
+
+def on_starting(server):
+    """Empty the metrics directory of an earlier run."""
+    from app.metrics_utils import multiprocess
+
+    multiprocess.reset_directory()
+
+
+def post_fork(server, worker):
+    """Drop inherited SQLite connections and writer, restart the logger."""
+    from app.data_utils import connection_pool, write_behind
+    from app.logger_utils import custom_logger
+    from app.metrics_utils import multiprocess
+    from app.metrics_utils.metrics import registry
+
+    connection_pool.reinit_after_fork()
+    write_behind.reinit_after_fork()
+    custom_logger.restart_after_fork()
+    multiprocess.start_flushing(registry)
+    server.log.info(f"Worker {worker.pid} initialized its connection pool")
+
+
+def worker_exit(server, worker):
+    """Write the worker's final metrics before it exits."""
+    from app.metrics_utils import multiprocess
+    from app.metrics_utils.metrics import registry
+
+    multiprocess.write_snapshot(registry)
+
+
+def child_exit(server, worker):
+    """Keep the counters of an exited worker in the merged metrics."""
+    from app.metrics_utils import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
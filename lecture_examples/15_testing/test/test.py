@@ -1,5 +1,19 @@
 """Tests for the Flask application."""
+import asyncio
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import sqlite3
 import sys
+import threading
+import tracemalloc
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
 import pytest
@@ -8,6 +22,67 @@ from jsonschema import validate
 # Add the src directory to the Python path so we can import the app
 sys.path.append(str(Path(__file__).parent.parent.resolve()))
 
+from app.data_utils import (  # noqa E402
+    loading_utils,
+    stock_ingest,
+    write_behind,
+)
+from app.data_utils.cache_utils import cached_query  # noqa E402
+from app.data_utils.connection_pool import (  # noqa E402
+    ConnectionPool,
+    PoolTimeoutError,
+    init_pool,
+)
+from app.data_utils.data_version import (  # noqa E402
+    bump_data_version,
+    current_data_version,
+    record_write,
+)
+from app.data_utils.db_manage import db_manage_function  # noqa E402
+from app.data_utils.fetch_utils import (  # noqa E402
+    execute_query,
+    iter_query_batches,
+)
+from app.data_utils.index_utils import (  # noqa E402
+    PLAYER_STATS_INDEXES,
+    create_indexes,
+    explain_queries,
+    is_full_scan,
+    report_query_plans,
+)
+from app.data_utils.loading_utils import (  # noqa E402
+    DATA_DIR,
+    DB_PATH,
+    create_db_connection,
+    create_empty_sqlite_db,
+    create_player_stats_table,
+    create_seasons_table,
+    load_csv_to_db,
+    tune_database,
+)
+from app.data_utils.queries import QUERIES, run_query  # noqa E402
+from app.data_utils.query_stats import track_queries  # noqa E402
+from app.data_utils.sql_utils import (  # noqa E402
+    list_players_per_team_sql,
+    player_info_sql,
+)
+from app.data_utils.stock_ingest import load_stock_archives  # noqa E402
+from app.logger_utils.custom_logger import (  # noqa E402
+    DroppingQueueHandler,
+    JsonFormatter,
+)
+from app.metrics_utils import multiprocess  # noqa E402
+from app.metrics_utils.metrics import (  # noqa E402
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+)
+from app.route_utils.asgi_adapter import ExecutorASGIApp  # noqa E402
+from app.route_utils.compression import compress  # noqa E402
+from app.route_utils.response_cache import response_cache  # noqa E402
+from app.route_utils.timing import PHASES  # noqa E402
+from app.route_utils.validators import ValidationRegistry  # noqa E402
 from flask_app import create_app  # noqa E402
 
 
@@ -22,12 +97,28 @@ def app():
     return app
 
 
+@pytest.fixture
+def db_copy(tmp_path):
+    """Copy the database so tests can modify it freely."""
+    db_path = tmp_path / "bball.db"
+    shutil.copy(DB_PATH, db_path)
+    return db_path
+
+
 @pytest.fixture
 def client(app):
     """Create a test client for the app."""
     return app.test_client()
 
 
+@pytest.fixture
+def copy_client(db_copy):
+    """Create a test client for an app writing to a copy of the database."""
+    app = create_app({"TESTING": True, "DB_PATH": str(db_copy)})
+    yield app.test_client()
+    init_pool(DB_PATH)
+
+
 def test_app_exists(app):
     """Test that the app exists."""
     assert app is not None
@@ -68,6 +159,1027 @@ def test_player_response(client):
     json_data = response.get_json()
     validate(instance=json_data, schema=schema)
 
+
+def test_pool_reuses_connections():
+    """Test that the pool hands back the same connection after checkin."""
+    pool = ConnectionPool(max_size=2)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+
+    metrics = pool.metrics()
+    assert metrics["created"] == 1
+    assert metrics["checkouts"] == metrics["created"] + 1
+    assert metrics["in_use"] == 0
+    pool.close_all()
+    assert pool.metrics()["open"] == 0
+
+
+def test_pool_times_out_when_exhausted():
+    """Test that checkout waits and then fails once max_size is reached."""
+    pool = ConnectionPool(max_size=1, checkout_timeout=0.05)
+    with pool.connection():
+        with pytest.raises(PoolTimeoutError):
+            pool.checkout()
+    assert pool.metrics()["waits"] == 1
+    pool.close_all()
+
+
+def test_pool_reset_after_fork_keeps_parent_connections():
+    """Test that a forked worker drops, but does not close, old handles."""
+    pool = ConnectionPool(max_size=1)
+    with pool.connection() as inherited:
+        pass
+
+    pool.reset_after_fork()
+    assert pool.metrics()["open"] == 0
+    with pool.connection() as fresh:
+        assert fresh is not inherited
+    assert inherited.execute("SELECT 1").fetchone() == (1,)
+    inherited.close()
+    pool.close_all()
+
+
+def test_pool_stats_route(client):
+    """Test the /api/admin/pool endpoint."""
+    HTTP_OK = 200
+
+    client.get("/api/players")
+    response = client.get("/api/admin/pool")
+    assert response.status_code == HTTP_OK
+    assert response.get_json()["pool"]["checkouts"] >= 1
+
+
+def test_fetch_shapes_agree():
+    """Test that every fetch shape returns the same rows."""
+    query = "SELECT id, player_name, pts FROM player_stats LIMIT 25"
+    pool = ConnectionPool(max_size=1)
+    with pool.connection() as conn:
+        dicts = execute_query(conn, query, shape="dicts", batch_size=7)
+        tuples = execute_query(conn, query, shape="tuples", batch_size=7)
+        columns = execute_query(conn, query, shape="columns")
+        array = execute_query(conn, query, shape="numpy")
+        rows = execute_query(conn, query, shape="rows")
+    pool.close_all()
+
+    assert [tuple(row.values()) for row in dicts] == tuples
+    assert rows == dicts
+    assert rows.rows == tuples
+    assert columns["id"] == [row[0] for row in tuples]
+    assert array["player_name"].tolist() == columns["player_name"]
+    assert array.dtype["id"].kind == "i"
+
+
+def test_streamed_players_match_buffered(client):
+    """Test that ?stream=1 returns the same players as the plain route."""
+    buffered = client.get("/api/players").get_json()
+    streamed = client.get("/api/players?stream=1")
+    assert streamed.content_type == "application/json"
+    assert streamed.is_streamed
+    assert streamed.get_json() == buffered
+
+
+def test_players_keyset_pages_cover_season(client):
+    """Test that following next_cursor returns every player exactly once."""
+    HTTP_BAD_REQUEST = 400
+    PAGE_SIZE = 100
+
+    full = client.get("/api/players").get_json()["players"]
+    pages, cursor = [], None
+    while True:
+        query = "" if cursor is None else f"&cursor={cursor}"
+        page = client.get(f"/api/players?limit={PAGE_SIZE}{query}").get_json()
+        assert len(page["players"]) <= PAGE_SIZE
+        pages.extend(page["players"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == sorted(full, key=lambda player: player["id"])
+    limit_zero = client.get("/api/players?limit=0")
+    assert limit_zero.status_code == HTTP_BAD_REQUEST
+    bad_cursor = client.get("/api/players?cursor=abc")
+    assert bad_cursor.status_code == HTTP_BAD_REQUEST
+
+
+def test_streaming_query_in_bounded_memory(tmp_path):
+    """Test that streaming a 1M-row table keeps memory use flat."""
+    n_rows = 1_000_000
+    max_peak_bytes = 2 * 1024 * 1024
+
+    db_path = tmp_path / "big.db"
+    conn = sqlite3.connect(db_path)
+    create_player_stats_table(conn)
+    conn.execute(
+        """
+        WITH RECURSIVE seq(i) AS (
+            SELECT 0 UNION ALL SELECT i + 1 FROM seq WHERE i + 1 < ?
+        )
+        INSERT INTO player_stats (id, player_name, season)
+        SELECT i, 'Player ' || i, '2022-23' FROM seq
+        """,
+        (n_rows,),
+    )
+    conn.commit()
+
+    tracemalloc.start()
+    n_seen = 0
+    query = "SELECT id, player_name, season FROM player_stats"
+    for batch in iter_query_batches(conn, query):
+        n_seen += len(batch)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    conn.close()
+
+    assert n_seen == n_rows
+    assert peak < max_peak_bytes
+
+
+def test_export_route_streams(client):
+    """Test that /api/players/export streams every row of player_stats."""
+    response = client.get("/api/players/export")
+    assert response.is_streamed
+    players = response.get_json()["players"]
+    assert len({player["season"] for player in players}) > 1
+
+
+def test_indexes_remove_full_scans(db_copy):
+    """Test that every registered query uses an index once they exist."""
+    conn = sqlite3.connect(db_copy)
+    create_indexes(conn)
+    assert report_query_plans(conn).full_scans == []
+
+    plans = explain_queries(conn)
+    assert any("COVERING INDEX" in step for step in plans["all_teams"])
+    # walking a whole index reads every row too
+    assert any(is_full_scan(step) for step in plans["all_season_teams"])
+    conn.close()
+
+
+def test_db_analyze_reports_unindexed_database(db_copy, monkeypatch, capsys):
+    """Test that db_analyze lists full scans instead of crashing."""
+    monkeypatch.setattr(loading_utils, "DB_PATH", str(db_copy))
+    monkeypatch.setattr(sys, "argv", ["db_manage.py", "db_analyze"])
+    with pytest.raises(SystemExit, match="Full table scans"):
+        db_manage_function()
+
+    report = capsys.readouterr().out
+    assert "list_players: FULL SCAN" in report
+    assert "list_seasons: not explained" in report
+    assert "no such table: seasons" in report
+
+    # without full scans the unchecked plans still fail the command
+    with sqlite3.connect(db_copy) as conn:
+        create_indexes(conn)
+    with pytest.raises(SystemExit, match="could not be explained"):
+        db_manage_function()
+
+
+def test_queries_bind_values_as_parameters():
+    """Test that values are bound, not spliced into the SQL text."""
+    params = {"team": "WAS", "season": "2022-23"}
+    assert run_query("list_players_per_team", params)
+
+    params["team"] = "WAS' OR '1'='1"
+    assert run_query("list_players_per_team", params) == []
+
+
+def test_bulk_load_matches_source(tmp_path):
+    """Test that the chunked loader reproduces the shipped database."""
+    db_path = tmp_path / "loaded.db"
+    conn = sqlite3.connect(db_path)
+    create_player_stats_table(conn)
+    create_indexes(conn)
+    load_csv_to_db(
+        conn, Path(DATA_DIR) / "all_seasons.csv", "player_stats", 1000
+    )
+
+    conn.execute("ATTACH DATABASE ? AS source", (DB_PATH,))
+    (n_different,) = conn.execute(
+        "SELECT count(*) FROM (SELECT * FROM player_stats "
+        "EXCEPT SELECT * FROM source.player_stats)"
+    ).fetchone()
+    (n_indexes,) = conn.execute(
+        "SELECT count(*) FROM sqlite_master WHERE type = 'index'"
+    ).fetchone()
+    conn.close()
+
+    assert n_different == 0
+    assert n_indexes == len(PLAYER_STATS_INDEXES)
+
+
+def write_stock_zip(path, members, n_rows):
+    """Write a fake market/year zip with ``n_rows`` rows per member."""
+    with zipfile.ZipFile(path, "w") as zf:
+        for member in members:
+            lines = ["Symbol,Date,Open,High,Low,Close,Volume"]
+            lines += [
+                f"SYM{i},02-Jan-2017,1.5,2.0,1.0,1.75,{i}"
+                for i in range(n_rows)
+            ]
+            zf.writestr(member, "\n".join(lines))
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_stock_ingest(tmp_path, workers):
+    """Test that every member of the downsampled archives is loaded."""
+    n_rows = 250
+    write_stock_zip(tmp_path / "NASDAQ_2016.zip", ["a.csv", "b.csv"], n_rows)
+    write_stock_zip(tmp_path / "NYSE_2017.zip", ["c.csv"], n_rows)
+    write_stock_zip(tmp_path / "NYSE_2019.zip", ["d.csv"], n_rows)
+
+    conn = sqlite3.connect(tmp_path / "stocks.db")
+    stats = load_stock_archives(
+        conn, tmp_path, workers=workers, downsample=True, batch_size=100
+    )
+    counts = dict(
+        conn.execute("SELECT market, count(*) FROM stocks GROUP BY market")
+    )
+    first = conn.execute(
+        "SELECT date, typeof(open), typeof(volume) FROM stocks LIMIT 1"
+    ).fetchone()
+    conn.close()
+
+    assert stats.rows == 3 * n_rows
+    assert counts == {"NASDAQ": 2 * n_rows, "NYSE": n_rows}
+    assert first == ("2017-01-02", "real", "integer")
+
+
+def test_stock_ingest_fails_when_worker_dies(tmp_path, monkeypatch):
+    """Test that a killed worker fails the load instead of hanging."""
+
+    def die(archive, member):
+        os._exit(1)
+        yield
+
+    write_stock_zip(tmp_path / "NASDAQ_2016.zip", ["a.csv"], 10)
+    monkeypatch.setattr(stock_ingest, "_iter_member_rows", die)
+    monkeypatch.setattr(stock_ingest, "QUEUE_POLL_SECONDS", 0.1)
+    conn = sqlite3.connect(tmp_path / "stocks.db")
+    with pytest.raises(BrokenProcessPool):
+        load_stock_archives(conn, tmp_path, workers=1, downsample=True)
+    conn.close()
+
+
+def test_load_csv_from_zip(tmp_path):
+    """Test that a zipped CSV loads the same rows as the extracted one."""
+    zip_path = tmp_path / "all_seasons.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.write(Path(DATA_DIR) / "all_seasons.csv", "all_seasons.csv")
+
+    conn = sqlite3.connect(tmp_path / "zipped.db")
+    create_player_stats_table(conn)
+    load_csv_to_db(conn, zip_path, "player_stats", 1000)
+    conn.execute("ATTACH DATABASE ? AS source", (DB_PATH,))
+    (n_different,) = conn.execute(
+        "SELECT count(*) FROM (SELECT * FROM player_stats "
+        "EXCEPT SELECT * FROM source.player_stats)"
+    ).fetchone()
+    conn.close()
+
+    assert n_different == 0
+    # nothing was extracted next to the archive
+    extracted = sorted(path.name for path in tmp_path.iterdir())
+    assert extracted == ["all_seasons.zip", "zipped.db"]
+
+
+def test_query_cache_hits_and_invalidation():
+    """Test that cached results are reused until the data version moves."""
+    calls = []
+
+    @cached_query(maxsize=2, ttl=60)
+    def lookup(team):
+        calls.append(team)
+        return [team]
+
+    assert lookup("WAS") == lookup("WAS") == ["WAS"]
+    assert calls == ["WAS"]
+
+    bump_data_version()
+    lookup("WAS")
+    assert calls == ["WAS", "WAS"]
+
+    lookup("BOS")
+    lookup("LAL")  # evicts WAS
+    lookup("WAS")
+    stats = lookup.cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 5, 2)
+
+
+def test_query_cache_sees_writes_of_other_processes(copy_client, db_copy):
+    """Test that a write committed by another process drops cached results."""
+    player_id = list_players_per_team_sql("WAS")[0]["id"]
+    assert player_info_sql(player_id)
+
+    # another gunicorn worker: this process' local version does not move
+    for name in ("Elsewhere 1", "Elsewhere 2"):
+        with sqlite3.connect(db_copy) as conn:
+            conn.execute("DELETE FROM player_stats WHERE id = ?", (player_id,))
+            conn.execute(
+                "INSERT INTO player_stats "
+                "(player_name, team_abbreviation, season) "
+                "VALUES (?, 'WAS', '2022-23')",
+                (name,),
+            )
+            record_write(conn)
+        assert player_info_sql(player_id) == []
+        names = {p["player_name"] for p in list_players_per_team_sql("WAS")}
+        assert name in names
+
+
+def test_query_cache_expires():
+    """Test that entries older than the TTL are recomputed."""
+    calls = []
+
+    @cached_query(ttl=0)
+    def lookup():
+        calls.append(1)
+
+    lookup()
+    lookup()
+    assert calls == [1, 1]
+
+
+def test_cache_stats_route(client):
+    """Test the /api/admin/cache endpoint."""
+    HTTP_OK = 200
+
+    client.get("/api/colleges/list")
+    client.get("/api/colleges/list")
+    response = client.get("/api/admin/cache")
+    assert response.status_code == HTTP_OK
+    stats = response.get_json()
+    # the repeated request is answered from the response cache
+    assert "list_college_sql" in stats["caches"]
+    assert stats["responses"]["hits"] >= 1
+
+
+def test_validation_registry_reloads_on_write():
+    """Test that key sets are loaded once and reloaded after a write."""
+    teams = ["WAS"]
+    loads = []
+
+    def load_teams():
+        loads.append(1)
+        return teams
+
+    registry = ValidationRegistry()
+    registry.register("team", load_teams)
+    assert registry.is_valid("team", "WAS")
+    assert not registry.is_valid("team", "XYZ")
+    assert loads == [1]
+
+    teams.append("XYZ")
+    bump_data_version()
+    assert registry.is_valid("team", "XYZ")
+    assert loads == [1, 1]
+
+
+def test_unknown_team_returns_404(client):
+    """Test that team routes reject teams that are not in the data."""
+    HTTP_NOT_FOUND = 404
+    HTTP_OK = 200
+
+    assert client.get("/api/teams/players/WAS/list").status_code == HTTP_OK
+    response = client.get("/api/teams/players/XYZ/list")
+    assert response.status_code == HTTP_NOT_FOUND
+    assert response.get_json() == {"Error": "Team XYZ does not exist"}
+
+
+def test_season_argument_selects_season(client):
+    """Test that ?season= picks the season and teams are checked per season."""
+    HTTP_OK = 200
+    HTTP_NOT_FOUND = 404
+    SEASON_COUNT = 27
+
+    seasons = client.get("/api/seasons").get_json()["seasons"]
+    assert len(seasons) == SEASON_COUNT
+    assert seasons[0] == "1996-97"
+
+    players = client.get("/api/players?season=1996-97").get_json()["players"]
+    assert players == run_query("list_players", {"season": "1996-97"})
+    page = client.get("/api/players?season=1996-97&limit=5").get_json()
+    assert [p["id"] for p in page["players"]] == sorted(
+        p["id"] for p in players
+    )[:5]
+
+    # the Vancouver Grizzlies only played until 2000-01
+    response = client.get("/api/teams/players/VAN/list")
+    assert response.status_code == HTTP_NOT_FOUND
+    vancouver = client.get("/api/teams/players/VAN/list?season=1998-99")
+    assert vancouver.status_code == HTTP_OK
+    assert vancouver.get_json()["VAN"]
+    colleges = client.get("/api/colleges/VAN/list?season=1998-99")
+    assert colleges.status_code == HTTP_OK
+
+    response = client.get("/api/players?season=1895-96")
+    assert response.status_code == HTTP_NOT_FOUND
+    assert response.get_json() == {"Error": "Season 1895-96 does not exist"}
+
+
+def test_seasons_table_and_season_writes(copy_client, db_copy):
+    """Test the seasons table and adding players to an older season."""
+    HTTP_CREATED = 201
+    HTTP_BAD_REQUEST = 400
+    SEASON_COUNT = 27
+
+    with sqlite3.connect(db_copy) as conn:
+        assert create_seasons_table(conn) == SEASON_COUNT
+        assert create_seasons_table(conn) == SEASON_COUNT
+
+    response = copy_client.post(
+        "/api/players",
+        json={"player_name": "Old Timer", "team": "VAN", "season": "1998-99"},
+    )
+    assert response.status_code == HTTP_CREATED
+    players = copy_client.get("/api/players?season=1998-99").get_json()
+    assert "Old Timer" in {p["player_name"] for p in players["players"]}
+    latest = copy_client.get("/api/players").get_json()["players"]
+    assert "Old Timer" not in {p["player_name"] for p in latest}
+
+    unknown = {"player_name": "Nobody", "team": "WAS", "season": "1895-96"}
+    response = copy_client.post("/api/players", json=unknown)
+    assert response.status_code == HTTP_BAD_REQUEST
+    batch = copy_client.post("/api/players/batch", json=[unknown])
+    assert batch.status_code == HTTP_BAD_REQUEST
+    assert "unknown season" in batch.get_json()["error"]
+
+
+def test_asgi_adapter_matches_wsgi(app, client):
+    """Test that the ASGI mode sends the same responses as WSGI."""
+    asgi_app = ExecutorASGIApp(app, max_workers=2)
+
+    async def get(path):
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": path, "headers": []}
+        await asgi_app(scope, receive, send)
+        return messages
+
+    for path in ("/api/teams/players/WAS/list", "/api/players/export"):
+        start, *body = asyncio.run(get(path))
+        expected = client.get(path)
+        assert start["status"] == expected.status_code
+        assert b"".join(message["body"] for message in body) == expected.data
+        assert not body[-1].get("more_body")
+    asgi_app.executor.shutdown()
+
+
+def test_log_queue_drops_when_full():
+    """Test that logging drops and counts records instead of blocking."""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    logger = logging.getLogger("test_log_queue")
+    logger.addHandler(handler)
+    logger.propagate = False
+    for i in range(5):
+        logger.warning("record %d", i)
+
+    assert handler.dropped == handler.queue.qsize() + 1
+    assert handler.queue.get_nowait().getMessage() == "record 0"
+    logger.removeHandler(handler)
+
+
+def test_log_queue_stats_route(client):
+    """Test that /api/admin/logging reports the log queue counters."""
+    stats = client.get("/api/admin/logging").get_json()["logging"]
+    assert set(stats) == {"queued", "capacity", "dropped"}
+
+
+def test_track_queries_counts_db_work():
+    """Test that query time and rows add up inside track_queries only."""
+    with track_queries() as stats:
+        teams = run_query("all_teams", {"season": "2022-23"}, "tuples")
+        run_query("all_teams", {"season": "2022-23"}, "tuples")
+    run_query("all_teams", {"season": "2022-23"}, "tuples")
+
+    assert (stats.queries, stats.rows) == (2, 2 * len(teams))
+    assert stats.db_time_ns > 0
+
+
+def test_json_log_format():
+    """Test that structured fields become top-level JSON keys."""
+    record = logging.LogRecord(
+        "flask_app", logging.INFO, __file__, 1, "Response: %s", (200,), None
+    )
+    record.fields = {"status": 200, "rows": 3}
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Response: 200"
+    assert (entry["status"], entry["rows"]) == (200, 3)
+
+
+def test_server_timing_header(client):
+    """Test that every response carries a Server-Timing phase breakdown."""
+    response = client.get("/api/colleges/list")
+    phases = {}
+    for entry in response.headers["Server-Timing"].split(", "):
+        name, duration = entry.split(";dur=")
+        phases[name] = float(duration)
+
+    assert tuple(phases) == PHASES
+    assert sum(phases.values()) - phases["total"] <= phases["total"] + 0.01
+
+
+@pytest.mark.parametrize("encoder", ["stdlib", "orjson"])
+def test_fast_json_provider(encoder):
+    """Test that both encoders send the same unsorted, compact JSON."""
+    if encoder == "orjson":
+        pytest.importorskip("orjson")
+    app = create_app({"TESTING": True, "JSON_ENCODER": encoder})
+    response = app.test_client().get("/api/players")
+    players = json.loads(response.data)["players"]
+
+    assert app.json.encoder == encoder
+    assert b", " not in response.data
+    assert list(players[0]) == ["player_name", "id"]
+    assert players == run_query("list_players", {"season": "2022-23"})
+
+
+def test_conditional_get_until_data_changes(copy_client):
+    """Test that a matching If-None-Match gets 304 until the next write."""
+    HTTP_OK = 200
+    HTTP_CREATED = 201
+    HTTP_NOT_MODIFIED = 304
+    HTTP_NOT_FOUND = 404
+
+    first = copy_client.get("/api/teams/players/WAS/list")
+    etag = first.headers["ETag"]
+    cached = copy_client.get(
+        "/api/teams/players/WAS/list", headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == HTTP_NOT_MODIFIED
+    assert cached.data == b""
+    assert cached.headers["ETag"] == etag
+
+    player = {"player_name": "New Player", "team": "WAS"}
+    assert copy_client.post("/api/players", json=player).status_code == (
+        HTTP_CREATED
+    )
+    changed = copy_client.get(
+        "/api/teams/players/WAS/list", headers={"If-None-Match": etag}
+    )
+    assert changed.status_code == HTTP_OK
+    assert changed.headers["ETag"] != etag
+    unknown = copy_client.get("/api/teams/players/XXX/list")
+    assert unknown.status_code == HTTP_NOT_FOUND
+
+
+def test_etag_is_shared_by_worker_processes(copy_client, db_copy):
+    """Test that every worker gives the same tag until any of them writes."""
+    HTTP_OK = 200
+    HTTP_NOT_MODIFIED = 304
+
+    etag = copy_client.get("/api/colleges/list").headers["ETag"]
+    # a fresh worker process starts with its own pool and local version
+    init_pool(str(db_copy))
+    response = copy_client.get(
+        "/api/colleges/list", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == HTTP_NOT_MODIFIED
+
+    # committed by another worker, this process' local version is unchanged
+    with sqlite3.connect(db_copy) as conn:
+        record_write(conn)
+    response = copy_client.get(
+        "/api/colleges/list", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == HTTP_OK
+    assert response.headers["ETag"] != etag
+
+
+def test_large_responses_are_compressed(client):
+    """Test that large JSON bodies are gzipped and small ones are not."""
+    plain = client.get("/api/players")
+    zipped = client.get("/api/players", headers={"Accept-Encoding": "gzip"})
+    small = client.get("/api/admin/pool", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in zipped.headers["Vary"]
+    assert int(zipped.headers["Content-Length"]) < len(plain.data)
+    assert gzip.decompress(zipped.data) == plain.data
+    assert "Content-Encoding" not in small.headers
+
+
+def test_cached_bodies_are_compressed_once(client, monkeypatch):
+    """Test that response cache hits reuse the compressed body."""
+    calls = []
+
+    def counting_compress(data, encoding):
+        calls.append(encoding)
+        return compress(data, encoding)
+
+    monkeypatch.setattr(
+        "app.route_utils.response_cache.compress", counting_compress
+    )
+    response_cache.clear()
+    plain = client.get("/api/players")
+    zipped = [
+        client.get("/api/players", headers={"Accept-Encoding": "gzip"})
+        for _ in range(3)
+    ]
+    assert calls == ["gzip"]
+    for response in zipped:
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert gzip.decompress(response.data) == plain.data
+
+
+def test_response_cache_serves_bytes_until_write(client, monkeypatch):
+    """Test that GET bodies are reused until a write bumps the version."""
+    response_cache.clear()
+    first = client.get("/api/colleges/list")
+    with track_queries() as stats:
+        second = client.get("/api/colleges/list")
+    assert second.data == first.data
+    assert stats.queries == 0
+    assert response_cache.stats()["hits"] >= 1
+
+    bump_data_version()
+    key = ("/api/colleges/list", b"")
+    assert response_cache.get(key, current_data_version()) is None
+
+    monkeypatch.setattr(response_cache, "max_bytes", len(first.data) + 100)
+    client.get("/api/colleges/list")
+    client.get("/api/colleges/list?page=2")
+    stats = response_cache.stats()
+    assert stats["size"] == 1
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert stats["evictions"] >= 1
+
+
+def test_response_cache_sees_writes_of_other_processes(copy_client, db_copy):
+    """Test that no worker serves a body older than another's write."""
+    url = "/api/teams/players/WAS/list"
+    first = copy_client.get(url)
+    assert copy_client.get(url).data == first.data
+
+    # committed by another worker, this process' local version is unchanged
+    with sqlite3.connect(db_copy) as conn:
+        conn.execute(
+            "INSERT INTO player_stats "
+            "(player_name, team_abbreviation, season) "
+            "VALUES ('Elsewhere', 'WAS', '2022-23')"
+        )
+        record_write(conn)
+    players = copy_client.get(url).get_json()["WAS"]
+    assert "Elsewhere" in {player["player_name"] for player in players}
+
+
+def test_batch_insert_is_one_transaction(copy_client, db_copy):
+    """Test that a batch is added at once and rejected as a whole."""
+    HTTP_CREATED = 201
+    HTTP_BAD_REQUEST = 400
+    BATCH_SIZE = 50
+
+    players = [
+        {"player_name": f"Batch {i}", "team": "WAS"} for i in range(BATCH_SIZE)
+    ]
+    response = copy_client.post("/api/players/batch", json=players)
+    assert response.status_code == HTTP_CREATED
+    ids = response.get_json()["ids"]
+    assert ids == list(range(ids[0], ids[0] + BATCH_SIZE))
+    info = copy_client.get(f"/api/players/{ids[-1]}").get_json()
+    assert info["player_name"] == f"Batch {BATCH_SIZE - 1}"
+
+    invalid = copy_client.post(
+        "/api/players/batch", json=[*players, {"team": "WAS"}]
+    )
+    assert invalid.status_code == HTTP_BAD_REQUEST
+    assert f"Player {BATCH_SIZE}" in invalid.get_json()["error"]
+    not_a_list = copy_client.post("/api/players/batch", json={})
+    assert not_a_list.status_code == HTTP_BAD_REQUEST
+    with sqlite3.connect(db_copy) as conn:
+        count = conn.execute(
+            "SELECT count(*) FROM player_stats "
+            "WHERE player_name LIKE 'Batch %'"
+        ).fetchone()[0]
+    assert count == BATCH_SIZE
+
+
+def test_delete_players_returns_404_for_unknown_ids(copy_client):
+    """Test single and bulk deletes, and that unknown ids are 404s."""
+    HTTP_OK = 200
+    HTTP_NO_CONTENT = 204
+    HTTP_BAD_REQUEST = 400
+    HTTP_NOT_FOUND = 404
+
+    players = copy_client.get("/api/players?limit=3").get_json()["players"]
+    first, second, third = (player["id"] for player in players)
+
+    response = copy_client.delete(f"/api/players/{first}")
+    assert response.status_code == HTTP_NO_CONTENT
+    response = copy_client.delete(f"/api/players/{first}")
+    assert response.status_code == HTTP_NOT_FOUND
+
+    missing = copy_client.delete(
+        "/api/players/batch", json={"ids": [second, first]}
+    )
+    assert missing.status_code == HTTP_NOT_FOUND
+    kept = copy_client.get(f"/api/players/{second}")
+    assert kept.status_code == HTTP_OK
+
+    deleted = copy_client.delete(
+        "/api/players/batch", json={"ids": [second, third]}
+    )
+    assert deleted.status_code == HTTP_OK
+    assert deleted.get_json()["deleted"] == {
+        str(player["id"]): player["player_name"] for player in players[1:]
+    }
+    invalid = copy_client.delete("/api/players/batch", json={"ids": "1"})
+    assert invalid.status_code == HTTP_BAD_REQUEST
+
+
+def _read_players(db_path, rounds):
+    """Run the players list query repeatedly; return the lock errors."""
+    conn = create_db_connection(db_path)
+    errors = 0
+    for _ in range(rounds):
+        try:
+            conn.execute(
+                QUERIES["list_players"].sql, {"season": "2022-23"}
+            ).fetchall()
+        except sqlite3.OperationalError:
+            errors += 1
+    conn.close()
+    return errors
+
+
+def _write_players(db_path, rounds):
+    """Insert and commit players one at a time; return the lock errors."""
+    conn = create_db_connection(db_path)
+    errors = 0
+    for i in range(rounds):
+        try:
+            with conn:
+                query = QUERIES["insert_player"]
+                conn.execute(
+                    query.sql, {**query.sample_params, "player_name": i}
+                )
+        except sqlite3.OperationalError:
+            errors += 1
+    conn.close()
+    return errors
+
+
+def test_wal_readers_and_writers_in_parallel(db_copy, tmp_path):
+    """Test that parallel reader and writer processes never hit a lock."""
+    READERS = 4
+    WRITERS = 2
+
+    settings = tune_database(str(db_copy))
+    assert settings["journal_mode"] == "wal"
+    assert settings["synchronous"] == 1  # NORMAL
+    assert settings["busy_timeout"] > 0
+
+    new_db = tmp_path / "new.db"
+    create_empty_sqlite_db(str(new_db))
+    with sqlite3.connect(new_db) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(
+        max_workers=READERS + WRITERS, mp_context=context
+    ) as pool:
+        readers = [
+            pool.submit(_read_players, str(db_copy), 200)
+            for _ in range(READERS)
+        ]
+        writers = [
+            pool.submit(_write_players, str(db_copy), 50)
+            for _ in range(WRITERS)
+        ]
+        errors = [future.result() for future in readers + writers]
+    assert errors == [0] * (READERS + WRITERS)
+    with sqlite3.connect(db_copy) as conn:
+        count = conn.execute(
+            "SELECT count(*) FROM player_stats WHERE player_name = '0'"
+        ).fetchone()[0]
+    assert count == WRITERS
+
+
+def test_write_behind_group_commit(db_copy):
+    """Test that queued writes are group-committed in both modes."""
+    HTTP_CREATED = 201
+    HTTP_ACCEPTED = 202
+    HTTP_NOT_FOUND = 404
+    WORKERS = 8
+    PLAYERS_PER_WORKER = 10
+    PLAYERS = WORKERS * PLAYERS_PER_WORKER
+    app = create_app(
+        {
+            "TESTING": True,
+            "DB_PATH": str(db_copy),
+            "WRITE_MODE": "commit",
+            "WRITE_BATCH_DELAY_MS": 20,
+        }
+    )
+    statuses = []
+
+    def add_players(worker):
+        client = app.test_client()
+        for i in range(PLAYERS_PER_WORKER):
+            player = {"player_name": f"Queued {worker}-{i}", "team": "WAS"}
+            response = client.post("/api/players", json=player)
+            statuses.append(response.status_code)
+
+    try:
+        threads = [
+            threading.Thread(target=add_players, args=(i,))
+            for i in range(WORKERS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        client = app.test_client()
+        writes = client.get("/api/admin/writes").get_json()["writes"]
+        assert statuses == [HTTP_CREATED] * PLAYERS
+        assert writes["operations"] == PLAYERS
+        assert writes["batches"] < PLAYERS
+        response = client.delete("/api/players/999999")
+        assert response.status_code == HTTP_NOT_FOUND
+
+        app = create_app(
+            {
+                "TESTING": True,
+                "DB_PATH": str(db_copy),
+                "WRITE_MODE": "enqueue",
+            }
+        )
+        client = app.test_client()
+        player = {"player_name": "Queued later", "team": "WAS"}
+        response = client.post("/api/players", json=player)
+        assert response.status_code == HTTP_ACCEPTED
+        write_behind.stop_writer()
+    finally:
+        create_app()  # back to the default database and sync writes
+    with sqlite3.connect(db_copy) as conn:
+        count = conn.execute(
+            "SELECT count(*) FROM player_stats "
+            "WHERE player_name LIKE 'Queued%'"
+        ).fetchone()[0]
+    assert count == PLAYERS + 1
+
+
+def test_write_behind_timeout_restart_and_order(db_copy):
+    """Test stuck and dead writers, and that batches keep their order."""
+    HTTP_CREATED = 201
+    HTTP_ACCEPTED = 202
+    HTTP_UNAVAILABLE = 503
+    app = create_app(
+        {
+            "TESTING": True,
+            "DB_PATH": str(db_copy),
+            "WRITE_MODE": "commit",
+            "WRITE_TIMEOUT": 0.2,
+        }
+    )
+    client = app.test_client()
+    player = {"player_name": "Queued single", "team": "WAS"}
+    release = threading.Event()
+    try:
+        write_behind.get_writer().submit(lambda conn: release.wait())
+        assert client.post("/api/players", json=player).status_code == (
+            HTTP_UNAVAILABLE
+        )
+        release.set()
+
+        writer = write_behind.get_writer()
+        writer._queue.put(write_behind._STOP)  # thread exits on its own
+        writer._thread.join()
+        response = client.post("/api/players/batch", json=[player])
+        assert response.status_code == HTTP_CREATED
+        assert len(response.get_json()["ids"]) == 1
+
+        app = create_app(
+            {
+                "TESTING": True,
+                "DB_PATH": str(db_copy),
+                "WRITE_MODE": "enqueue",
+            }
+        )
+        client = app.test_client()
+        response = client.post("/api/players", json=player)
+        assert response.status_code == HTTP_ACCEPTED
+        batch = [{"player_name": "Queued batch", "team": "WAS"}]
+        response = client.post("/api/players/batch", json=batch)
+        assert response.status_code == HTTP_ACCEPTED
+        write_behind.stop_writer()
+    finally:
+        release.set()
+        create_app()  # back to the default database and sync writes
+    with sqlite3.connect(db_copy) as conn:
+        names = [
+            row[0]
+            for row in conn.execute(
+                "SELECT player_name FROM player_stats "
+                "WHERE player_name LIKE 'Queued%' ORDER BY id"
+            )
+        ]
+    # the timed out insert was cancelled; the queued ones kept their order
+    assert names == ["Queued single", "Queued single", "Queued batch"]
+
+
+def test_sharded_metrics_sum_threads():
+    """Test that per-thread shards add up when the metrics are rendered."""
+    counter = Counter("test_total", "Test counter.", ("route",))
+    histogram = Histogram("test_seconds", "Test latency.", buckets=(0.1, 1))
+
+    def work():
+        for _ in range(1000):
+            counter.inc(("/a",))
+            histogram.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert 'test_total{route="/a"} 4000' in counter.render()
+    lines = histogram.render().splitlines()
+    assert 'test_seconds_bucket{le="0.1"} 0' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 4000' in lines
+    assert "test_seconds_sum 2000" in lines
+
+
+def test_finished_threads_shards_are_retired():
+    """Test that short-lived threads do not leave a shard each behind."""
+    counter = Counter("test_retired_total", "Test counter.")
+    histogram = Histogram("test_retired_seconds", "Test latency.")
+    n_threads = 50
+
+    def work():
+        counter.inc()
+        histogram.observe(0.5)
+
+    for _ in range(n_threads):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+
+    assert len(counter._shards) <= 1
+    assert f"test_retired_total {n_threads}" in counter.render()
+    assert not counter._shards
+    assert f"test_retired_seconds_count {n_threads}" in histogram.render()
+    assert not histogram._shards
+
+
+def test_metrics_route(client):
+    """Test that /metrics reports requests by route rule and status."""
+    client.get("/api/teams/players/WAS/list")
+    client.get("/api/teams/players/ZZZ/list")
+    text = client.get("/metrics").get_data(as_text=True)
+
+    route = 'route="/api/teams/players/<team>/list"'
+    assert f'http_requests_total{{method="GET",{route},status="404"}}' in text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+
+
+def _worker_registry():
+    """Registry with one metric of each kind, as in every worker."""
+    registry = Registry()
+    counter = registry.register(Counter("test_mp_total", "Test counter."))
+    histogram = registry.register(
+        Histogram("test_mp_seconds", "Test latency.")
+    )
+    gauge = registry.register(Gauge("test_mp_in_flight", "Test gauge."))
+    return registry, counter, histogram, gauge
+
+
+def test_metrics_merged_over_workers(tmp_path):
+    """Test that /metrics adds up workers and keeps exited counters."""
+    registry, counter, histogram, gauge = _worker_registry()
+    other, other_counter, other_histogram, other_gauge = _worker_registry()
+    counter.inc(amount=2)
+    histogram.observe(0.5)
+    gauge.set(1)
+    other_counter.inc(amount=3)
+    other_histogram.observe(0.5)
+    other_gauge.set(4)
+    other_pid = os.getpid() + 1
+    multiprocess._write(tmp_path / f"{other_pid}.json", other.collect())
+
+    lines = multiprocess.render_metrics(registry, str(tmp_path)).splitlines()
+    assert "test_mp_total 5" in lines
+    assert "test_mp_seconds_count 2" in lines
+    assert "test_mp_in_flight 5" in lines
+
+    multiprocess.mark_process_dead(other_pid, str(tmp_path))
+    assert not (tmp_path / f"{other_pid}.json").exists()
+    lines = multiprocess.render_metrics(registry, str(tmp_path)).splitlines()
+    assert "test_mp_total 5" in lines
+    assert "test_mp_seconds_count 2" in lines
+    assert "test_mp_in_flight 1" in lines
+
+
 # Tests below should be used in the 2nd part of the lecture.
 # They work
 